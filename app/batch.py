@@ -0,0 +1,41 @@
+"""Leitura em lote por ids (GET /<recurso>/batch?ids=3,1,2 ou POST com {"ids": [...]}).
+
+Substitui uma requisição GET /<recurso>/{id} por registro (ex.: os alunos e
+instrutores de uma lista de agendamentos) por uma única consulta com IN. A
+resposta segue a ordem dos ids pedidos (repetidos aparecem uma vez) e lista
+em missing os que não existem, em vez de responder 404.
+"""
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from app.config import settings
+
+IDS_DESCRIPTION = "Ids separados por vírgula, na ordem desejada (máximo BATCH_MAX_IDS)"
+
+
+def parse_ids(ids: str) -> list:
+    """Ids do parâmetro ids=3,1,2 (HTTPException 400 se algum não for inteiro)"""
+    try:
+        return [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids deve ser uma lista de inteiros separados por vírgula"
+        )
+
+
+async def fetch_batch(db, model, ids, options=()) -> dict:
+    """Lote {items, missing} dos registros de model com esses ids, com uma consulta"""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.batch_max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {settings.batch_max_ids} ids por requisição"
+        )
+    found = {}
+    if ids:
+        result = await db.scalars(select(model).where(model.id.in_(ids)).options(*options))
+        found = {item.id: item for item in result}
+    return {
+        "items": [found[item_id] for item_id in ids if item_id in found],
+        "missing": [item_id for item_id in ids if item_id not in found],
+    }
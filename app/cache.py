@@ -0,0 +1,68 @@
+"""Cache em memória, por processo, para leituras agregadas e repetidas.
+
+Cada worker tem o seu cache: a invalidação feita por uma escrita vale para o
+processo que a recebeu, e nos demais o valor expira com o TTL. Por isso o TTL
+deve ser o atraso máximo aceitável para o dado em questão. Acertos e faltas
+são contados na métrica cache_requests_total (GET /metrics).
+"""
+import time
+from collections import OrderedDict
+from app.metrics import CACHE_REQUESTS
+
+
+class TTLCache:
+    """Valores com expiração (TTL, em segundos) e, com maxsize, descarte do menos usado (LRU).
+
+    ttl <= 0 desativa o cache.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        # Incrementada a cada invalidação: um valor calculado antes dela não é gravado
+        self.generation = 0
+        self._hits = CACHE_REQUESTS.labels(name, "hit")
+        self._misses = CACHE_REQUESTS.labels(name, "miss")
+        self._bypasses = CACHE_REQUESTS.labels(name, "bypass")
+
+    def get(self, key, default=None, bypass: bool = False):
+        """Valor de key; com bypass, ignora o cache (o novo valor ainda pode ser gravado com set)"""
+        if bypass:
+            self._bypasses.inc()
+            return default
+        item = self._items.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                del self._items[key]
+            self._misses.inc()
+            return default
+        self._items.move_to_end(key)
+        self._hits.inc()
+        return item[1]
+
+    def set(self, key, value, generation: int = None):
+        """Gravar value; com generation, só grava se não houve invalidação desde então"""
+        if self.ttl <= 0 or (generation is not None and generation != self.generation):
+            return
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        if self.maxsize is not None and len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Remover key (ou tudo, sem key)"""
+        self.generation += 1
+        if key is None:
+            self._items.clear()
+        else:
+            self._items.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Remover as chaves para as quais predicate(chave) é verdadeiro"""
+        self.generation += 1
+        for key in [key for key in self._items if predicate(key)]:
+            del self._items[key]
+
+    def __len__(self):
+        return len(self._items)
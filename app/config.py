@@ -1,5 +1,6 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -7,7 +8,82 @@ class Settings(BaseSettings):
     app_name: str = "AutoDominio API"
     database_url: str = "sqlite:///./autodominio.db"
     debug: bool = True
-    
+
+    # Aplicar migrações pendentes ao iniciar (apenas desenvolvimento; em produção
+    # use "python -m app.database.migrations upgrade" antes de subir os workers)
+    auto_migrate: bool = False
+
+    # Rotas usam AsyncSession (aiosqlite/asyncpg). Com False, a sessão síncrona
+    # é executada no threadpool, como antes. None = o mais rápido para o backend
+    # (ver benchmark_async_db.py): threadpool no SQLite, AsyncSession nos demais
+    async_db: Optional[bool] = None
+
+    # Réplicas de leitura (JSON, ex.: ["postgresql://replica1/db"]). Vazio = tudo no primário
+    database_replica_urls: List[str] = []
+    replica_strategy: str = "round_robin"  # round_robin | least_connections
+    # Após uma escrita, o mesmo cliente lê do primário por esta janela (0 = desativado)
+    read_your_writes_seconds: int = 5
+
+    # Pool de conexões (None = usar o padrão do backend, ver app/database/connection.py)
+    db_pool_size: Optional[int] = None
+    db_max_overflow: Optional[int] = None
+    db_pool_timeout: Optional[float] = None
+    db_pool_recycle: Optional[int] = None
+    db_pool_pre_ping: Optional[bool] = None
+
+    # Busca de instrutores por cidade também por trecho do nome (FTS5 trigram / pg_trgm,
+    # ou LIKE sem o índice). False = só pelo início do nome
+    city_fuzzy_search: bool = True
+
+    # Cache das buscas de instrutores (GET /instructor-profiles/); TTL 0 = sem cache
+    instructor_search_cache_ttl: float = 30.0
+    instructor_search_cache_size: int = 1024  # Combinações de filtros e página guardadas
+
+    # Segundos em que a contagem por status de aprovação é servida do cache (0 = sem cache)
+    approval_stats_ttl: float = 10.0
+
+    # Feeds iCalendar: dias de agendamentos passados incluídos
+    calendar_past_days: int = 90
+
+    # Máximo de ids por leitura em lote (GET/POST /<recurso>/batch), resolvida com um único IN
+    batch_max_ids: int = 100
+
+    # Registros por lote (um INSERT e um commit) na importação em massa
+    import_batch_size: int = 1000
+
+    # Compressão das respostas (ver app/middleware/compression.py). Em ordem de
+    # preferência; br e zstd exigem os pacotes brotli e zstandard. Vazio = desativada
+    compression_encodings: List[str] = ["zstd", "br", "gzip"]
+    compression_minimum_size: int = 1024  # Bytes; respostas menores seguem sem compressão
+    compression_gzip_level: int = 6  # 1 (rápido) a 9
+    compression_brotli_quality: int = 4  # 0 a 11
+    compression_zstd_level: int = 3  # 1 a 22
+
+    # Serialização das leituras direto em bytes com TypeAdapters pré-compilados, e
+    # ORJSONResponse nas demais rotas se o orjson estiver instalado (app/serialization.py)
+    json_fast_path: bool = False
+
+    # Instrumentação de SQL por requisição (ver app/middleware/query_stats.py)
+    query_stats_headers: bool = False  # Cabeçalhos X-DB-Query-Count, X-DB-Time-Ms, X-DB-Repeated-Queries
+    n_plus_one_threshold: int = 3  # Execuções da mesma consulta que caracterizam N+1
+    query_budget_strict: bool = False  # Exceder o orçamento vira erro 500 (usar nos testes)
+    query_budget_default: Optional[int] = None  # Orçamento das rotas sem @query_budget
+
+    # PRAGMAs aplicados a cada nova conexão SQLite
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -64000  # Negativo = KiB (64 MB)
+    sqlite_mmap_size: int = 268435456  # 256 MB
+    sqlite_busy_timeout: int = 5000  # Milissegundos
+
+    @model_validator(mode="after")
+    def resolve_async_db(self):
+        """ASYNC_DB omitido: threadpool no SQLite (aiosqlite custa uma troca de thread por
+        chamada), AsyncSession nos demais backends"""
+        if self.async_db is None:
+            self.async_db = not self.database_url.startswith("sqlite")
+        return self
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,3 +1,4 @@
-from app.database.connection import Base, engine, get_db, SessionLocal
+from app.database.connection import Base, engine, get_db, SessionLocal, async_engine, AsyncSessionLocal
+from app.database.replicas import get_read_db, open_read_session, read_only, replica_set
 
-__all__ = ["Base", "engine", "get_db", "SessionLocal"]
+__all__ = ["Base", "engine", "get_db", "get_read_db", "open_read_session", "read_only", "replica_set", "SessionLocal", "async_engine", "AsyncSessionLocal"]
@@ -1,25 +1,163 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
+from app.metrics import instrument_pool
+from app.database.sync_adapter import ThreadedSession
+
+# Drivers assíncronos usados quando settings.async_db está ativo
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# Padrões de pool por backend (sobrescritos pelos campos db_pool_* de Settings)
+POOL_DEFAULTS = {
+    # Com WAL os leitores não bloqueiam o escritor, então vale manter várias conexões abertas.
+    # O total (50) fica acima das 40 threads do threadpool do Starlette, que no modo
+    # síncrono ficariam todas presas esperando o pool.
+    # O pre_ping é desnecessário: não há servidor que derrube conexões ociosas.
+    "sqlite": {
+        "pool_size": 20,
+        "max_overflow": 30,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+    "postgresql": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+}
+
+
+def is_sqlite_memory(url) -> bool:
+    """Indica se a URL aponta para um banco SQLite em memória"""
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def to_sync_url(database_url: str):
+    """Converter a URL configurada para o driver síncrono padrão do backend"""
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS.values():
+        url = url.set(drivername=url.get_backend_name())
+    return url
+
+
+def to_async_url(database_url: str):
+    """Converter a URL configurada para o driver assíncrono do backend"""
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS.values():
+        return url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Backend sem driver assíncrono configurado: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def build_engine_options(database_url) -> dict:
+    """Montar os argumentos de create_engine de acordo com o backend"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    options = {}
+
+    if backend == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout / 1000,
+        }
+        # Bancos em memória usam um pool próprio (uma conexão compartilhada)
+        if is_sqlite_memory(url):
+            return options
+
+    defaults = POOL_DEFAULTS.get(backend, POOL_DEFAULTS["postgresql"])
+    overrides = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    for key, default in defaults.items():
+        options[key] = overrides[key] if overrides[key] is not None else default
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Aplicar os PRAGMAs de desempenho em cada nova conexão SQLite"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def configure_engine(engine):
+    """Registrar os hooks específicos do backend e as métricas do pool em um engine"""
+    if engine.dialect.name == "sqlite" and not is_sqlite_memory(engine.url):
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return instrument_pool(engine)
 
-# Criar engine do SQLAlchemy
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # Necessário apenas para SQLite
-)
+
+def build_async_engine(database_url):
+    """Criar o engine assíncrono com as mesmas opções de pool do síncrono"""
+    url = to_async_url(database_url)
+    options = build_engine_options(url)
+    # O aiosqlite usa NullPool por padrão para arquivos; o pool configurado exige QueuePool
+    if url.get_backend_name() == "sqlite" and "pool_size" in options:
+        options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(url, **options)
+    configure_engine(async_engine.sync_engine)
+    return async_engine
+
+
+# Criar engine do SQLAlchemy (usado na criação do schema, scripts e no modo síncrono)
+sync_url = to_sync_url(settings.database_url)
+engine = configure_engine(create_engine(sync_url, **build_engine_options(sync_url)))
 
 # Criar sessão local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine e sessão assíncronos, usados pelas rotas quando settings.async_db está ativo
+async_engine = build_async_engine(settings.database_url) if settings.async_db else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
 # Base para os modelos
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency para obter sessão do banco de dados"""
-    db = SessionLocal()
+@asynccontextmanager
+async def open_session(async_factory, sync_factory):
+    """Abrir uma sessão no modo configurado (AsyncSession ou Session no threadpool)"""
+    if async_factory is not None:
+        async with async_factory() as db:
+            yield db
+        return
+
+    db = ThreadedSession(sync_factory(expire_on_commit=False))
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_db():
+    """Dependency para obter sessão do banco de dados"""
+    async with open_session(AsyncSessionLocal, SessionLocal) as db:
+        yield db
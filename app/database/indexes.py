@@ -0,0 +1,151 @@
+"""Índices das consultas mais frequentes e verificação dos planos de execução.
+
+Uso:
+    python -m app.database.indexes          # cria os índices que faltam
+    python -m app.database.indexes --check  # falha se alguma consulta quente fizer scan
+"""
+import re
+import sys
+from datetime import datetime
+from sqlalchemy import func, select, text, tuple_
+from app.database.connection import Base, engine
+from app.models import (
+    Appointment,
+    AppointmentStatus,
+    ApprovalStatus,
+    InstructorAvailability,
+    InstructorDocument,
+    InstructorProfile,
+    InstructorTimeOff,
+    Review,
+    TransmissionType,
+)
+from app.search import search_city
+
+
+def ensure_indexes(conn):
+    """Criar os índices declarados nos modelos que ainda não existem no banco.
+
+    O create_all não cria índices novos em tabelas já existentes; este passo
+    cobre bancos criados antes dos índices serem declarados.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def hot_queries():
+    """Consultas dos endpoints de listagem, no formato emitido pelas rotas"""
+    city_query, city_order = search_city(select(InstructorProfile), InstructorProfile, "Paulo")
+    prefix_query, prefix_order = search_city(select(InstructorProfile), InstructorProfile, "São", fuzzy=False)
+    return {
+        "list_appointments(instructor_id)": select(Appointment)
+            .where(Appointment.instructor_id == 1)
+            .order_by(Appointment.start_date),
+        "list_appointments(student_id)": select(Appointment)
+            .where(Appointment.student_id == 1)
+            .order_by(Appointment.start_date),
+        "list_appointments(status)": select(Appointment)
+            .where(Appointment.status == AppointmentStatus.PENDING),
+        "list_appointments(instructor_id, status)": select(Appointment)
+            .where(Appointment.instructor_id == 1, Appointment.status == AppointmentStatus.PENDING),
+        "list_appointments(cursor)": select(Appointment)
+            .where(tuple_(Appointment.start_date, Appointment.id) > tuple_(datetime(2030, 1, 1), 1))
+            .order_by(Appointment.start_date, Appointment.id),
+        "appointments(instructor_id, período)": select(Appointment)
+            .where(Appointment.instructor_id == 1, Appointment.start_date < datetime(2030, 1, 1)),
+        "list_free_slots(agendamentos)": select(Appointment.start_date, Appointment.end_date)
+            .where(Appointment.instructor_id == 1)
+            .where(Appointment.start_date < datetime(2030, 4, 1), Appointment.end_date > datetime(2030, 1, 1))
+            .where(Appointment.status != AppointmentStatus.CANCELLED),
+        "list_instructor_reviews": select(Review)
+            .where(Review.instructor_id == 1),
+        "export_instructor_reviews": select(Review.__table__)
+            .where(Review.instructor_id == 1)
+            .order_by(Review.created_at, Review.id),
+        "export_appointments(instructor_id, período)": select(Appointment.__table__)
+            .where(Appointment.instructor_id == 1)
+            .where(Appointment.start_date >= datetime(2030, 1, 1), Appointment.start_date < datetime(2031, 1, 1))
+            .order_by(Appointment.start_date, Appointment.id),
+        "calendar_feed(student_id)": select(Appointment.id, Appointment.start_date)
+            .where(Appointment.student_id == 1, Appointment.start_date >= datetime(2030, 1, 1))
+            .order_by(Appointment.start_date, Appointment.id),
+        "get_instructor_rating_stats(média)": select(func.avg(Review.rating), func.count(Review.id))
+            .where(Review.instructor_id == 1),
+        "get_instructor_rating_stats(distribuição)": select(func.count(Review.id))
+            .where(Review.instructor_id == 1, Review.rating == 5),
+        "list_instructor_profiles(transmission, preço)": select(InstructorProfile)
+            .where(InstructorProfile.transmission == TransmissionType.MANUAL, InstructorProfile.hourly_rate <= 100),
+        "list_instructor_profiles(cidade)": city_query.order_by(*city_order),
+        "list_instructor_profiles(cidade, prefixo)": prefix_query.order_by(*prefix_order),
+        "list_instructor_profiles(preço)": select(InstructorProfile)
+            .where(InstructorProfile.hourly_rate >= 50, InstructorProfile.hourly_rate <= 100),
+        "listagens de aprovação": select(InstructorProfile)
+            .where(InstructorProfile.approval_status == ApprovalStatus.PENDING),
+        "get_approval_stats": select(func.count(InstructorProfile.id))
+            .where(InstructorProfile.approval_status == ApprovalStatus.APPROVED),
+        "list_instructor_availability": select(InstructorAvailability)
+            .where(InstructorAvailability.instructor_id == 1),
+        "list_instructor_time_off": select(InstructorTimeOff)
+            .where(InstructorTimeOff.instructor_id == 1),
+        "time_off(instructor_id, date)": select(InstructorTimeOff)
+            .where(InstructorTimeOff.instructor_id == 1, InstructorTimeOff.date >= datetime(2030, 1, 1).date()),
+        "list_instructor_documents": select(InstructorDocument)
+            .where(InstructorDocument.instructor_id == 1),
+        "list_instructor_cards": select(InstructorProfile)
+            .where(InstructorProfile.approval_status == ApprovalStatus.APPROVED)
+            .order_by(InstructorProfile.id),
+        "list_instructor_cards(agendamentos)": select(Appointment.instructor_id, Appointment.start_date, Appointment.end_date)
+            .where(Appointment.instructor_id.in_([1, 2, 3]))
+            .where(Appointment.start_date < datetime(2030, 1, 15), Appointment.end_date > datetime(2030, 1, 1))
+            .where(Appointment.status != AppointmentStatus.CANCELLED),
+        "list_instructor_cards(exceções)": select(InstructorTimeOff.instructor_id, InstructorTimeOff.date)
+            .where(InstructorTimeOff.instructor_id.in_([1, 2, 3]))
+            .where(InstructorTimeOff.date.between(datetime(2030, 1, 1).date(), datetime(2030, 1, 15).date())),
+    }
+
+
+def find_table_scans(bind, queries=None):
+    """Executar EXPLAIN nas consultas e devolver {nome: plano} das que fazem scan da tabela"""
+    queries = queries or hot_queries()
+    scans = {}
+    with bind.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            # Tabelas pequenas sempre levam a Seq Scan; desligar força o uso de índice quando existe
+            conn.execute(text("SET enable_seqscan = off"))
+        for name, query in queries.items():
+            sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+            if dialect == "sqlite":
+                rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+                plan = [row[-1] for row in rows]
+                # Tabela virtual com restrição (FTS5 MATCH: "INDEX 0:M0") é uma busca no índice, não um scan
+                bad = [
+                    step for step in plan
+                    if step.startswith("SCAN ") and "CONSTANT ROW" not in step
+                    and not re.search(r"VIRTUAL TABLE INDEX \d+:\S", step)
+                ]
+            else:
+                plan = [row[0] for row in conn.execute(text(f"EXPLAIN {sql}")).all()]
+                bad = [step for step in plan if "Seq Scan" in step]
+            if bad:
+                scans[name] = plan
+        conn.rollback()
+    return scans
+
+
+if __name__ == "__main__":
+    if "--check" not in sys.argv:
+        with engine.begin() as conn:
+            ensure_indexes(conn)
+        print("Índices criados")
+        sys.exit(0)
+
+    scans = find_table_scans(engine)
+    for name, plan in scans.items():
+        print(f"SCAN em {name}:")
+        for step in plan:
+            print(f"    {step}")
+    if scans:
+        sys.exit(1)
+    print(f"OK: {len(hot_queries())} consultas usam índices")
@@ -0,0 +1,322 @@
+"""Migrações versionadas do schema do banco de dados.
+
+As migrações são executadas uma única vez, pela linha de comando, e não na
+inicialização dos workers, que apenas conferem a versão gravada no banco:
+
+    python -m app.database.migrations upgrade   # aplica as migrações pendentes
+    python -m app.database.migrations current   # mostra a versão do banco
+    python -m app.database.migrations check     # termina com código 1 se houver pendências
+
+Para criar uma migração, acrescente uma função ao final de MIGRATIONS. Ela
+recebe uma Connection dentro de uma transação e não deve ser alterada depois
+de publicada.
+"""
+import logging
+import sys
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, bindparam, func, inspect, select, text
+from app.database.connection import Base, engine
+from app.search import CITY_FTS_TABLE, normalize_text
+from app.services.booking import OVERLAP_CONSTRAINT
+from app.services.ratings import rebuild_summaries
+
+logger = logging.getLogger(__name__)
+
+# Tabela de controle fora de Base.metadata: não faz parte do modelo da aplicação
+version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class SchemaOutdatedError(RuntimeError):
+    """O banco está em uma versão diferente da esperada pelo código"""
+
+
+def create_base_schema(conn):
+    # Bancos anteriores às migrações já têm parte das tabelas; checkfirst cria só o que falta
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def create_fixed_index(conn, index_name: str, table_name: str, *column_names: str, unique: bool = False):
+    """Criar um índice com a definição gravada na migração, e não a dos modelos atuais"""
+    table = Table(table_name, MetaData(), *(Column(name) for name in column_names))
+    Index(index_name, *(table.c[name] for name in column_names), unique=unique).create(bind=conn, checkfirst=True)
+
+
+def create_composite_indexes(conn):
+    """Índices das listagens e estatísticas existentes na versão 2.
+
+    Índices declarados depois nos modelos são criados pelas próprias migrações
+    (3, 4, 6, 7 e 9), depois das colunas e da limpeza de dados de que dependem.
+    """
+    create_fixed_index(conn, "ix_appointments_instructor_start", "appointments", "instructor_id", "start_date")
+    create_fixed_index(conn, "ix_appointments_student_start", "appointments", "student_id", "start_date")
+    create_fixed_index(conn, "ix_appointments_status_start", "appointments", "status", "start_date")
+    create_fixed_index(
+        conn, "ix_instructor_availability_instructor_day", "instructor_availability",
+        "instructor_id", "day_of_week", "start_time"
+    )
+    create_fixed_index(conn, "ix_instructor_documents_instructor", "instructor_documents", "instructor_id")
+    create_fixed_index(conn, "ix_instructor_profiles_transmission_rate", "instructor_profiles", "transmission", "hourly_rate")
+    create_fixed_index(conn, "ix_instructor_profiles_hourly_rate", "instructor_profiles", "hourly_rate")
+    create_fixed_index(conn, "ix_instructor_profiles_approval_status", "instructor_profiles", "approval_status", "id")
+    # Ainda não único: as exceções repetidas só são removidas na migração 9
+    create_fixed_index(conn, "ix_instructor_time_off_instructor_date", "instructor_time_off", "instructor_id", "date")
+    create_fixed_index(conn, "ix_reviews_instructor_rating", "reviews", "instructor_id", "rating")
+    create_fixed_index(conn, "ix_reviews_instructor_created", "reviews", "instructor_id", "created_at")
+
+
+def create_index(conn, table_name: str, index_name: str):
+    """Criar um índice declarado nos modelos, se ainda não existir"""
+    table = Base.metadata.tables[table_name]
+    index = next(index for index in table.indexes if index.name == index_name)
+    index.create(bind=conn, checkfirst=True)
+
+
+def create_appointments_start_index(conn):
+    create_index(conn, "appointments", "ix_appointments_start")
+
+
+def add_city_normalized(conn):
+    add_column(conn, "instructor_profiles", "city_normalized")
+    # Só as colunas da versão 4: o modelo atual acrescenta updated_at (onupdate) ao UPDATE
+    profiles = Table(
+        "instructor_profiles", MetaData(),
+        Column("id", Integer, primary_key=True), Column("city", String), Column("city_normalized", String)
+    )
+    rows = conn.execute(select(profiles.c.id, profiles.c.city)).all()
+    if rows:
+        conn.execute(
+            profiles.update()
+            .where(profiles.c.id == bindparam("profile_id"))
+            .values(city_normalized=bindparam("normalized")),
+            [{"profile_id": row.id, "normalized": normalize_text(row.city)} for row in rows]
+        )
+    create_index(conn, "instructor_profiles", "ix_instructor_profiles_city_normalized")
+
+
+def sqlite_supports_trigram(conn) -> bool:
+    """FTS5 com o tokenizador trigram exige SQLite 3.34 compilado com FTS5"""
+    version = tuple(int(part) for part in conn.exec_driver_sql("SELECT sqlite_version()").scalar().split("."))
+    options = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+    return version >= (3, 34) and "ENABLE_FTS5" in options
+
+
+def create_city_fuzzy_index(conn):
+    """Índice de trigramas da busca por trecho da cidade (ignorado se o banco não oferece suporte)"""
+    if conn.dialect.name == "sqlite":
+        if not sqlite_supports_trigram(conn):
+            logger.warning("SQLite sem FTS5/trigram; a busca por trecho da cidade usará LIKE sem índice")
+            return
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {CITY_FTS_TABLE} USING fts5("
+            "city_normalized, content='instructor_profiles', content_rowid='id', tokenize='trigram')"
+        )
+        # Triggers mantêm o índice externo em sincronia com instructor_profiles
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {CITY_FTS_TABLE}_ai AFTER INSERT ON instructor_profiles BEGIN "
+            f"INSERT INTO {CITY_FTS_TABLE}(rowid, city_normalized) VALUES (new.id, new.city_normalized); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {CITY_FTS_TABLE}_ad AFTER DELETE ON instructor_profiles BEGIN "
+            f"INSERT INTO {CITY_FTS_TABLE}({CITY_FTS_TABLE}, rowid, city_normalized) "
+            "VALUES ('delete', old.id, old.city_normalized); END"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {CITY_FTS_TABLE}_au AFTER UPDATE OF city_normalized ON instructor_profiles BEGIN "
+            f"INSERT INTO {CITY_FTS_TABLE}({CITY_FTS_TABLE}, rowid, city_normalized) "
+            "VALUES ('delete', old.id, old.city_normalized); "
+            f"INSERT INTO {CITY_FTS_TABLE}(rowid, city_normalized) VALUES (new.id, new.city_normalized); END"
+        )
+        conn.exec_driver_sql(f"INSERT INTO {CITY_FTS_TABLE}({CITY_FTS_TABLE}) VALUES ('rebuild')")
+    elif conn.dialect.name == "postgresql":
+        if not conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar():
+            logger.warning("Extensão pg_trgm indisponível; a busca por trecho da cidade usará LIKE sem índice")
+            return
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_instructor_profiles_city_trgm "
+            "ON instructor_profiles USING gin (city_normalized gin_trgm_ops)"
+        ))
+
+
+def create_rating_summaries(conn):
+    Base.metadata.tables["instructor_rating_summaries"].create(bind=conn, checkfirst=True)
+    rebuild_summaries(conn)
+
+
+def create_appointments_end_index(conn):
+    create_index(conn, "appointments", "ix_appointments_instructor_end")
+
+
+def create_appointments_overlap_constraint(conn):
+    """PostgreSQL: impedir agendamentos sobrepostos do mesmo instrutor (ver app/services/booking.py).
+
+    Falha se já houver sobreposições; elas precisam ser resolvidas (cancelando
+    um dos agendamentos) antes de aplicar a migração. No SQLite a regra é
+    garantida pela trava de escrita durante a reserva.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    conn.execute(text(
+        f"ALTER TABLE appointments ADD CONSTRAINT {OVERLAP_CONSTRAINT} "
+        "EXCLUDE USING gist (instructor_id WITH =, tsrange(start_date, end_date) WITH &&) "
+        "WHERE (status <> 'CANCELLED')"
+    ))
+
+
+def make_time_off_date_unique(conn):
+    """Tornar único o índice (instructor_id, date), descartando exceções repetidas"""
+    conn.execute(text(
+        "DELETE FROM instructor_time_off WHERE id NOT IN "
+        "(SELECT MIN(id) FROM instructor_time_off GROUP BY instructor_id, date)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_instructor_time_off_instructor_date"))
+    create_index(conn, "instructor_time_off", "ix_instructor_time_off_instructor_date")
+
+
+def create_calendar_versions(conn):
+    Base.metadata.tables["calendar_versions"].create(bind=conn, checkfirst=True)
+
+
+def add_row_versions(conn):
+    """version e updated_at das tabelas com requisições condicionais"""
+    now = datetime.utcnow()
+    for table_name in ("users", "instructor_profiles", "appointments", "reviews"):
+        add_column(conn, table_name, "version")
+        add_column(conn, table_name, "updated_at")
+        table = Base.metadata.tables[table_name]
+        # Sem data de alteração conhecida: a de criação, se houver, ou a da migração.
+        # Um UPDATE só: updated_at tem onupdate e seria preenchida por qualquer UPDATE
+        created_at = table.c.get("created_at")
+        updated_at = func.coalesce(created_at, now) if created_at is not None else now
+        conn.execute(
+            table.update()
+            .where(table.c.version.is_(None) | table.c.updated_at.is_(None))
+            .values(version=func.coalesce(table.c.version, 1), updated_at=func.coalesce(table.c.updated_at, updated_at))
+        )
+
+
+def add_calendar_updated_at(conn):
+    # Feeds sem alteração desde a migração usam a data de criação do usuário (ver app/routes/calendar.py)
+    add_column(conn, "calendar_versions", "updated_at")
+
+
+# (versão, descrição, função) em ordem de aplicação
+MIGRATIONS = [
+    (1, "Schema inicial", create_base_schema),
+    (2, "Índices compostos das consultas de listagem", create_composite_indexes),
+    (3, "Índice de agendamentos por data (paginação por cursor)", create_appointments_start_index),
+    (4, "Cidade normalizada dos instrutores", add_city_normalized),
+    (5, "Índice de trigramas da cidade (busca aproximada)", create_city_fuzzy_index),
+    (6, "Resumo de avaliações por instrutor", create_rating_summaries),
+    (7, "Índice de agendamentos por instrutor e término (horários livres)", create_appointments_end_index),
+    (8, "Restrição contra agendamentos sobrepostos (PostgreSQL)", create_appointments_overlap_constraint),
+    (9, "Exceção de agenda única por instrutor e data", make_time_off_date_unique),
+    (10, "Contador de alterações dos feeds iCalendar", create_calendar_versions),
+    (11, "Versão e data de alteração dos registros (requisições condicionais)", add_row_versions),
+    (12, "Data da última alteração dos feeds iCalendar", add_calendar_updated_at),
+]
+
+# Migrações aplicadas também em bancos novos, depois do create_all: objetos que
+# não são declarados nos modelos (tabelas virtuais, triggers, extensões)
+RUN_ON_NEW_DATABASE = {5, 8}
+
+HEAD_VERSION = MIGRATIONS[-1][0]
+
+
+def has_column(conn, table_name: str, column_name: str) -> bool:
+    """Indica se a coluna já existe (útil para migrações em bancos criados do zero)"""
+    return any(column["name"] == column_name for column in inspect(conn).get_columns(table_name))
+
+
+def add_column(conn, table_name: str, column_name: str):
+    """Adicionar ao banco uma coluna declarada nos modelos, se ainda não existir"""
+    if has_column(conn, table_name, column_name):
+        return
+    column = Base.metadata.tables[table_name].c[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+
+
+def current_version(conn) -> int:
+    """Versão do schema gravada no banco (0 se nunca migrado)"""
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())).scalar() or 0
+
+
+def lock_for_migration(conn):
+    """Impedir que dois processos migrem o mesmo banco ao mesmo tempo"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(827361)"))
+    elif conn.dialect.name == "sqlite":
+        # Uma escrita obtém o lock RESERVED; outro processo espera o busy_timeout
+        conn.execute(schema_version.delete().where(schema_version.c.version < 0))
+
+
+def upgrade(bind=engine) -> list:
+    """Aplicar as migrações pendentes e devolver as versões aplicadas"""
+    applied = []
+    with bind.begin() as conn:
+        version_metadata.create_all(bind=conn, checkfirst=True)
+        lock_for_migration(conn)
+        version = current_version(conn)
+
+        # Banco vazio: cria o schema atual de uma vez e marca a versão mais recente
+        if version == 0 and not inspect(conn).has_table("users"):
+            Base.metadata.create_all(bind=conn)
+            pending = [
+                (number, description, migrate if number in RUN_ON_NEW_DATABASE else None)
+                for number, description, migrate in MIGRATIONS
+            ]
+        else:
+            pending = [migration for migration in MIGRATIONS if migration[0] > version]
+
+        for number, description, migrate in pending:
+            if migrate is not None:
+                migrate(conn)
+            conn.execute(schema_version.insert().values(
+                version=number,
+                description=description,
+                applied_at=datetime.utcnow()
+            ))
+            applied.append(number)
+    return applied
+
+
+def check_schema(bind=engine):
+    """Conferir, com uma única consulta, se o banco está na versão esperada"""
+    with bind.connect() as conn:
+        version = current_version(conn)
+    if version != HEAD_VERSION:
+        raise SchemaOutdatedError(
+            f"Schema do banco na versão {version}, esperada {HEAD_VERSION}. "
+            "Execute: python -m app.database.migrations upgrade"
+        )
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "upgrade":
+        applied = upgrade()
+        print(f"Migrações aplicadas: {applied}" if applied else "Banco já está atualizado")
+    elif command == "current":
+        with engine.connect() as conn:
+            print(f"Versão atual: {current_version(conn)} (mais recente: {HEAD_VERSION})")
+    elif command == "check":
+        try:
+            check_schema()
+        except SchemaOutdatedError as error:
+            print(error)
+            sys.exit(1)
+        print(f"Banco atualizado (versão {HEAD_VERSION})")
+    else:
+        print("Uso: python -m app.database.migrations [upgrade|current|check]")
+        sys.exit(2)
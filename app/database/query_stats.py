@@ -0,0 +1,147 @@
+"""Contagem de consultas SQL por requisição e detecção de N+1.
+
+Os eventos do SQLAlchemy são registrados na classe Engine, cobrindo o
+primário, as réplicas e o engine assíncrono. Cada requisição recebe um
+QueryStats (ver QueryStatsMiddleware) guardado em uma ContextVar; fora de uma
+requisição (CLI, migrações) nada é registrado.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("current_stats", default=None)
+
+# Listas de parâmetros (IN com tamanhos variados) viram um único marcador
+PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Forma normalizada da consulta, usada para agrupar execuções repetidas"""
+    return PARAM_LIST.sub("(?)", WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A rota executou mais consultas que o orçamento declarado (modo estrito)"""
+
+
+class QueryStats:
+    """Consultas executadas durante uma requisição"""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = 2) -> dict:
+        """{consulta normalizada: execuções} das que se repetiram ao menos `threshold` vezes"""
+        repeated = {}
+        for statement, count in self.statements.items():
+            if count < threshold:
+                continue
+            key = fingerprint(statement)
+            repeated[key] = repeated.get(key, 0) + count
+        return repeated
+
+    def repeated_count(self) -> int:
+        """Execuções além da primeira de cada consulta"""
+        return sum(count - 1 for count in self.statements.values())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        stats.record(statement, time.perf_counter() - start_times.pop())
+
+
+def query_budget(max_queries: Optional[int]):
+    """Declarar o número máximo de consultas de uma rota.
+
+    Aplicar abaixo do decorador da rota:
+
+        @router.get("/...")
+        @query_budget(3)
+        async def handler(...):
+
+    None dispensa a rota do orçamento padrão (ex.: importações, cujas
+    consultas crescem com o tamanho do arquivo).
+    """
+    def decorator(func):
+        func.query_budget = max_queries
+        return func
+    return decorator
+
+
+class RouteQueryMetrics:
+    """Totais agregados por rota desde o início do processo"""
+
+    __slots__ = ("requests", "queries", "duration", "max_queries", "n_plus_one", "over_budget")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.duration = 0.0
+        self.max_queries = 0
+        self.n_plus_one = 0
+        self.over_budget = 0
+
+
+class QueryMetricsRegistry:
+    def __init__(self):
+        self.routes = {}
+        self.lock = threading.Lock()
+
+    def observe(self, route: str, stats: QueryStats, n_plus_one: bool, over_budget: bool):
+        with self.lock:
+            metrics = self.routes.get(route)
+            if metrics is None:
+                metrics = self.routes[route] = RouteQueryMetrics()
+            metrics.requests += 1
+            metrics.queries += stats.count
+            metrics.duration += stats.duration
+            metrics.max_queries = max(metrics.max_queries, stats.count)
+            metrics.n_plus_one += n_plus_one
+            metrics.over_budget += over_budget
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                route: {
+                    "requests": metrics.requests,
+                    "queries": metrics.queries,
+                    "avg_queries": round(metrics.queries / metrics.requests, 2),
+                    "max_queries": metrics.max_queries,
+                    "db_time_ms": round(metrics.duration * 1000, 3),
+                    "n_plus_one_requests": metrics.n_plus_one,
+                    "over_budget_requests": metrics.over_budget,
+                }
+                for route, metrics in sorted(self.routes.items())
+            }
+
+
+query_metrics = QueryMetricsRegistry()
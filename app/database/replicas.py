@@ -0,0 +1,97 @@
+import itertools
+import time
+from contextlib import asynccontextmanager
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database.connection import (
+    build_async_engine,
+    build_engine_options,
+    configure_engine,
+    open_session,
+    to_sync_url,
+    AsyncSessionLocal,
+    SessionLocal,
+)
+
+# Cookie gravado após escritas: enquanto válido, as leituras do cliente vão ao primário
+STICKY_COOKIE = "db_primary_until"
+
+
+def read_only(func):
+    """Marcar uma rota POST que não grava (ex.: leituras em lote), para que não grave STICKY_COOKIE.
+
+    Aplicar abaixo do decorador da rota, como query_budget.
+    """
+    func.read_only = True
+    return func
+
+
+class Replica:
+    """Engine e fábrica de sessões de uma réplica de leitura"""
+
+    def __init__(self, database_url: str):
+        self.async_factory = None
+        self.sync_factory = None
+        if settings.async_db:
+            self.engine = build_async_engine(database_url)
+            self.pool = self.engine.sync_engine.pool
+            self.async_factory = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        else:
+            url = to_sync_url(database_url)
+            self.engine = configure_engine(create_engine(url, **build_engine_options(url)))
+            self.pool = self.engine.pool
+            self.sync_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def checked_out(self) -> int:
+        """Conexões em uso no pool da réplica"""
+        checkedout = getattr(self.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+
+class ReplicaSet:
+    """Seleciona a réplica de cada leitura (round-robin ou menos conexões em uso)"""
+
+    def __init__(self, urls, strategy: str = "round_robin"):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Estratégia de réplica inválida: {strategy}")
+        self.replicas = [Replica(url) for url in urls]
+        self.strategy = strategy
+        self._counter = itertools.count()
+
+    def choose(self) -> Replica:
+        if self.strategy == "least_connections":
+            return min(self.replicas, key=lambda replica: replica.checked_out())
+        return self.replicas[next(self._counter) % len(self.replicas)]
+
+
+replica_set = ReplicaSet(settings.database_replica_urls, settings.replica_strategy)
+
+
+def is_sticky(request: Request) -> bool:
+    """Indica se o cliente escreveu recentemente e deve ler do primário"""
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+@asynccontextmanager
+async def open_read_session(request: Request):
+    """Sessão de leitura (réplica, quando configurada) fora do ciclo das dependências"""
+    if not replica_set.replicas or is_sticky(request):
+        async with open_session(AsyncSessionLocal, SessionLocal) as db:
+            yield db
+        return
+
+    replica = replica_set.choose()
+    async with open_session(replica.async_factory, replica.sync_factory) as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """Dependency para obter sessão de leitura (réplica, quando configurada)"""
+    async with open_read_session(request) as db:
+        yield db
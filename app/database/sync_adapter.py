@@ -0,0 +1,86 @@
+from starlette.concurrency import run_in_threadpool
+
+# Mesma opção que a AsyncSession usa: os resultados chegam já carregados em memória,
+# então iterá-los no event loop não faz I/O
+PREBUFFER = {"prebuffer_rows": True}
+
+
+class ThreadedSession:
+    """Expõe a interface de AsyncSession usada pelas rotas sobre uma Session síncrona.
+
+    Cada operação de I/O é executada no threadpool, o que mantém o modo
+    síncrono (settings.async_db = False) funcionando com os mesmos handlers.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, execution_options=None, **kw):
+        options = {**PREBUFFER, **(execution_options or {})}
+        return await run_in_threadpool(
+            self.sync_session.execute, statement, params, execution_options=options, **kw
+        )
+
+    async def stream(self, statement, params=None, execution_options=None, **kw):
+        """Como AsyncSession.stream: as linhas são lidas do cursor aos poucos, no threadpool"""
+        options = {"stream_results": True, **(execution_options or {})}
+        result = await run_in_threadpool(
+            self.sync_session.execute, statement, params, execution_options=options, **kw
+        )
+        return ThreadedStreamResult(result)
+
+    async def scalar(self, statement, params=None, **kw):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kw)
+
+    async def scalars(self, statement, params=None, **kw):
+        result = await self.execute(statement, params, **kw)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kw):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kw)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None):
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        # Executado no event loop: só devolve a conexão ao pool, e não pode depender
+        # de uma thread livre quando o threadpool está ocupado esperando conexões
+        self.sync_session.close()
+
+
+class ThreadedStreamResult:
+    """Parte da interface de AsyncResult (keys, partitions) sobre um Result síncrono"""
+
+    def __init__(self, result):
+        self.result = result
+
+    def keys(self):
+        return self.result.keys()
+
+    async def partitions(self, size: int):
+        try:
+            while True:
+                rows = await run_in_threadpool(self.result.fetchmany, size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            self.result.close()
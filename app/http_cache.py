@@ -0,0 +1,172 @@
+"""Requisições condicionais (ETag / If-None-Match / If-Modified-Since / If-Match).
+
+Usuários, perfis de instrutor, agendamentos e avaliações têm as colunas
+version (incrementada pelo SQLAlchemy a cada UPDATE, ver version_id_col nos
+modelos) e updated_at. O ETag de um registro combina as duas, e o de uma
+listagem é um hash de (id, version, updated_at) das linhas da página. Assim
+as rotas decidem o 304 com uma consulta só dessas colunas, sem carregar os
+objetos nem serializar a resposta.
+
+Respostas parciais (fields=, ver app/sparse_fields.py) são outra
+representação: o ETag leva o sufixo variant. If-Match compara sempre com o
+ETag da representação completa. O sufixo de codificação que a compressão
+acrescenta ao ETag (app/middleware/compression.py) é retirado antes de
+qualquer comparação.
+"""
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import select
+from app.middleware.compression import strip_encoding_suffix
+from app.pagination import build_page, page_statement
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Indica se o If-None-Match cobre o ETag (comparação fraca, como a RFC 9110 pede para GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(strip_encoding_suffix(tag.strip().removeprefix("W/")) == etag for tag in if_none_match.split(","))
+
+
+def entity_etag(entity, variant: Optional[str] = None) -> str:
+    """ETag de um registro (objeto ORM ou linha com version e updated_at)"""
+    # updated_at distingue um registro novo que reaproveitou o id de um removido
+    updated_at = f"{entity.updated_at:%Y%m%d%H%M%S%f}" if entity.updated_at else "0"
+    if variant:
+        return f'"{entity.version}-{updated_at}-{variant}"'
+    return f'"{entity.version}-{updated_at}"'
+
+
+def page_etag(items, next_cursor: Optional[str] = None, variant: Optional[str] = None) -> str:
+    """ETag de uma página: muda se uma linha for alterada, incluída ou removida"""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(f"{item.id}:{entity_etag(item)};".encode())
+    digest.update((next_cursor or "").encode())
+    if variant:
+        digest.update(f";{variant}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def body_etag(body: bytes) -> str:
+    """ETag de uma resposta já serializada (ex.: guardada em cache)"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    """Data no formato de Last-Modified (as colunas guardam UTC sem fuso)"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def is_fresh(request: Request, etag: str, updated_at: Optional[datetime] = None) -> bool:
+    """Indica se a cópia do cliente ainda vale; If-None-Match tem precedência sobre If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or updated_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # Last-Modified tem resolução de segundos
+    return updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def cache_headers(etag: str, updated_at: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag}
+    if updated_at is not None:
+        headers["Last-Modified"] = http_date(updated_at)
+    return headers
+
+
+def not_modified(etag: str, updated_at: Optional[datetime] = None, **headers) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**cache_headers(etag, updated_at), **headers})
+
+
+def set_entity_headers(response: Response, entity, variant: Optional[str] = None):
+    """Acrescentar ETag e Last-Modified de um registro à resposta"""
+    response.headers.update(cache_headers(entity_etag(entity, variant), entity.updated_at))
+
+
+def check_if_match(request: Request, entity):
+    """Levantar HTTPException (412) se o If-Match não corresponder à versão atual do registro.
+
+    A comparação é forte, como a RFC 9110 pede para If-Match. O UPDATE ainda
+    confere a versão lida (version_id_col), então uma alteração concorrente
+    entre esta verificação e o commit também é recusada.
+    """
+    if_match = request.headers.get("if-match")
+    if not if_match or if_match.strip() == "*":
+        return
+    etag = entity_etag(entity)
+    if not any(strip_encoding_suffix(tag.strip()) == etag for tag in if_match.split(",")):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="O registro foi alterado desde a versão informada em If-Match"
+        )
+
+
+async def check_not_modified(db, request: Request, model, *criteria, variant: Optional[str] = None) -> Optional[Response]:
+    """304 se a cópia do cliente do registro ainda vale, lendo só id, version e updated_at; senão None"""
+    if not is_conditional(request):
+        return None
+    result = await db.execute(select(model.id, model.version, model.updated_at).where(*criteria))
+    versions = result.first()
+    if versions is None:
+        return None
+    etag = entity_etag(versions, variant)
+    if is_fresh(request, etag, versions.updated_at):
+        return not_modified(etag, versions.updated_at)
+    return None
+
+
+def version_statement(statement, model, *extra_columns):
+    """A mesma consulta de uma listagem, trazendo só as colunas do ETag (e as de ordenação)"""
+    columns = [model.id, model.version, model.updated_at]
+    columns += [column for column in extra_columns if not any(column is existing for existing in columns)]
+    return statement.with_only_columns(*columns)
+
+
+async def conditional_list(
+    db, request: Request, response: Response, model, query, order_by, cursor, skip, limit,
+    options=(), variant: Optional[str] = None
+):
+    """Executar uma listagem (por cursor ou skip/limit) com ETag.
+
+    Com If-None-Match, a página é lida antes só com as colunas do ETag; se o
+    cliente já a tem, a resposta é 304 sem carregar os objetos. Listagens não
+    têm Last-Modified: a maior updated_at não muda quando uma linha é removida.
+    options (ex.: load_only) valem só para a consulta dos objetos.
+    """
+    if cursor is not None:
+        statement = page_statement(query, order_by, cursor, limit)
+        shape = lambda rows: build_page(rows, order_by, limit)
+        etag_of = lambda page: page_etag(page["items"], page["next_cursor"], variant)
+    else:
+        statement = query.offset(skip).limit(limit)
+        shape = list
+        etag_of = lambda items: page_etag(items, variant=variant)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        rows = await db.execute(version_statement(statement, model, *order_by))
+        etag = etag_of(shape(rows.all()))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    result = shape((await db.scalars(statement.options(*options))).all())
+    response.headers["ETag"] = etag_of(result)
+    return result
@@ -0,0 +1,145 @@
+"""Métricas no formato do Prometheus, expostas em GET /metrics.
+
+Com vários workers (uvicorn --workers N, gunicorn), defina a variável de
+ambiente PROMETHEUS_MULTIPROC_DIR apontando para um diretório vazio antes de
+iniciar o servidor: cada processo grava seus valores ali e /metrics soma os de
+todos os workers.
+"""
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000, 5000000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requisições HTTP atendidas",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Tempo de resposta das requisições HTTP",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Tamanho do corpo das respostas HTTP",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Histogram(
+    "db_queries_per_request",
+    "Consultas SQL executadas por requisição",
+    ["route"],
+    buckets=QUERY_BUCKETS,
+)
+DB_QUERY_TIME = Histogram(
+    "db_query_time_per_request_seconds",
+    "Tempo total de banco por requisição",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Espera para obter uma conexão do pool",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Conexões retiradas do pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+THREADPOOL_IN_USE = Gauge(
+    "threadpool_tokens_in_use",
+    "Threads do threadpool do AnyIO ocupadas (rotas síncronas, ASYNC_DB=false, uploads)",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_TOTAL = Gauge(
+    "threadpool_tokens_total",
+    "Tamanho do threadpool do AnyIO",
+    multiprocess_mode="livesum",
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Consultas aos caches em memória (app/cache.py) por resultado: hit, miss ou bypass",
+    ["cache", "result"],
+)
+
+def pool_name(engine) -> str:
+    """Rótulo do pool: host/banco (ou o arquivo, no SQLite)"""
+    url = engine.url
+    return f"{url.host}/{url.database}" if url.host else str(url.database)
+
+
+def instrument_pool(engine):
+    """Medir a espera por conexões e as conexões em uso no pool do engine.
+
+    Tudo fica registrado no engine, não no pool: engine.dispose() troca o pool
+    e as medições seguem no novo.
+    """
+    name = pool_name(engine)
+    wait = DB_POOL_CHECKOUT.labels(name)
+    in_use = DB_POOL_IN_USE.labels(name)
+
+    # O pool não tem evento anterior ao checkout; envolver raw_connection(), que
+    # toda Connection chama para obter a conexão do pool, mede a espera
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        in_use.inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        in_use.dec()
+
+    return engine
+
+
+def render_metrics():
+    """Conteúdo e content-type da resposta de /metrics"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped():
+    """Descartar os gauges "live" deste processo ao encerrar o worker"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
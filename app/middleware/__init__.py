@@ -0,0 +1,6 @@
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+
+__all__ = ["CompressionMiddleware", "MetricsMiddleware", "QueryStatsMiddleware", "ReadYourWritesMiddleware"]
@@ -0,0 +1,235 @@
+"""Compressão das respostas negociada pelo Accept-Encoding (zstd, br, gzip).
+
+gzip usa o zlib da biblioteca padrão; br e zstd usam os pacotes brotli e
+zstandard (requirements.txt). Em um ambiente sem eles, a codificação
+correspondente só deixa de ser oferecida. Respostas menores que
+minimum_size, já codificadas (Content-Encoding) ou de tipos que já são
+comprimidos (imagens, vídeo, PDF, zip) seguem sem alteração.
+
+Respostas com mais de uma parte (StreamingResponse, ex.: exportações) são
+comprimidas parte a parte, com um flush a cada parte, para que o cliente
+receba os dados à medida que são gerados.
+
+A representação comprimida é outra representação do recurso: o ETag ganha o
+sufixo da codificação ("...-gzip"), para que um cache não confirme (304) nem
+entregue os bytes de uma codificação no lugar de outra. Antes de comparar
+If-None-Match / If-Match com o ETag da rota, app/http_cache.py retira o
+sufixo (strip_encoding_suffix).
+"""
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # br deixa de ser oferecida
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd deixa de ser oferecida
+    zstandard = None
+
+# Tipos que já chegam comprimidos: comprimir de novo só gasta CPU
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/pdf",
+    "application/zstd",
+    "application/octet-stream",
+    "text/event-stream",
+)
+# image/svg+xml é texto
+COMPRESSIBLE_EXCEPTIONS = ("image/svg+xml",)
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self.compressor.process(data) + self.compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush()
+
+
+ENCODERS = {
+    "zstd": ZstdEncoder if zstandard is not None else None,
+    "br": BrotliEncoder if brotli is not None else None,
+    "gzip": GzipEncoder,
+}
+
+
+def available_encodings(encodings) -> list:
+    """Codificações pedidas na configuração cujo pacote está instalado, na ordem de preferência"""
+    return [name for name in encodings if ENCODERS.get(name) is not None]
+
+
+def choose_encoding(accept_encoding: str, encodings) -> str:
+    """Codificação com maior q aceita pelo cliente (empate: a ordem de encodings); None = sem compressão"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name] = quality
+    best, best_quality = None, 0.0
+    for name in encodings:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag da representação comprimida: sufixo -<codificação> dentro das aspas (W/ é mantido)"""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_encoding_suffix(etag: str) -> str:
+    """ETag sem o sufixo de codificação acrescentado por encoded_etag"""
+    for name in ENCODERS:
+        suffix = f'-{name}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(COMPRESSIBLE_EXCEPTIONS):
+        return True
+    return not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Comprime o corpo das respostas HTTP com a codificação aceita pelo cliente.
+
+    levels: nível de cada codificação, ex.: {"gzip": 6, "br": 4, "zstd": 3}.
+    """
+
+    def __init__(self, app, encodings=("zstd", "br", "gzip"), minimum_size: int = 1024, levels=None):
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                # O início só é enviado com o primeiro pedaço do corpo, quando se sabe o tamanho
+                start = message
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not is_compressible(headers.get("content-type", ""))
+                )
+                if message["status"] == 304:
+                    # O cliente revalidou a cópia comprimida: o 304 confirma o ETag que ele guardou
+                    etag = headers.get("etag")
+                    if etag and encoded_etag(etag, encoding) in request_headers.get("if-none-match", ""):
+                        mutable = MutableHeaders(scope=message)
+                        mutable["ETag"] = encoded_etag(etag, encoding)
+                        mutable.add_vary_header("Accept-Encoding")
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                headers.add_vary_header("Accept-Encoding")
+                length = headers.get("content-length")
+                small = len(body) < self.minimum_size if not more_body else (
+                    length is not None and int(length) < self.minimum_size
+                )
+                if small:
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = ENCODERS[encoding](self.levels[encoding])
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if more_body:
+                    # Tamanho final desconhecido: o corpo segue em partes (chunked)
+                    del headers["content-length"]
+                    await send(start)
+                    start = None
+                else:
+                    data = encoder.finish(body)
+                    headers["Content-Length"] = str(len(data))
+                    await send(start)
+                    start = None
+                    await send({"type": "http.response.body", "body": data})
+                    return
+
+            data = encoder.compress(body) if more_body else encoder.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+        # Resposta sem corpo (nenhuma mensagem http.response.body)
+        if start is not None:
+            await send(start)
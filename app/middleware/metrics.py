@@ -0,0 +1,93 @@
+import asyncio
+import time
+from anyio.to_thread import current_default_thread_limiter
+from app.database.query_stats import current_stats
+from app.metrics import (
+    DB_QUERIES,
+    DB_QUERY_TIME,
+    HTTP_IN_PROGRESS,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    HTTP_RESPONSE_SIZE,
+    THREADPOOL_IN_USE,
+    THREADPOOL_TOTAL,
+)
+from app.middleware.query_stats import route_template
+
+
+class MetricsMiddleware:
+    """Registra contagem, latência, tamanho da resposta e requisições em andamento.
+
+    As séries são rotuladas pelo template da rota, nunca pelo caminho com os
+    IDs, para manter a cardinalidade fixa. Deve ficar dentro do
+    QueryStatsMiddleware (adicionado antes dele) para registrar também as
+    consultas SQL de cada requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # Filhos por rótulo, para não repetir a busca de labels() a cada requisição
+        self.in_progress = {}
+        self.series = {}
+        # O limitador do threadpool é por event loop; a busca custa mais que as métricas
+        self.loop = None
+        self.limiter = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = self.in_progress.get(method)
+        if in_progress is None:
+            in_progress = self.in_progress[method] = HTTP_IN_PROGRESS.labels(method)
+
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.limiter = current_default_thread_limiter()
+            THREADPOOL_TOTAL.set(self.limiter.total_tokens)
+        THREADPOOL_IN_USE.set(self.limiter.borrowed_tokens)
+
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            self.observe(method, route_template(scope), status_code, duration, size)
+
+    def observe(self, method: str, route: str, status_code: int, duration: float, size: int):
+        key = (method, route, status_code)
+        series = self.series.get(key)
+        if series is None:
+            status = str(status_code)
+            series = self.series[key] = (
+                HTTP_REQUESTS.labels(method, route, status),
+                HTTP_LATENCY.labels(method, route, status),
+                HTTP_RESPONSE_SIZE.labels(method, route),
+                DB_QUERIES.labels(route),
+                DB_QUERY_TIME.labels(route),
+            )
+        requests, latency, response_size, queries, query_time = series
+        requests.inc()
+        latency.observe(duration)
+        response_size.observe(size)
+
+        stats = current_stats.get()
+        if stats is not None:
+            queries.observe(stats.count)
+            query_time.observe(stats.duration)
@@ -0,0 +1,82 @@
+import logging
+from starlette.datastructures import MutableHeaders
+from app.database.query_stats import QueryBudgetExceeded, QueryStats, current_stats, query_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def route_template(scope) -> str:
+    """Caminho da rota com os parâmetros (ex.: /appointments/{appointment_id})"""
+    route = scope.get("route")
+    return route.path if route is not None else "<unmatched>"
+
+
+class QueryStatsMiddleware:
+    """Conta as consultas SQL de cada requisição e agrega os totais por rota.
+
+    Consultas idênticas repetidas `n_plus_one_threshold` vezes ou mais na mesma
+    requisição são registradas como suspeita de N+1. Rotas marcadas com
+    @query_budget que excederem o orçamento geram um aviso ou, no modo
+    estrito, um erro 500 (QueryBudgetExceeded), para falhar os testes.
+    """
+
+    def __init__(
+        self,
+        app,
+        headers: bool = False,
+        n_plus_one_threshold: int = 3,
+        strict: bool = False,
+        default_budget: int = None
+    ):
+        self.app = app
+        self.headers = headers
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.strict = strict
+        self.default_budget = default_budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            template = route_template(scope)
+            repeated = stats.repeated(self.n_plus_one_threshold)
+            if repeated:
+                logger.warning(
+                    "Possível N+1 em %s %s: %s",
+                    scope["method"], template,
+                    "; ".join(f"{count}x {statement}" for statement, count in repeated.items())
+                )
+
+            budget = getattr(scope.get("endpoint"), "query_budget", self.default_budget)
+            over_budget = budget is not None and stats.count > budget
+            query_metrics.observe(template, stats, bool(repeated), over_budget)
+            if over_budget:
+                message = f"{scope['method']} {template} executou {stats.count} consultas (orçamento: {budget})"
+                if self.strict:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                finish()
+                if self.headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["x-db-query-count"] = str(stats.count)
+                    headers["x-db-time-ms"] = f"{stats.duration * 1000:.3f}"
+                    headers["x-db-repeated-queries"] = str(stats.repeated_count())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
@@ -0,0 +1,36 @@
+import time
+from starlette.datastructures import MutableHeaders
+from app.database.replicas import STICKY_COOKIE
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReadYourWritesMiddleware:
+    """Após uma escrita bem-sucedida, direciona as leituras do cliente ao primário.
+
+    Grava o cookie STICKY_COOKIE com o instante até o qual get_read_db deve
+    ignorar as réplicas, cobrindo o atraso de replicação. Rotas marcadas com
+    read_only (app/database/replicas.py) não contam como escrita.
+    """
+
+    def __init__(self, app, window_seconds: int):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            read_only = getattr(scope.get("endpoint"), "read_only", False)
+            if message["type"] == "http.response.start" and message["status"] < 400 and not read_only:
+                until = int(time.time()) + self.window_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={until}; Max-Age={self.window_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -4,7 +4,9 @@ from app.models.instructor_availability import InstructorAvailability
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.instructor_time_off import InstructorTimeOff
 from app.models.review import Review
+from app.models.instructor_rating_summary import InstructorRatingSummary
 from app.models.instructor_document import InstructorDocument, DocumentType
+from app.models.calendar_version import CalendarVersion
 
 __all__ = [
     "User",
@@ -17,6 +19,8 @@ __all__ = [
     "AppointmentStatus",
     "InstructorTimeOff",
     "Review",
+    "InstructorRatingSummary",
     "InstructorDocument",
-    "DocumentType"
+    "DocumentType",
+    "CalendarVersion"
 ]
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from datetime import datetime
 import enum
 from app.database import Base
 
@@ -24,6 +25,22 @@ class Appointment(Base):
     status = Column(Enum(AppointmentStatus), default=AppointmentStatus.PENDING)
     location_pickup = Column(String(255))
     notes = Column(Text)
+    # Versão e data da última alteração (requisições condicionais, ver app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # O SQLAlchemy incrementa version a cada UPDATE e recusa o UPDATE se a versão lida mudou
+    __mapper_args__ = {"version_id_col": version}
+    
+    # Índices para os filtros de list_appointments (ordenados por data de início)
+    __table_args__ = (
+        Index("ix_appointments_instructor_start", "instructor_id", "start_date"),
+        Index("ix_appointments_student_start", "student_id", "start_date"),
+        Index("ix_appointments_status_start", "status", "start_date"),
+        Index("ix_appointments_start", "start_date"),
+        # Agendamentos que terminam depois de uma data (horários livres do instrutor)
+        Index("ix_appointments_instructor_end", "instructor_id", "end_date", "start_date", "status"),
+    )
     
     # Relacionamentos
     student = relationship("User", foreign_keys=[student_id], back_populates="student_appointments")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Integer
+from app.database import Base
+
+
+class CalendarVersion(Base):
+    """Contador de alterações do feed iCalendar de um usuário (ver app/services/calendar.py)"""
+    __tablename__ = "calendar_versions"
+    
+    # Sem chave estrangeira: o contador sobrevive à remoção do usuário, então um
+    # id reaproveitado continua a contagem e nunca repete um ETag antigo
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
+    # Momento do último incremento (UTC): DTSTAMP dos eventos do feed
+    updated_at = Column(DateTime, nullable=True)
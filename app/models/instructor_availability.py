@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Time, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Time, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -14,5 +14,9 @@ class InstructorAvailability(Base):
     end_time = Column(Time, nullable=False)
     is_active = Column(Boolean, default=True)
     
+    __table_args__ = (
+        Index("ix_instructor_availability_instructor_day", "instructor_id", "day_of_week", "start_time"),
+    )
+    
     # Relacionamento
     instructor = relationship("InstructorProfile", back_populates="availability")
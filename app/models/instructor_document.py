@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -28,5 +28,9 @@ class InstructorDocument(Base):
     original_filename = Column(String(255))
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_instructor_documents_instructor", "instructor_id"),
+    )
+    
     # Relacionamento
     instructor = relationship("InstructorProfile", back_populates="documents")
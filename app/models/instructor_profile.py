@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, Enum, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, Enum, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 import enum
 from app.database import Base
+from app.search import normalize_text
 
 
 class TransmissionType(str, enum.Enum):
@@ -31,12 +32,37 @@ class InstructorProfile(Base):
     car_model = Column(String(100))
     transmission = Column(Enum(TransmissionType), nullable=False)
     city = Column(String(100), nullable=False)
+    city_normalized = Column(String(100))  # Cidade sem acentos e em minúsculas, usada na busca
     approval_status = Column(Enum(ApprovalStatus), default=ApprovalStatus.PENDING)
     approval_date = Column(DateTime)
     rejection_reason = Column(Text)  # Motivo da rejeição (se aplicável)
+    # Versão e data da última alteração (requisições condicionais, ver app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # O SQLAlchemy incrementa version a cada UPDATE e recusa o UPDATE se a versão lida mudou
+    __mapper_args__ = {"version_id_col": version}
+    
+    # Índices da busca de instrutores e das listagens de aprovação
+    __table_args__ = (
+        Index("ix_instructor_profiles_transmission_rate", "transmission", "hourly_rate"),
+        Index("ix_instructor_profiles_hourly_rate", "hourly_rate"),
+        Index("ix_instructor_profiles_approval_status", "approval_status", "id"),
+        Index(
+            "ix_instructor_profiles_city_normalized",
+            "city_normalized",
+            postgresql_ops={"city_normalized": "text_pattern_ops"}
+        ),
+    )
     
     # Relacionamentos
     user = relationship("User", back_populates="instructor_profile")
     availability = relationship("InstructorAvailability", back_populates="instructor", cascade="all, delete-orphan")
     time_off = relationship("InstructorTimeOff", back_populates="instructor", cascade="all, delete-orphan")
     documents = relationship("InstructorDocument", back_populates="instructor", cascade="all, delete-orphan")
+    
+    @validates("city")
+    def update_city_normalized(self, key, city):
+        """Manter city_normalized em sincronia com city (criação e atualização)"""
+        self.city_normalized = normalize_text(city)
+        return city
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
+from app.database import Base
+
+
+class InstructorRatingSummary(Base):
+    """Resumo das avaliações de um instrutor, atualizado junto com cada review"""
+    __tablename__ = "instructor_rating_summaries"
+    
+    instructor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+    total_reviews = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    average_rating = Column(Float, nullable=False, default=0.0)
+    
+    # Ordenação de instrutores pela média
+    __table_args__ = (
+        Index("ix_instructor_rating_summaries_average", "average_rating"),
+    )
+    
+    def rating_distribution(self) -> dict:
+        return {rating: getattr(self, f"rating_{rating}") for rating in range(1, 6)}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -12,5 +12,10 @@ class InstructorTimeOff(Base):
     date = Column(Date, nullable=False)
     reason = Column(String(255))
     
+    __table_args__ = (
+        # Um dia bloqueado por instrutor; o índice também atende as buscas por período
+        Index("ix_instructor_time_off_instructor_date", "instructor_id", "date", unique=True),
+    )
+    
     # Relacionamento
     instructor = relationship("InstructorProfile", back_populates="time_off")
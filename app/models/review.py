@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -15,10 +15,19 @@ class Review(Base):
     rating = Column(Integer, nullable=False)  # 1 a 5 estrelas
     comment = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Versão e data da última alteração (requisições condicionais, ver app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # O SQLAlchemy incrementa version a cada UPDATE e recusa o UPDATE se a versão lida mudou
+    __mapper_args__ = {"version_id_col": version}
     
     # Constraint para garantir rating entre 1 e 5
+    # (instructor_id, rating) cobre a média e a distribuição das estatísticas sem ler a tabela
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating_range'),
+        Index("ix_reviews_instructor_rating", "instructor_id", "rating"),
+        Index("ix_reviews_instructor_created", "instructor_id", "created_at"),
     )
     
     # Relacionamentos
@@ -24,6 +24,12 @@ class User(Base):
     phone = Column(String(20))
     profile_photo = Column(String(500))  # Caminho da foto de perfil
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Versão e data da última alteração (requisições condicionais, ver app/http_cache.py)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # O SQLAlchemy incrementa version a cada UPDATE e recusa o UPDATE se a versão lida mudou
+    __mapper_args__ = {"version_id_col": version}
     
     # Relacionamentos
     instructor_profile = relationship("InstructorProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
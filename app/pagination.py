@@ -0,0 +1,88 @@
+"""Paginação por cursor (keyset) das listagens.
+
+O cursor é opaco para o cliente: codifica os valores da chave de ordenação
+(sempre terminada no id) do último item da página. A próxima página continua
+a partir dele com um WHERE sobre o índice, em vez de OFFSET, então o custo não
+cresce com a profundidade e inserções concorrentes não duplicam nem pulam
+linhas.
+"""
+import base64
+import json
+from datetime import date, datetime
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+CURSOR_DESCRIPTION = (
+    "Cursor da página (next_cursor da resposta anterior; vazio para a primeira página). "
+    "Quando informado, a resposta vem no formato {items, next_cursor} e skip é ignorado"
+)
+
+
+def encode_cursor(values) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    """Valores do cursor convertidos para os tipos das colunas de ordenação"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if python_type in (datetime, date):
+                decoded.append(python_type.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        return decoded
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def after(columns, values):
+    """Condição "depois de values" na ordem de columns.
+
+    Usa comparação de tuplas, (a, b) > (x, y), que o SQLite e o PostgreSQL
+    resolvem como um intervalo do índice; a forma expandida com OR faz o
+    SQLite percorrer o índice desde o início.
+    """
+    if len(columns) == 1:
+        return columns[0] > values[0]
+    return tuple_(*columns) > tuple_(*values)
+
+
+def page_statement(query, order_by, cursor: str, limit: int):
+    """Consulta de uma página a partir do cursor (com um item a mais)"""
+    if limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O limite deve ser maior que zero"
+        )
+    if cursor:
+        query = query.where(after(order_by, decode_cursor(cursor, order_by)))
+
+    # Um item a mais indica se existe próxima página sem uma consulta COUNT
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def build_page(items, order_by, limit: int) -> dict:
+    """Página {items, next_cursor} a partir das linhas de page_statement (objetos ou Rows)"""
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in order_by])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def paginate(db, query, order_by, cursor: str, limit: int) -> dict:
+    """Executar query a partir do cursor e montar a página {items, next_cursor}"""
+    result = await db.scalars(page_statement(query, order_by, cursor, limit))
+    return build_page(result.all(), order_by, limit)
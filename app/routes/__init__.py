@@ -6,6 +6,8 @@ from app.routes.instructor_time_off import router as instructor_time_off_router
 from app.routes.reviews import router as reviews_router
 from app.routes.instructor_approval import router as instructor_approval_router
 from app.routes.uploads import router as uploads_router
+from app.routes.imports import router as imports_router
+from app.routes.calendar import router as calendar_router
 
 __all__ = [
     "users_router",
@@ -15,5 +17,7 @@ __all__ = [
     "instructor_time_off_router",
     "reviews_router",
     "instructor_approval_router",
-    "uploads_router"
+    "uploads_router",
+    "imports_router",
+    "calendar_router"
 ]
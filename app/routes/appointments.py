@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
+from datetime import date, datetime, time
+from app.batch import IDS_DESCRIPTION, fetch_batch, parse_ids
+from app.database import get_db, get_read_db, open_read_session, read_only
+from app.database.query_stats import query_budget
+from app.http_cache import check_if_match, check_not_modified, conditional_list, set_entity_headers
 from app.models import Appointment, User, UserRole, AppointmentStatus
-from app.schemas import AppointmentCreate, AppointmentUpdate, AppointmentResponse
+from app.pagination import CURSOR_DESCRIPTION
+from app.schemas import AppointmentCreate, AppointmentUpdate, AppointmentResponse, Page, Batch, BatchRequest
+from app.serialization import fast_json
+from app.sparse_fields import FIELDS_DESCRIPTION, parse_fields
+from app.services.booking import check_conflicts, check_schedule, commit_booking, schedule_lock
+from app.services.calendar import touch_calendars
+from app.services.export import export_response
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
 
 @router.post("/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
-def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get_db)):
+async def create_appointment(appointment: AppointmentCreate, db: AsyncSession = Depends(get_db)):
     """Criar um novo agendamento"""
     # Verificar se aluno existe e é do tipo student
-    student = db.query(User).filter(User.id == appointment.student_id).first()
+    student = await db.get(User, appointment.student_id)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -25,7 +37,7 @@ def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get
         )
     
     # Verificar se instrutor existe e é do tipo instructor
-    instructor = db.query(User).filter(User.id == appointment.instructor_id).first()
+    instructor = await db.get(User, appointment.instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,103 +49,233 @@ def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get
             detail="Usuário não é um instrutor"
         )
     
-    # Criar agendamento
-    db_appointment = Appointment(**appointment.model_dump())
-    db.add(db_appointment)
-    db.commit()
-    db.refresh(db_appointment)
+    # Verificar grade, exceções e conflitos; os conflitos são conferidos de novo com a agenda travada
+    await check_schedule(db, appointment.instructor_id, appointment.start_date, appointment.end_date)
+    await check_conflicts(db, appointment.instructor_id, appointment.start_date, appointment.end_date)
+    async with schedule_lock(db, appointment.instructor_id):
+        await check_conflicts(db, appointment.instructor_id, appointment.start_date, appointment.end_date)
+        db_appointment = Appointment(**appointment.model_dump())
+        db.add(db_appointment)
+        await touch_calendars(db, appointment.student_id, appointment.instructor_id)
+        await commit_booking(db)
+    await db.refresh(db_appointment)
     return db_appointment
 
 
-@router.get("/", response_model=List[AppointmentResponse])
-def list_appointments(
+@router.get("/", response_model=Union[Page[AppointmentResponse], List[AppointmentResponse]])
+@fast_json(AppointmentResponse)
+@query_budget(2)
+async def list_appointments(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     student_id: Optional[int] = Query(None, description="Filtrar por ID do aluno"),
     instructor_id: Optional[int] = Query(None, description="Filtrar por ID do instrutor"),
     status_filter: Optional[AppointmentStatus] = Query(None, alias="status", description="Filtrar por status"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Listar agendamentos com filtros opcionais"""
-    query = db.query(Appointment)
+    """Listar agendamentos com filtros opcionais (com ETag)"""
+    fieldset = parse_fields(AppointmentResponse, fields)
+    query = select(Appointment)
     
     if student_id:
-        query = query.filter(Appointment.student_id == student_id)
+        query = query.where(Appointment.student_id == student_id)
     if instructor_id:
-        query = query.filter(Appointment.instructor_id == instructor_id)
+        query = query.where(Appointment.instructor_id == instructor_id)
     if status_filter:
-        query = query.filter(Appointment.status == status_filter)
+        query = query.where(Appointment.status == status_filter)
     
-    appointments = query.offset(skip).limit(limit).all()
-    return appointments
+    # Com cursor: ordenados por data de início, usando os índices (filtro, start_date)
+    order_by = (Appointment.start_date, Appointment.id)
+    result = await conditional_list(
+        db, request, response, Appointment, query, order_by, cursor, skip, limit,
+        options=fieldset.options(Appointment, *order_by), variant=fieldset.tag
+    )
+    return fieldset.render(result, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_appointments(
+    request: Request,
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson (um objeto por linha) ou csv"),
+    student_id: Optional[int] = Query(None, description="Filtrar por ID do aluno"),
+    instructor_id: Optional[int] = Query(None, description="Filtrar por ID do instrutor"),
+    status_filter: Optional[AppointmentStatus] = Query(None, alias="status", description="Filtrar por status"),
+    start: Optional[Union[datetime, date]] = Query(None, alias="from", description="Início a partir de (ex.: 2025-01-01)"),
+    end: Optional[Union[datetime, date]] = Query(None, alias="to", description="Início antes de (exclusivo)"),
+):
+    """Exportar agendamentos em ordem de início, sem limite de linhas (streaming)"""
+    # Colunas da tabela, sem objetos ORM
+    query = select(Appointment.__table__)
+    
+    if student_id:
+        query = query.where(Appointment.student_id == student_id)
+    if instructor_id:
+        query = query.where(Appointment.instructor_id == instructor_id)
+    if status_filter:
+        query = query.where(Appointment.status == status_filter)
+    # Uma data vale a partir da meia-noite
+    if start is not None:
+        query = query.where(Appointment.start_date >= (start if isinstance(start, datetime) else datetime.combine(start, time.min)))
+    if end is not None:
+        query = query.where(Appointment.start_date < (end if isinstance(end, datetime) else datetime.combine(end, time.min)))
+    
+    # A sessão é aberta pelo próprio streaming e fica aberta até a última linha
+    return export_response(
+        lambda: open_read_session(request),
+        query.order_by(Appointment.start_date, Appointment.id),
+        file_format,
+        "agendamentos"
+    )
+
+
+@router.get("/batch", response_model=Batch[AppointmentResponse])
+@fast_json(AppointmentResponse)
+@query_budget(1)
+async def get_appointments_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter vários agendamentos pelos ids com uma consulta (ids inexistentes vêm em missing)"""
+    fieldset = parse_fields(AppointmentResponse, fields)
+    return fieldset.render(await fetch_batch(db, Appointment, parse_ids(ids), fieldset.options(Appointment)))
+
+
+@router.post("/batch", response_model=Batch[AppointmentResponse])
+@fast_json(AppointmentResponse)
+@query_budget(1)
+@read_only
+async def post_appointments_batch(
+    batch: BatchRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Como GET /batch, com os ids no corpo (listas longas demais para a URL)"""
+    fieldset = parse_fields(AppointmentResponse, fields)
+    return fieldset.render(await fetch_batch(db, Appointment, batch.ids, fieldset.options(Appointment)))
 
 
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
-def get_appointment(appointment_id: int, db: Session = Depends(get_db)):
-    """Obter um agendamento específico"""
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+@fast_json(AppointmentResponse)
+@query_budget(2)
+async def get_appointment(
+    appointment_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter um agendamento específico (com ETag e Last-Modified)"""
+    fieldset = parse_fields(AppointmentResponse, fields)
+    cached = await check_not_modified(db, request, Appointment, Appointment.id == appointment_id, variant=fieldset.tag)
+    if cached is not None:
+        return cached
+    
+    appointment = await db.get(Appointment, appointment_id, options=fieldset.options(Appointment))
     if not appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agendamento não encontrado"
         )
-    return appointment
+    set_entity_headers(response, appointment, fieldset.tag)
+    return fieldset.render(appointment, response)
 
 
 @router.put("/{appointment_id}", response_model=AppointmentResponse)
-def update_appointment(
+async def update_appointment(
     appointment_id: int,
     appointment_update: AppointmentUpdate,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Atualizar um agendamento"""
-    db_appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    """Atualizar um agendamento (If-Match: só se o ETag ainda for o atual)"""
+    db_appointment = await db.get(Appointment, appointment_id)
     if not db_appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agendamento não encontrado"
         )
+    check_if_match(request, db_appointment)
     
-    # Atualizar campos fornecidos
     update_data = appointment_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_appointment, field, value)
+    start_date = update_data.get("start_date", db_appointment.start_date)
+    end_date = update_data.get("end_date", db_appointment.end_date)
+    new_status = update_data.get("status", db_appointment.status)
+    if end_date.replace(tzinfo=None) <= start_date.replace(tzinfo=None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date deve ser maior que start_date"
+        )
     
-    db.commit()
-    db.refresh(db_appointment)
+    # Remarcar ou reativar um agendamento cancelado passa pelas mesmas verificações da criação
+    rescheduled = "start_date" in update_data or "end_date" in update_data
+    reactivated = db_appointment.status == AppointmentStatus.CANCELLED
+    if new_status != AppointmentStatus.CANCELLED and (rescheduled or reactivated):
+        await check_schedule(db, db_appointment.instructor_id, start_date, end_date)
+        async with schedule_lock(db, db_appointment.instructor_id):
+            await check_conflicts(db, db_appointment.instructor_id, start_date, end_date, exclude_id=appointment_id)
+            for field, value in update_data.items():
+                setattr(db_appointment, field, value)
+            await touch_calendars(db, db_appointment.student_id, db_appointment.instructor_id)
+            await commit_booking(db)
+    else:
+        for field, value in update_data.items():
+            setattr(db_appointment, field, value)
+        await touch_calendars(db, db_appointment.student_id, db_appointment.instructor_id)
+        await db.commit()
+    await db.refresh(db_appointment)
+    set_entity_headers(response, db_appointment)
     return db_appointment
 
 
 @router.delete("/{appointment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_appointment(appointment_id: int, db: Session = Depends(get_db)):
+async def delete_appointment(appointment_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar um agendamento"""
-    db_appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    db_appointment = await db.get(Appointment, appointment_id)
     if not db_appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agendamento não encontrado"
         )
     
-    db.delete(db_appointment)
-    db.commit()
+    await db.delete(db_appointment)
+    await touch_calendars(db, db_appointment.student_id, db_appointment.instructor_id)
+    await db.commit()
     return None
 
 
 @router.patch("/{appointment_id}/status", response_model=AppointmentResponse)
-def update_appointment_status(
+async def update_appointment_status(
     appointment_id: int,
     new_status: AppointmentStatus,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Atualizar apenas o status de um agendamento"""
-    db_appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    db_appointment = await db.get(Appointment, appointment_id)
     if not db_appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Agendamento não encontrado"
         )
     
-    db_appointment.status = new_status
-    db.commit()
-    db.refresh(db_appointment)
+    if db_appointment.status == AppointmentStatus.CANCELLED and new_status != AppointmentStatus.CANCELLED:
+        await check_schedule(db, db_appointment.instructor_id, db_appointment.start_date, db_appointment.end_date)
+        async with schedule_lock(db, db_appointment.instructor_id):
+            await check_conflicts(
+                db, db_appointment.instructor_id, db_appointment.start_date, db_appointment.end_date,
+                exclude_id=appointment_id
+            )
+            db_appointment.status = new_status
+            await touch_calendars(db, db_appointment.student_id, db_appointment.instructor_id)
+            await commit_booking(db)
+    else:
+        db_appointment.status = new_status
+        await touch_calendars(db, db_appointment.student_id, db_appointment.instructor_id)
+        await db.commit()
+    await db.refresh(db_appointment)
     return db_appointment
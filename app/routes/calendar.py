@@ -0,0 +1,78 @@
+from datetime import datetime, time
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_read_db
+from app.database.query_stats import query_budget
+from app.http_cache import etag_matches
+from app.models import Appointment, CalendarVersion, InstructorProfile, InstructorTimeOff, User, UserRole
+from app.services.calendar import feed_etag, first_feed_day, render_calendar
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+# Os clientes podem guardar o feed, mas devem revalidar (If-None-Match) a cada consulta
+CACHE_CONTROL = "no-cache"
+
+
+async def calendar_feed(db, request: Request, user_id: int, role: UserRole) -> Response:
+    """Feed do usuário, ou 304 se o ETag enviado pelo cliente ainda vale"""
+    # A versão é lida antes dos agendamentos: o conteúdo nunca é mais antigo que o ETag
+    row = (await db.execute(
+        select(User.id, User.created_at, CalendarVersion.version, CalendarVersion.updated_at)
+        .outerjoin(CalendarVersion, CalendarVersion.user_id == User.id)
+        .where(User.id == user_id, User.role == role)
+    )).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instrutor não encontrado" if role == UserRole.INSTRUCTOR else "Aluno não encontrado"
+        )
+    
+    first_day = first_feed_day(settings.calendar_past_days)
+    etag = feed_etag(role.value, user_id, row.version or 0, first_day)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    owner = Appointment.instructor_id if role == UserRole.INSTRUCTOR else Appointment.student_id
+    appointments = await db.execute(
+        select(
+            Appointment.id,
+            Appointment.start_date,
+            Appointment.end_date,
+            Appointment.status,
+            Appointment.location_pickup,
+            Appointment.notes
+        )
+        .where(owner == user_id, Appointment.start_date >= datetime.combine(first_day, time.min))
+        .order_by(Appointment.start_date, Appointment.id)
+    )
+    days_off = []
+    if role == UserRole.INSTRUCTOR:
+        days_off = (await db.execute(
+            select(InstructorTimeOff.id, InstructorTimeOff.date, InstructorTimeOff.reason)
+            .join(InstructorProfile, InstructorProfile.id == InstructorTimeOff.instructor_id)
+            .where(InstructorProfile.user_id == user_id, InstructorTimeOff.date >= first_day)
+            .order_by(InstructorTimeOff.date)
+        )).all()
+    
+    name = "AutoDomínio - Aulas" if role == UserRole.STUDENT else "AutoDomínio - Agenda do instrutor"
+    # Feed nunca alterado (ou sem data da alteração, anterior à migração 12): a criação do usuário
+    changed_at = row.updated_at or row.created_at or datetime.combine(first_day, time.min)
+    body = render_calendar(name, changed_at, appointments.all(), days_off)
+    return Response(content=body, media_type="text/calendar; charset=utf-8", headers=headers)
+
+
+@router.get("/instructor/{user_id}.ics", response_class=Response)
+@query_budget(3)
+async def instructor_calendar(user_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Feed iCalendar com as aulas e as exceções de agenda do instrutor (id do usuário)"""
+    return await calendar_feed(db, request, user_id, UserRole.INSTRUCTOR)
+
+
+@router.get("/student/{user_id}.ics", response_class=Response)
+@query_budget(2)
+async def student_calendar(user_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Feed iCalendar com as aulas do aluno"""
+    return await calendar_feed(db, request, user_id, UserRole.STUDENT)
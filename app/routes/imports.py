@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from app.database import get_db
+from app.database.query_stats import query_budget
+from app.schemas import ImportResult
+from app.services.importer import ImportFormatError, run_import
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+# Content-Type aceito quando o formato não é informado
+MEDIA_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "ndjson",
+}
+
+
+@router.post("/{kind}", response_model=ImportResult)
+@query_budget(None)
+async def import_records(
+    kind: Literal["users", "appointments"],
+    request: Request,
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="Padrão: pelo Content-Type (text/csv ou application/x-ndjson)"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Registros por INSERT/commit"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Importar usuários ou agendamentos de um CSV ou NDJSON enviado no corpo da requisição.
+
+    O corpo é lido em streaming e gravado em lotes; linhas inválidas são
+    rejeitadas individualmente e listadas no resultado.
+    """
+    fmt = file_format or MEDIA_TYPES.get(request.headers.get("content-type", "").split(";")[0].strip())
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Envie text/csv ou application/x-ndjson, ou informe format"
+        )
+    
+    try:
+        report = await run_import(db, kind, request.stream(), fmt, batch_size)
+    except ImportFormatError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error)
+        )
+    return report.as_dict()
@@ -1,60 +1,110 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.database.query_stats import query_budget
 from app.models import InstructorProfile, ApprovalStatus
-from app.schemas import InstructorProfileResponse, InstructorApprovalUpdate
+from app.pagination import CURSOR_DESCRIPTION, paginate
+from app.schemas import InstructorProfileResponse, InstructorApprovalUpdate, ApprovalQueue, Page
+from app.serialization import fast_json
+from app.services.approval import count_by_approval_status, invalidate_approval_counts
+from app.services.instructor_search import invalidate_cities
 
 router = APIRouter(prefix="/instructor-approval", tags=["Instructor Approval"])
 
 
-@router.get("/pending", response_model=List[InstructorProfileResponse])
-def list_pending_instructors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def list_by_status(approval_status: ApprovalStatus, skip: int, limit: int, cursor: Optional[str], db: AsyncSession):
+    query = select(InstructorProfile).where(InstructorProfile.approval_status == approval_status)
+    if cursor is not None:
+        return await paginate(db, query, (InstructorProfile.id,), cursor, limit)
+    
+    instructors = await db.scalars(query.order_by(InstructorProfile.id).offset(skip).limit(limit))
+    return instructors.all()
+
+
+@router.get("/queue", response_model=ApprovalQueue)
+@query_budget(2)
+async def get_approval_queue(
+    statuses: List[ApprovalStatus] = Query(
+        [ApprovalStatus.PENDING, ApprovalStatus.UNDER_REVIEW],
+        alias="status",
+        description="Status a incluir (repita o parâmetro para vários: ?status=pending&status=under_review)"
+    ),
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="next_cursor da resposta anterior (vazio para a primeira página)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Fila de aprovação: instrutores nos status informados, do mais antigo ao mais recente, com a contagem de cada status"""
+    statuses = list(dict.fromkeys(statuses))
+    query = select(InstructorProfile).where(InstructorProfile.approval_status.in_(statuses))
+    page = await paginate(db, query, (InstructorProfile.id,), cursor, limit)
+    counts = await count_by_approval_status(db)
+    page["counts"] = {status_value.value: counts[status_value.value] for status_value in statuses}
+    return page
+
+
+@router.get("/pending", response_model=Union[Page[InstructorProfileResponse], List[InstructorProfileResponse]])
+@fast_json(InstructorProfileResponse)
+@query_budget(1)
+async def list_pending_instructors(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Listar instrutores aguardando aprovação"""
-    instructors = db.query(InstructorProfile).filter(
-        InstructorProfile.approval_status == ApprovalStatus.PENDING
-    ).offset(skip).limit(limit).all()
-    return instructors
+    return await list_by_status(ApprovalStatus.PENDING, skip, limit, cursor, db)
 
 
-@router.get("/under-review", response_model=List[InstructorProfileResponse])
-def list_under_review_instructors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/under-review", response_model=Union[Page[InstructorProfileResponse], List[InstructorProfileResponse]])
+@fast_json(InstructorProfileResponse)
+@query_budget(1)
+async def list_under_review_instructors(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Listar instrutores em análise"""
-    instructors = db.query(InstructorProfile).filter(
-        InstructorProfile.approval_status == ApprovalStatus.UNDER_REVIEW
-    ).offset(skip).limit(limit).all()
-    return instructors
+    return await list_by_status(ApprovalStatus.UNDER_REVIEW, skip, limit, cursor, db)
 
 
-@router.get("/approved", response_model=List[InstructorProfileResponse])
-def list_approved_instructors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/approved", response_model=Union[Page[InstructorProfileResponse], List[InstructorProfileResponse]])
+@fast_json(InstructorProfileResponse)
+@query_budget(1)
+async def list_approved_instructors(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Listar instrutores aprovados"""
-    instructors = db.query(InstructorProfile).filter(
-        InstructorProfile.approval_status == ApprovalStatus.APPROVED
-    ).offset(skip).limit(limit).all()
-    return instructors
+    return await list_by_status(ApprovalStatus.APPROVED, skip, limit, cursor, db)
 
 
-@router.get("/rejected", response_model=List[InstructorProfileResponse])
-def list_rejected_instructors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/rejected", response_model=Union[Page[InstructorProfileResponse], List[InstructorProfileResponse]])
+@fast_json(InstructorProfileResponse)
+@query_budget(1)
+async def list_rejected_instructors(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Listar instrutores rejeitados"""
-    instructors = db.query(InstructorProfile).filter(
-        InstructorProfile.approval_status == ApprovalStatus.REJECTED
-    ).offset(skip).limit(limit).all()
-    return instructors
+    return await list_by_status(ApprovalStatus.REJECTED, skip, limit, cursor, db)
 
 
 @router.patch("/{instructor_profile_id}/status", response_model=InstructorProfileResponse)
-def update_instructor_approval_status(
+async def update_instructor_approval_status(
     instructor_profile_id: int,
     approval_update: InstructorApprovalUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Atualizar status de aprovação de um instrutor"""
-    instructor = db.query(InstructorProfile).filter(
-        InstructorProfile.id == instructor_profile_id
-    ).first()
+    instructor = await db.get(InstructorProfile, instructor_profile_id)
     
     if not instructor:
         raise HTTPException(
@@ -78,17 +128,17 @@ def update_instructor_approval_status(
     if approval_update.approval_status in [ApprovalStatus.APPROVED, ApprovalStatus.REJECTED]:
         instructor.approval_date = datetime.utcnow()
     
-    db.commit()
-    db.refresh(instructor)
+    await db.commit()
+    invalidate_approval_counts()
+    invalidate_cities(instructor.city)
+    await db.refresh(instructor)
     return instructor
 
 
 @router.patch("/{instructor_profile_id}/set-under-review", response_model=InstructorProfileResponse)
-def set_instructor_under_review(instructor_profile_id: int, db: Session = Depends(get_db)):
+async def set_instructor_under_review(instructor_profile_id: int, db: AsyncSession = Depends(get_db)):
     """Marcar instrutor como 'em análise'"""
-    instructor = db.query(InstructorProfile).filter(
-        InstructorProfile.id == instructor_profile_id
-    ).first()
+    instructor = await db.get(InstructorProfile, instructor_profile_id)
     
     if not instructor:
         raise HTTPException(
@@ -97,21 +147,18 @@ def set_instructor_under_review(instructor_profile_id: int, db: Session = Depend
         )
     
     instructor.approval_status = ApprovalStatus.UNDER_REVIEW
-    db.commit()
-    db.refresh(instructor)
+    await db.commit()
+    invalidate_approval_counts()
+    invalidate_cities(instructor.city)
+    await db.refresh(instructor)
     return instructor
 
 
 @router.get("/stats")
-def get_approval_stats(db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_approval_stats(db: AsyncSession = Depends(get_read_db)):
     """Obter estatísticas de aprovação de instrutores"""
-    stats = {}
-    for status_value in ApprovalStatus:
-        count = db.query(InstructorProfile).filter(
-            InstructorProfile.approval_status == status_value
-        ).count()
-        stats[status_value.value] = count
-    
+    stats = await count_by_approval_status(db)
     return {
         "approval_stats": stats,
         "total_instructors": sum(stats.values())
@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import InstructorAvailability, InstructorProfile
-from app.schemas import InstructorAvailabilityCreate, InstructorAvailabilityUpdate, InstructorAvailabilityResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import date, datetime, time, timedelta
+from operator import itemgetter
+from app.database import get_db, get_read_db
+from app.database.query_stats import query_budget
+from app.models import Appointment, AppointmentStatus, InstructorAvailability, InstructorProfile, InstructorTimeOff
+from app.schemas import InstructorAvailabilityCreate, InstructorAvailabilityUpdate, InstructorAvailabilityResponse, AvailableSlot, WeeklySchedule
+from app.services.booking import schedule_lock
+from app.services.schedule import diff_schedule
+from app.services.slots import free_slots
 
 router = APIRouter(prefix="/instructor-availability", tags=["Instructor Availability"])
 
+# Maior período aceito por /slots
+MAX_SLOT_DAYS = 90
+
 
 @router.post("/", response_model=InstructorAvailabilityResponse, status_code=status.HTTP_201_CREATED)
-def create_availability(availability: InstructorAvailabilityCreate, db: Session = Depends(get_db)):
+async def create_availability(availability: InstructorAvailabilityCreate, db: AsyncSession = Depends(get_db)):
     """Criar nova disponibilidade para instrutor"""
     # Verificar se instrutor existe
-    instructor = db.query(InstructorProfile).filter(
-        InstructorProfile.id == availability.instructor_id
-    ).first()
+    instructor = await db.get(InstructorProfile, availability.instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -24,34 +32,149 @@ def create_availability(availability: InstructorAvailabilityCreate, db: Session
     # Criar disponibilidade
     db_availability = InstructorAvailability(**availability.model_dump())
     db.add(db_availability)
-    db.commit()
-    db.refresh(db_availability)
+    await db.commit()
+    await db.refresh(db_availability)
     return db_availability
 
 
 @router.get("/instructor/{instructor_id}", response_model=List[InstructorAvailabilityResponse])
-def list_instructor_availability(instructor_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def list_instructor_availability(instructor_id: int, db: AsyncSession = Depends(get_read_db)):
     """Listar disponibilidades de um instrutor específico"""
     # Verificar se instrutor existe
-    instructor = db.query(InstructorProfile).filter(InstructorProfile.id == instructor_id).first()
+    instructor = await db.get(InstructorProfile, instructor_id)
+    if not instructor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instrutor não encontrado"
+        )
+    
+    availabilities = await db.scalars(
+        select(InstructorAvailability).where(InstructorAvailability.instructor_id == instructor_id)
+    )
+    return availabilities.all()
+
+
+@router.put("/instructor/{instructor_id}", response_model=List[InstructorAvailabilityResponse])
+@query_budget(7)
+async def replace_instructor_availability(
+    instructor_id: int,
+    schedule: WeeklySchedule,
+    db: AsyncSession = Depends(get_db)
+):
+    """Substituir a grade semanal inteira do instrutor em uma única transação"""
+    instructor = await db.get(InstructorProfile, instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instrutor não encontrado"
         )
     
-    availabilities = db.query(InstructorAvailability).filter(
-        InstructorAvailability.instructor_id == instructor_id
-    ).all()
+    # A agenda fica travada até o commit: duas substituições simultâneas não
+    # partem da mesma grade antiga (nem competem com uma reserva)
+    async with schedule_lock(db, instructor.user_id):
+        existing = await db.execute(
+            select(
+                InstructorAvailability.id,
+                InstructorAvailability.day_of_week,
+                InstructorAvailability.start_time,
+                InstructorAvailability.end_time,
+                InstructorAvailability.is_active
+            ).where(InstructorAvailability.instructor_id == instructor_id)
+        )
+        inserts, updates, deleted_ids = diff_schedule(
+            existing.all(), [window.model_dump() for window in schedule.windows]
+        )
+        
+        if inserts:
+            await db.execute(
+                insert(InstructorAvailability),
+                [{"instructor_id": instructor_id, **window} for window in inserts]
+            )
+        if updates:
+            await db.execute(update(InstructorAvailability), updates)
+        if deleted_ids:
+            await db.execute(delete(InstructorAvailability).where(InstructorAvailability.id.in_(deleted_ids)))
+        
+        availabilities = await db.scalars(
+            select(InstructorAvailability)
+            .where(InstructorAvailability.instructor_id == instructor_id)
+            .order_by(InstructorAvailability.day_of_week, InstructorAvailability.start_time)
+        )
+        availabilities = availabilities.all()
+        await db.commit()
     return availabilities
 
 
+@router.get("/instructor/{instructor_id}/slots", response_model=List[AvailableSlot])
+@query_budget(4)
+async def list_free_slots(
+    instructor_id: int,
+    start: Union[datetime, date] = Query(..., alias="from", description="Início do período (ex.: 2025-01-06 ou 2025-01-06T08:00:00)"),
+    end: Union[datetime, date] = Query(..., alias="to", description="Fim do período, exclusivo"),
+    duration: int = Query(60, gt=0, le=24 * 60, description="Duração da aula em minutos"),
+    step: Optional[int] = Query(None, gt=0, le=24 * 60, description="Intervalo entre inícios em minutos (padrão: a duração)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Listar horários livres do instrutor: grade semanal menos exceções e agendamentos não cancelados"""
+    # Uma data vale a partir da meia-noite; horários da agenda são locais, sem fuso
+    start, end = (
+        value.replace(tzinfo=None) if isinstance(value, datetime) else datetime.combine(value, time.min)
+        for value in (start, end)
+    )
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' deve ser maior que 'from'"
+        )
+    if end - start > timedelta(days=MAX_SLOT_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O período deve ter no máximo {MAX_SLOT_DAYS} dias"
+        )
+    
+    instructor = await db.get(InstructorProfile, instructor_id)
+    if not instructor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instrutor não encontrado"
+        )
+    
+    windows = await db.execute(
+        select(InstructorAvailability.day_of_week, InstructorAvailability.start_time, InstructorAvailability.end_time)
+        .where(InstructorAvailability.instructor_id == instructor_id, InstructorAvailability.is_active.is_not(False))
+    )
+    days_off = await db.scalars(
+        select(InstructorTimeOff.date)
+        .where(InstructorTimeOff.instructor_id == instructor_id)
+        .where(InstructorTimeOff.date.between(start.date(), end.date()))
+    )
+    # Agendamentos usam o id do usuário do instrutor. Sem ORDER BY, o banco lê pelo
+    # índice (instructor_id, end_date) só os que terminam depois de start, em vez
+    # de todo o histórico anterior a end; a ordenação é feita aqui
+    appointments = await db.execute(
+        select(Appointment.start_date, Appointment.end_date)
+        .where(Appointment.instructor_id == instructor.user_id)
+        .where(Appointment.start_date < end, Appointment.end_date > start)
+        .where(Appointment.status != AppointmentStatus.CANCELLED)
+    )
+    
+    slots = free_slots(
+        windows.all(),
+        set(days_off.all()),
+        sorted(appointments.all(), key=itemgetter(0)),
+        start,
+        end,
+        timedelta(minutes=duration),
+        timedelta(minutes=step) if step else None
+    )
+    return [{"start_date": slot_start, "end_date": slot_end} for slot_start, slot_end in slots]
+
+
 @router.get("/{availability_id}", response_model=InstructorAvailabilityResponse)
-def get_availability(availability_id: int, db: Session = Depends(get_db)):
+async def get_availability(availability_id: int, db: AsyncSession = Depends(get_read_db)):
     """Obter uma disponibilidade específica"""
-    availability = db.query(InstructorAvailability).filter(
-        InstructorAvailability.id == availability_id
-    ).first()
+    availability = await db.get(InstructorAvailability, availability_id)
     if not availability:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,15 +184,13 @@ def get_availability(availability_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{availability_id}", response_model=InstructorAvailabilityResponse)
-def update_availability(
+async def update_availability(
     availability_id: int,
     availability_update: InstructorAvailabilityUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Atualizar uma disponibilidade"""
-    db_availability = db.query(InstructorAvailability).filter(
-        InstructorAvailability.id == availability_id
-    ).first()
+    db_availability = await db.get(InstructorAvailability, availability_id)
     if not db_availability:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,23 +202,21 @@ def update_availability(
     for field, value in update_data.items():
         setattr(db_availability, field, value)
     
-    db.commit()
-    db.refresh(db_availability)
+    await db.commit()
+    await db.refresh(db_availability)
     return db_availability
 
 
 @router.delete("/{availability_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_availability(availability_id: int, db: Session = Depends(get_db)):
+async def delete_availability(availability_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar uma disponibilidade"""
-    db_availability = db.query(InstructorAvailability).filter(
-        InstructorAvailability.id == availability_id
-    ).first()
+    db_availability = await db.get(InstructorAvailability, availability_id)
     if not db_availability:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Disponibilidade não encontrada"
         )
     
-    db.delete(db_availability)
-    db.commit()
+    await db.delete(db_availability)
+    await db.commit()
     return None
@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
-from app.models import InstructorProfile, User, UserRole
-from app.schemas import InstructorProfileCreate, InstructorProfileUpdate, InstructorProfileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import datetime, timedelta
+from app.batch import IDS_DESCRIPTION, fetch_batch, parse_ids
+from app.database import get_db, get_read_db, read_only
+from app.database.query_stats import query_budget
+from app.http_cache import body_etag, check_if_match, check_not_modified, etag_matches, not_modified, set_entity_headers
+from app.models import ApprovalStatus, InstructorProfile, User, UserRole
+from app.pagination import CURSOR_DESCRIPTION, paginate
+from app.schemas import InstructorProfileCreate, InstructorProfileUpdate, InstructorProfileResponse, InstructorCard, Page, Batch, BatchRequest
+from app.serialization import fast_json
+from app.sparse_fields import FIELDS_DESCRIPTION, parse_fields
+from app.services.approval import invalidate_approval_counts
+from app.services.calendar import touch_calendars
+from app.services.instructor_cards import MAX_CARD_DAYS, build_cards, card_options, first_slot_start
+from app.services.instructor_search import invalidate_cities, render_results, search_cache, search_key, search_query
 
 router = APIRouter(prefix="/instructor-profiles", tags=["Instructor Profiles"])
 
 
 @router.post("/", response_model=InstructorProfileResponse, status_code=status.HTTP_201_CREATED)
-def create_instructor_profile(profile: InstructorProfileCreate, db: Session = Depends(get_db)):
+async def create_instructor_profile(profile: InstructorProfileCreate, db: AsyncSession = Depends(get_db)):
     """Criar um novo perfil de instrutor"""
     # Verificar se usuário existe e é instrutor
-    user = db.query(User).filter(User.id == profile.user_id).first()
+    user = await db.get(User, profile.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -25,9 +37,9 @@ def create_instructor_profile(profile: InstructorProfileCreate, db: Session = De
         )
     
     # Verificar se já existe perfil para este usuário
-    existing_profile = db.query(InstructorProfile).filter(
-        InstructorProfile.user_id == profile.user_id
-    ).first()
+    existing_profile = await db.scalar(
+        select(InstructorProfile).where(InstructorProfile.user_id == profile.user_id)
+    )
     if existing_profile:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,9 +47,9 @@ def create_instructor_profile(profile: InstructorProfileCreate, db: Session = De
         )
     
     # Verificar se credential_number já existe
-    existing_credential = db.query(InstructorProfile).filter(
-        InstructorProfile.credential_number == profile.credential_number
-    ).first()
+    existing_credential = await db.scalar(
+        select(InstructorProfile).where(InstructorProfile.credential_number == profile.credential_number)
+    )
     if existing_credential:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,95 +59,236 @@ def create_instructor_profile(profile: InstructorProfileCreate, db: Session = De
     # Criar perfil
     db_profile = InstructorProfile(**profile.model_dump())
     db.add(db_profile)
-    db.commit()
-    db.refresh(db_profile)
+    await db.commit()
+    invalidate_approval_counts()
+    invalidate_cities(db_profile.city)
+    await db.refresh(db_profile)
     return db_profile
 
 
-@router.get("/", response_model=List[InstructorProfileResponse])
-def list_instructor_profiles(
+def search_response(request: Request, body: bytes, cache_status: str) -> Response:
+    """Resposta da busca com ETag (304 se o cliente já tem esse corpo)"""
+    etag = body_etag(body)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, **{"X-Cache": cache_status})
+    return Response(body, media_type="application/json", headers={"ETag": etag, "X-Cache": cache_status})
+
+
+@router.get("/", response_model=Union[Page[InstructorProfileResponse], List[InstructorProfileResponse]])
+@query_budget(1)
+async def list_instructor_profiles(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    city: Optional[str] = Query(None, description="Filtrar por cidade"),
+    city: Optional[str] = Query(None, description="Filtrar por cidade (trecho do nome, sem diferenciar acentos)"),
     transmission: Optional[str] = Query(None, description="Filtrar por tipo de transmissão"),
     min_rate: Optional[float] = Query(None, description="Preço mínimo por hora"),
     max_rate: Optional[float] = Query(None, description="Preço máximo por hora"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Listar perfis de instrutores com filtros opcionais"""
-    query = db.query(InstructorProfile)
+    """Listar perfis de instrutores com filtros opcionais.
+
+    O resultado fica em cache (ver app/services/instructor_search.py); o
+    cabeçalho Cache-Control: no-cache força a consulta ao banco. O ETag é o
+    hash da resposta, então um acerto no cache com If-None-Match responde 304
+    sem consultar o banco nem enviar o corpo.
+    """
+    fieldset = parse_fields(InstructorProfileResponse, fields)
+    bypass = "no-cache" in request.headers.get("cache-control", "")
+    key = search_key(city, transmission, min_rate, max_rate, skip, limit, cursor, fieldset.names)
+    body = search_cache.get(key, bypass=bypass)
+    if body is not None:
+        return search_response(request, body, "HIT")
+    
+    generation = search_cache.generation
+    query, order_by = search_query(city, transmission, min_rate, max_rate)
+    # O cursor é montado a partir das colunas de ordenação, que também precisam ser carregadas
+    query = query.options(*fieldset.options(InstructorProfile, *order_by[-2:]))
     
-    if city:
-        query = query.filter(InstructorProfile.city.ilike(f"%{city}%"))
-    if transmission:
-        query = query.filter(InstructorProfile.transmission == transmission)
-    if min_rate is not None:
-        query = query.filter(InstructorProfile.hourly_rate >= min_rate)
-    if max_rate is not None:
-        query = query.filter(InstructorProfile.hourly_rate <= max_rate)
+    if cursor is not None:
+        # O cursor guarda apenas valores de colunas: na busca aproximada, a ordem fica sem o rank
+        result = await paginate(db, query, order_by[-2:], cursor, limit)
+    else:
+        if city:
+            query = query.order_by(*order_by)
+        result = (await db.scalars(query.offset(skip).limit(limit))).all()
     
-    profiles = query.offset(skip).limit(limit).all()
-    return profiles
+    body = render_results(result, fieldset.adapters)
+    search_cache.set(key, body, generation=generation)
+    return search_response(request, body, "BYPASS" if bypass else "MISS")
+
+
+@router.get("/cards", response_model=Union[Page[InstructorCard], List[InstructorCard]])
+@fast_json(InstructorCard)
+@query_budget(5)
+async def list_instructor_cards(
+    skip: int = 0,
+    limit: int = 20,
+    city: Optional[str] = Query(None, description="Filtrar por cidade (trecho do nome, sem diferenciar acentos)"),
+    transmission: Optional[str] = Query(None, description="Filtrar por tipo de transmissão"),
+    min_rate: Optional[float] = Query(None, description="Preço mínimo por hora"),
+    max_rate: Optional[float] = Query(None, description="Preço máximo por hora"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    duration: int = Query(60, gt=0, le=24 * 60, description="Duração da aula em minutos, para o próximo horário livre"),
+    days: int = Query(14, gt=0, le=MAX_CARD_DAYS, description="Dias à frente em que o próximo horário livre é procurado"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Buscar instrutores aprovados como cards: perfil, nome e foto, avaliações e próximo horário livre.
+
+    Mesmos filtros e paginação da listagem de perfis. A página é montada com
+    no máximo 5 consultas, qualquer que seja o limit (ver
+    app/services/instructor_cards.py).
+    """
+    query, order_by = search_query(city, transmission, min_rate, max_rate)
+    query = query.where(InstructorProfile.approval_status == ApprovalStatus.APPROVED)
+    query = query.options(*card_options(*order_by[-2:]))
+    
+    if cursor is not None:
+        page = await paginate(db, query, order_by[-2:], cursor, limit)
+        profiles = page["items"]
+    else:
+        profiles = (await db.scalars(query.order_by(*order_by).offset(skip).limit(limit))).all()
+    
+    start = first_slot_start(datetime.now())
+    cards = await build_cards(db, profiles, start, start + timedelta(days=days), timedelta(minutes=duration))
+    if cursor is not None:
+        return {"items": cards, "next_cursor": page["next_cursor"]}
+    return cards
+
+
+@router.get("/batch", response_model=Batch[InstructorProfileResponse])
+@fast_json(InstructorProfileResponse)
+@query_budget(1)
+async def get_instructor_profiles_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter vários perfis de instrutor pelos ids com uma consulta (ids inexistentes vêm em missing)"""
+    fieldset = parse_fields(InstructorProfileResponse, fields)
+    return fieldset.render(await fetch_batch(db, InstructorProfile, parse_ids(ids), fieldset.options(InstructorProfile)))
+
+
+@router.post("/batch", response_model=Batch[InstructorProfileResponse])
+@fast_json(InstructorProfileResponse)
+@query_budget(1)
+@read_only
+async def post_instructor_profiles_batch(
+    batch: BatchRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Como GET /batch, com os ids no corpo (listas longas demais para a URL)"""
+    fieldset = parse_fields(InstructorProfileResponse, fields)
+    return fieldset.render(await fetch_batch(db, InstructorProfile, batch.ids, fieldset.options(InstructorProfile)))
 
 
 @router.get("/{profile_id}", response_model=InstructorProfileResponse)
-def get_instructor_profile(profile_id: int, db: Session = Depends(get_db)):
-    """Obter um perfil de instrutor específico"""
-    profile = db.query(InstructorProfile).filter(InstructorProfile.id == profile_id).first()
+@fast_json(InstructorProfileResponse)
+@query_budget(2)
+async def get_instructor_profile(
+    profile_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter um perfil de instrutor específico (com ETag e Last-Modified)"""
+    fieldset = parse_fields(InstructorProfileResponse, fields)
+    cached = await check_not_modified(
+        db, request, InstructorProfile, InstructorProfile.id == profile_id, variant=fieldset.tag
+    )
+    if cached is not None:
+        return cached
+    
+    profile = await db.get(InstructorProfile, profile_id, options=fieldset.options(InstructorProfile))
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de instrutor não encontrado"
         )
-    return profile
+    set_entity_headers(response, profile, fieldset.tag)
+    return fieldset.render(profile, response)
 
 
 @router.get("/user/{user_id}", response_model=InstructorProfileResponse)
-def get_instructor_profile_by_user(user_id: int, db: Session = Depends(get_db)):
-    """Obter perfil de instrutor por ID do usuário"""
-    profile = db.query(InstructorProfile).filter(InstructorProfile.user_id == user_id).first()
+@fast_json(InstructorProfileResponse)
+@query_budget(2)
+async def get_instructor_profile_by_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter perfil de instrutor por ID do usuário (com ETag e Last-Modified)"""
+    fieldset = parse_fields(InstructorProfileResponse, fields)
+    cached = await check_not_modified(
+        db, request, InstructorProfile, InstructorProfile.user_id == user_id, variant=fieldset.tag
+    )
+    if cached is not None:
+        return cached
+    
+    profile = await db.scalar(
+        select(InstructorProfile)
+        .where(InstructorProfile.user_id == user_id)
+        .options(*fieldset.options(InstructorProfile))
+    )
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de instrutor não encontrado para este usuário"
         )
-    return profile
+    set_entity_headers(response, profile, fieldset.tag)
+    return fieldset.render(profile, response)
 
 
 @router.put("/{profile_id}", response_model=InstructorProfileResponse)
-def update_instructor_profile(
+async def update_instructor_profile(
     profile_id: int,
     profile_update: InstructorProfileUpdate,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Atualizar um perfil de instrutor"""
-    db_profile = db.query(InstructorProfile).filter(InstructorProfile.id == profile_id).first()
+    """Atualizar um perfil de instrutor (If-Match: só se o ETag ainda for o atual)"""
+    db_profile = await db.get(InstructorProfile, profile_id)
     if not db_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de instrutor não encontrado"
         )
+    check_if_match(request, db_profile)
     
     # Atualizar campos fornecidos
     update_data = profile_update.model_dump(exclude_unset=True)
+    old_city = db_profile.city
     for field, value in update_data.items():
         setattr(db_profile, field, value)
     
-    db.commit()
-    db.refresh(db_profile)
+    await db.commit()
+    invalidate_cities(old_city, db_profile.city)
+    await db.refresh(db_profile)
+    set_entity_headers(response, db_profile)
     return db_profile
 
 
 @router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_instructor_profile(profile_id: int, db: Session = Depends(get_db)):
+async def delete_instructor_profile(profile_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar um perfil de instrutor"""
-    db_profile = db.query(InstructorProfile).filter(InstructorProfile.id == profile_id).first()
+    db_profile = await db.get(InstructorProfile, profile_id)
     if not db_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de instrutor não encontrado"
         )
     
-    db.delete(db_profile)
-    db.commit()
+    await db.delete(db_profile)
+    # As exceções de agenda saem do feed junto com o perfil
+    await touch_calendars(db, db_profile.user_id)
+    await db.commit()
+    invalidate_approval_counts()
+    invalidate_cities(db_profile.city)
     return None
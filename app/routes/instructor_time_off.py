@@ -1,55 +1,140 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.database.query_stats import query_budget
 from app.models import InstructorTimeOff, InstructorProfile
-from app.schemas import InstructorTimeOffCreate, InstructorTimeOffUpdate, InstructorTimeOffResponse
+from app.schemas import (
+    InstructorTimeOffCreate,
+    InstructorTimeOffUpdate,
+    InstructorTimeOffResponse,
+    InstructorTimeOffBulkCreate,
+    InstructorTimeOffBulkResult,
+)
+from app.services.booking import schedule_lock
+from app.services.calendar import touch_calendars, touch_instructor_calendar
+from app.services.time_off import expand_time_off
 
 router = APIRouter(prefix="/instructor-time-off", tags=["Instructor Time Off"])
 
 
+async def ensure_date_free(db, instructor_id: int, day, exclude_id: int = None):
+    """Levantar HTTPException (400) se o instrutor já tiver exceção nesta data"""
+    query = select(InstructorTimeOff.id).where(
+        InstructorTimeOff.instructor_id == instructor_id, InstructorTimeOff.date == day
+    )
+    if exclude_id is not None:
+        query = query.where(InstructorTimeOff.id != exclude_id)
+    if await db.scalar(query) is not None:
+        raise date_taken()
+
+
+def date_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Já existe exceção de agenda nesta data"
+    )
+
+
+async def commit_time_off(db):
+    """Commit que devolve o mesmo 400 de ensure_date_free se o índice único (instrutor, data) recusar a linha"""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise date_taken()
+
+
 @router.post("/", response_model=InstructorTimeOffResponse, status_code=status.HTTP_201_CREATED)
-def create_time_off(time_off: InstructorTimeOffCreate, db: Session = Depends(get_db)):
+async def create_time_off(time_off: InstructorTimeOffCreate, db: AsyncSession = Depends(get_db)):
     """Criar nova exceção na agenda (dia bloqueado)"""
     # Verificar se instrutor existe
-    instructor = db.query(InstructorProfile).filter(
-        InstructorProfile.id == time_off.instructor_id
-    ).first()
+    instructor = await db.get(InstructorProfile, time_off.instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instrutor não encontrado"
         )
     
-    # Criar exceção
-    db_time_off = InstructorTimeOff(**time_off.model_dump())
-    db.add(db_time_off)
-    db.commit()
-    db.refresh(db_time_off)
+    # Com a agenda travada, a verificação e a inclusão não se intercalam com outra requisição
+    async with schedule_lock(db, instructor.user_id):
+        await ensure_date_free(db, time_off.instructor_id, time_off.date)
+        db_time_off = InstructorTimeOff(**time_off.model_dump())
+        db.add(db_time_off)
+        await touch_calendars(db, instructor.user_id)
+        await commit_time_off(db)
+    await db.refresh(db_time_off)
     return db_time_off
 
 
+@router.post("/bulk", response_model=InstructorTimeOffBulkResult, status_code=status.HTTP_201_CREATED)
+@query_budget(6)
+async def create_time_off_bulk(time_off: InstructorTimeOffBulkCreate, db: AsyncSession = Depends(get_db)):
+    """Bloquear várias datas de uma vez: datas avulsas, períodos e regras de repetição"""
+    dates = expand_time_off(time_off.dates, time_off.ranges, time_off.recurrences)
+    
+    instructor = await db.get(InstructorProfile, time_off.instructor_id)
+    if not instructor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instrutor não encontrado"
+        )
+    
+    # Com a agenda travada, nenhuma reserva é confirmada em um dia sendo bloqueado
+    async with schedule_lock(db, instructor.user_id):
+        # Uma leitura pelo índice (instructor_id, date) no período das novas datas
+        existing = await db.scalars(
+            select(InstructorTimeOff.date)
+            .where(InstructorTimeOff.instructor_id == time_off.instructor_id)
+            .where(InstructorTimeOff.date.between(dates[0], dates[-1]))
+        )
+        skipped = set(existing.all()).intersection(dates)
+        new_dates = [day for day in dates if day not in skipped]
+        
+        created = []
+        if new_dates:
+            await db.execute(insert(InstructorTimeOff), [
+                {"instructor_id": time_off.instructor_id, "date": day, "reason": time_off.reason}
+                for day in new_dates
+            ])
+            created = await db.scalars(
+                select(InstructorTimeOff)
+                .where(InstructorTimeOff.instructor_id == time_off.instructor_id)
+                .where(InstructorTimeOff.date.between(new_dates[0], new_dates[-1]))
+                .order_by(InstructorTimeOff.date)
+            )
+            # O período pode incluir exceções antigas fora das datas pedidas
+            requested = set(new_dates)
+            created = [row for row in created.all() if row.date in requested]
+            await touch_calendars(db, instructor.user_id)
+        await db.commit()
+    return {"created": created, "skipped": sorted(skipped)}
+
+
 @router.get("/instructor/{instructor_id}", response_model=List[InstructorTimeOffResponse])
-def list_instructor_time_off(instructor_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def list_instructor_time_off(instructor_id: int, db: AsyncSession = Depends(get_read_db)):
     """Listar exceções de agenda de um instrutor específico"""
     # Verificar se instrutor existe
-    instructor = db.query(InstructorProfile).filter(InstructorProfile.id == instructor_id).first()
+    instructor = await db.get(InstructorProfile, instructor_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instrutor não encontrado"
         )
     
-    time_offs = db.query(InstructorTimeOff).filter(
-        InstructorTimeOff.instructor_id == instructor_id
-    ).all()
-    return time_offs
+    time_offs = await db.scalars(
+        select(InstructorTimeOff).where(InstructorTimeOff.instructor_id == instructor_id)
+    )
+    return time_offs.all()
 
 
 @router.get("/{time_off_id}", response_model=InstructorTimeOffResponse)
-def get_time_off(time_off_id: int, db: Session = Depends(get_db)):
+async def get_time_off(time_off_id: int, db: AsyncSession = Depends(get_read_db)):
     """Obter uma exceção específica"""
-    time_off = db.query(InstructorTimeOff).filter(InstructorTimeOff.id == time_off_id).first()
+    time_off = await db.get(InstructorTimeOff, time_off_id)
     if not time_off:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -59,13 +144,13 @@ def get_time_off(time_off_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{time_off_id}", response_model=InstructorTimeOffResponse)
-def update_time_off(
+async def update_time_off(
     time_off_id: int,
     time_off_update: InstructorTimeOffUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Atualizar uma exceção de agenda"""
-    db_time_off = db.query(InstructorTimeOff).filter(InstructorTimeOff.id == time_off_id).first()
+    db_time_off = await db.get(InstructorTimeOff, time_off_id)
     if not db_time_off:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,24 +159,30 @@ def update_time_off(
     
     # Atualizar campos fornecidos
     update_data = time_off_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_time_off, field, value)
-    
-    db.commit()
-    db.refresh(db_time_off)
+    instructor = await db.get(InstructorProfile, db_time_off.instructor_id)
+    # Agenda travada como na criação: a nova data pode ser bloqueada por outra requisição
+    async with schedule_lock(db, instructor.user_id):
+        if update_data.get("date") not in (None, db_time_off.date):
+            await ensure_date_free(db, db_time_off.instructor_id, update_data["date"], exclude_id=time_off_id)
+        for field, value in update_data.items():
+            setattr(db_time_off, field, value)
+        await touch_calendars(db, instructor.user_id)
+        await commit_time_off(db)
+    await db.refresh(db_time_off)
     return db_time_off
 
 
 @router.delete("/{time_off_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_time_off(time_off_id: int, db: Session = Depends(get_db)):
+async def delete_time_off(time_off_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar uma exceção de agenda"""
-    db_time_off = db.query(InstructorTimeOff).filter(InstructorTimeOff.id == time_off_id).first()
+    db_time_off = await db.get(InstructorTimeOff, time_off_id)
     if not db_time_off:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exceção de agenda não encontrada"
         )
     
-    db.delete(db_time_off)
-    db.commit()
+    await db.delete(db_time_off)
+    await touch_instructor_calendar(db, db_time_off.instructor_id)
+    await db.commit()
     return None
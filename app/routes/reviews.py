@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
-from app.database import get_db
-from app.models import Review, Appointment, User, UserRole, AppointmentStatus
-from app.schemas import ReviewCreate, ReviewUpdate, ReviewResponse, InstructorRatingStats
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
+from app.batch import IDS_DESCRIPTION, fetch_batch, parse_ids
+from app.database import get_db, get_read_db, open_read_session, read_only
+from app.database.query_stats import query_budget
+from app.http_cache import check_if_match, check_not_modified, conditional_list, set_entity_headers
+from app.models import Review, Appointment, User, UserRole, AppointmentStatus, InstructorRatingSummary
+from app.pagination import CURSOR_DESCRIPTION
+from app.schemas import ReviewCreate, ReviewUpdate, ReviewResponse, InstructorRatingStats, Page, Batch, BatchRequest
+from app.serialization import fast_json
+from app.services.export import export_response
+from app.services.ratings import apply_rating_change
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
 
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
-def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
+async def create_review(review: ReviewCreate, db: AsyncSession = Depends(get_db)):
     """Criar uma nova avaliação"""
     # Verificar se o agendamento existe e está completo
-    appointment = db.query(Appointment).filter(Appointment.id == review.appointment_id).first()
+    appointment = await db.get(Appointment, review.appointment_id)
     if not appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -27,7 +35,7 @@ def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
         )
     
     # Verificar se já existe avaliação para este agendamento
-    existing_review = db.query(Review).filter(Review.appointment_id == review.appointment_id).first()
+    existing_review = await db.scalar(select(Review).where(Review.appointment_id == review.appointment_id))
     if existing_review:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,107 +51,180 @@ def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
         comment=review.comment
     )
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
+    await apply_rating_change(db, review.instructor_id, added=review.rating)
+    await db.commit()
+    await db.refresh(db_review)
     return db_review
 
 
-@router.get("/instructor/{instructor_id}", response_model=List[ReviewResponse])
-def list_instructor_reviews(instructor_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Listar avaliações de um instrutor específico"""
+@router.get("/instructor/{instructor_id}", response_model=Union[Page[ReviewResponse], List[ReviewResponse]])
+@fast_json(ReviewResponse)
+@query_budget(3)
+async def list_instructor_reviews(
+    instructor_id: int,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Listar avaliações de um instrutor específico (com ETag)"""
     # Verificar se instrutor existe
-    instructor = db.query(User).filter(User.id == instructor_id, User.role == UserRole.INSTRUCTOR).first()
+    instructor = await db.scalar(select(User).where(User.id == instructor_id, User.role == UserRole.INSTRUCTOR))
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instrutor não encontrado"
         )
     
-    reviews = db.query(Review).filter(
-        Review.instructor_id == instructor_id
-    ).offset(skip).limit(limit).all()
-    return reviews
+    query = select(Review).where(Review.instructor_id == instructor_id)
+    return await conditional_list(db, request, response, Review, query, (Review.id,), cursor, skip, limit)
 
 
-@router.get("/instructor/{instructor_id}/stats", response_model=InstructorRatingStats)
-def get_instructor_rating_stats(instructor_id: int, db: Session = Depends(get_db)):
-    """Obter estatísticas de avaliação de um instrutor"""
+@router.get("/instructor/{instructor_id}/export", response_class=StreamingResponse)
+@query_budget(1)
+async def export_instructor_reviews(
+    instructor_id: int,
+    request: Request,
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson (um objeto por linha) ou csv"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Exportar todas as avaliações de um instrutor, da mais antiga à mais recente (streaming)"""
     # Verificar se instrutor existe
-    instructor = db.query(User).filter(User.id == instructor_id, User.role == UserRole.INSTRUCTOR).first()
+    instructor = await db.scalar(select(User.id).where(User.id == instructor_id, User.role == UserRole.INSTRUCTOR))
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instrutor não encontrado"
         )
     
-    # Calcular média e total
-    stats = db.query(
-        func.avg(Review.rating).label('average'),
-        func.count(Review.id).label('total')
-    ).filter(Review.instructor_id == instructor_id).first()
-    
-    average_rating = float(stats.average) if stats.average else 0.0
-    total_reviews = stats.total
+    # Ordem do índice (instructor_id, created_at): as linhas saem sem ordenação prévia
+    query = (
+        select(Review.__table__)
+        .where(Review.instructor_id == instructor_id)
+        .order_by(Review.created_at, Review.id)
+    )
+    return export_response(lambda: open_read_session(request), query, file_format, f"avaliacoes-instrutor-{instructor_id}")
+
+
+@router.get("/instructor/{instructor_id}/stats", response_model=InstructorRatingStats)
+@query_budget(1)
+async def get_instructor_rating_stats(instructor_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Obter estatísticas de avaliação de um instrutor"""
+    # Verificar se instrutor existe e ler o resumo das avaliações na mesma consulta
+    result = await db.execute(
+        select(User.id, InstructorRatingSummary)
+        .outerjoin(InstructorRatingSummary, InstructorRatingSummary.instructor_id == User.id)
+        .where(User.id == instructor_id, User.role == UserRole.INSTRUCTOR)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instrutor não encontrado"
+        )
     
-    # Calcular distribuição de ratings
-    rating_distribution = {}
-    for rating in range(1, 6):
-        count = db.query(Review).filter(
-            Review.instructor_id == instructor_id,
-            Review.rating == rating
-        ).count()
-        rating_distribution[rating] = count
+    summary = row.InstructorRatingSummary
+    if summary is None:
+        return InstructorRatingStats(
+            instructor_id=instructor_id,
+            average_rating=0.0,
+            total_reviews=0,
+            rating_distribution={rating: 0 for rating in range(1, 6)}
+        )
     
     return InstructorRatingStats(
         instructor_id=instructor_id,
-        average_rating=round(average_rating, 2),
-        total_reviews=total_reviews,
-        rating_distribution=rating_distribution
+        average_rating=round(summary.average_rating, 2),
+        total_reviews=summary.total_reviews,
+        rating_distribution=summary.rating_distribution()
     )
 
 
+@router.get("/batch", response_model=Batch[ReviewResponse])
+@fast_json(ReviewResponse)
+@query_budget(1)
+async def get_reviews_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter vários avaliações pelos ids com uma consulta (ids inexistentes vêm em missing)"""
+    return await fetch_batch(db, Review, parse_ids(ids))
+
+
+@router.post("/batch", response_model=Batch[ReviewResponse])
+@fast_json(ReviewResponse)
+@query_budget(1)
+@read_only
+async def post_reviews_batch(
+    batch: BatchRequest,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Como GET /batch, com os ids no corpo (listas longas demais para a URL)"""
+    return await fetch_batch(db, Review, batch.ids)
+
+
 @router.get("/{review_id}", response_model=ReviewResponse)
-def get_review(review_id: int, db: Session = Depends(get_db)):
-    """Obter uma avaliação específica"""
-    review = db.query(Review).filter(Review.id == review_id).first()
+@fast_json(ReviewResponse)
+@query_budget(2)
+async def get_review(review_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    """Obter uma avaliação específica (com ETag e Last-Modified)"""
+    cached = await check_not_modified(db, request, Review, Review.id == review_id)
+    if cached is not None:
+        return cached
+    
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Avaliação não encontrada"
         )
+    set_entity_headers(response, review)
     return review
 
 
 @router.put("/{review_id}", response_model=ReviewResponse)
-def update_review(review_id: int, review_update: ReviewUpdate, db: Session = Depends(get_db)):
-    """Atualizar uma avaliação"""
-    db_review = db.query(Review).filter(Review.id == review_id).first()
+async def update_review(
+    review_id: int,
+    review_update: ReviewUpdate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    """Atualizar uma avaliação (If-Match: só se o ETag ainda for o atual)"""
+    db_review = await db.get(Review, review_id)
     if not db_review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Avaliação não encontrada"
         )
+    check_if_match(request, db_review)
     
     # Atualizar campos fornecidos
     update_data = review_update.model_dump(exclude_unset=True)
+    old_rating = db_review.rating
     for field, value in update_data.items():
         setattr(db_review, field, value)
     
-    db.commit()
-    db.refresh(db_review)
+    await apply_rating_change(db, db_review.instructor_id, removed=old_rating, added=db_review.rating)
+    await db.commit()
+    await db.refresh(db_review)
+    set_entity_headers(response, db_review)
     return db_review
 
 
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_review(review_id: int, db: Session = Depends(get_db)):
+async def delete_review(review_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar uma avaliação"""
-    db_review = db.query(Review).filter(Review.id == review_id).first()
+    db_review = await db.get(Review, review_id)
     if not db_review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Avaliação não encontrada"
         )
     
-    db.delete(db_review)
-    db.commit()
+    await db.delete(db_review)
+    await apply_rating_change(db, db_review.instructor_id, removed=db_review.rating)
+    await db.commit()
     return None
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import os
 import shutil
 from pathlib import Path
 import uuid
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.database.query_stats import query_budget
 from app.models import User, InstructorProfile, InstructorDocument, DocumentType
 from app.schemas import InstructorDocumentResponse
 
@@ -35,15 +38,24 @@ def save_upload_file(upload_file: UploadFile, destination: Path) -> str:
         upload_file.file.close()
 
 
+def remove_file(path: str):
+    """Remover arquivo do disco, ignorando falhas"""
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except:
+            pass
+
+
 @router.post("/profile-photo/{user_id}")
-def upload_profile_photo(
+async def upload_profile_photo(
     user_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload de foto de perfil do usuário"""
     # Verificar se usuário existe
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -63,18 +75,14 @@ def upload_profile_photo(
     file_path = PROFILE_PHOTOS_DIR / unique_filename
     
     # Deletar foto antiga se existir
-    if user.profile_photo and os.path.exists(user.profile_photo):
-        try:
-            os.remove(user.profile_photo)
-        except:
-            pass
+    await run_in_threadpool(remove_file, user.profile_photo)
     
     # Salvar arquivo
-    saved_path = save_upload_file(file, file_path)
+    saved_path = await run_in_threadpool(save_upload_file, file, file_path)
     
     # Atualizar usuário
     user.profile_photo = saved_path
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Foto de perfil enviada com sucesso",
@@ -84,17 +92,15 @@ def upload_profile_photo(
 
 
 @router.post("/instructor-document/{instructor_profile_id}", response_model=InstructorDocumentResponse)
-def upload_instructor_document(
+async def upload_instructor_document(
     instructor_profile_id: int,
     document_type: DocumentType = Form(...),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload de documento do instrutor"""
     # Verificar se instrutor existe
-    instructor = db.query(InstructorProfile).filter(
-        InstructorProfile.id == instructor_profile_id
-    ).first()
+    instructor = await db.get(InstructorProfile, instructor_profile_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,7 +120,7 @@ def upload_instructor_document(
     file_path = DOCUMENTS_DIR / unique_filename
     
     # Salvar arquivo
-    saved_path = save_upload_file(file, file_path)
+    saved_path = await run_in_threadpool(save_upload_file, file, file_path)
     
     # Criar registro no banco
     document = InstructorDocument(
@@ -124,35 +130,34 @@ def upload_instructor_document(
         original_filename=file.filename
     )
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    await db.refresh(document)
     
     return document
 
 
 @router.get("/instructor-documents/{instructor_profile_id}", response_model=List[InstructorDocumentResponse])
-def list_instructor_documents(instructor_profile_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def list_instructor_documents(instructor_profile_id: int, db: AsyncSession = Depends(get_read_db)):
     """Listar documentos de um instrutor"""
     # Verificar se instrutor existe
-    instructor = db.query(InstructorProfile).filter(
-        InstructorProfile.id == instructor_profile_id
-    ).first()
+    instructor = await db.get(InstructorProfile, instructor_profile_id)
     if not instructor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil de instrutor não encontrado"
         )
     
-    documents = db.query(InstructorDocument).filter(
-        InstructorDocument.instructor_id == instructor_profile_id
-    ).all()
-    return documents
+    documents = await db.scalars(
+        select(InstructorDocument).where(InstructorDocument.instructor_id == instructor_profile_id)
+    )
+    return documents.all()
 
 
 @router.delete("/instructor-document/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_instructor_document(document_id: int, db: Session = Depends(get_db)):
+async def delete_instructor_document(document_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar documento do instrutor"""
-    document = db.query(InstructorDocument).filter(InstructorDocument.id == document_id).first()
+    document = await db.get(InstructorDocument, document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -160,20 +165,16 @@ def delete_instructor_document(document_id: int, db: Session = Depends(get_db)):
         )
     
     # Deletar arquivo do disco
-    if os.path.exists(document.file_path):
-        try:
-            os.remove(document.file_path)
-        except:
-            pass
+    await run_in_threadpool(remove_file, document.file_path)
     
     # Deletar registro do banco
-    db.delete(document)
-    db.commit()
+    await db.delete(document)
+    await db.commit()
     return None
 
 
 @router.get("/info")
-def get_upload_info():
+async def get_upload_info():
     """Obter informações sobre uploads permitidos"""
     return {
         "profile_photos": {
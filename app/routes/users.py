@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import User
-from app.schemas import UserCreate, UserUpdate, UserResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.batch import IDS_DESCRIPTION, fetch_batch, parse_ids
+from app.database import get_db, get_read_db, read_only
+from app.database.query_stats import query_budget
+from app.http_cache import check_if_match, check_not_modified, conditional_list, set_entity_headers
+from app.models import Appointment, User
+from app.pagination import CURSOR_DESCRIPTION
+from app.schemas import UserCreate, UserUpdate, UserResponse, Page, Batch, BatchRequest
+from app.serialization import fast_json
+from app.sparse_fields import FIELDS_DESCRIPTION, parse_fields
+from app.services.approval import invalidate_approval_counts
+from app.services.calendar import touch_calendars
+from app.services.instructor_search import invalidate_all
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Criar um novo usuário"""
     # Verificar se email já existe
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,39 +41,102 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         phone=user.phone
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
-@router.get("/", response_model=List[UserResponse])
-def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Listar todos os usuários"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+@router.get("/", response_model=Union[Page[UserResponse], List[UserResponse]])
+@fast_json(UserResponse)
+@query_budget(2)
+async def list_users(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Listar todos os usuários (com ETag: If-None-Match responde 304 se a página não mudou)"""
+    fieldset = parse_fields(UserResponse, fields)
+    order_by = (User.id,)
+    result = await conditional_list(
+        db, request, response, User, select(User), order_by, cursor, skip, limit,
+        options=fieldset.options(User, *order_by), variant=fieldset.tag
+    )
+    return fieldset.render(result, response)
+
+
+@router.get("/batch", response_model=Batch[UserResponse])
+@fast_json(UserResponse)
+@query_budget(1)
+async def get_users_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter vários usuários pelos ids com uma consulta (ids inexistentes vêm em missing)"""
+    fieldset = parse_fields(UserResponse, fields)
+    return fieldset.render(await fetch_batch(db, User, parse_ids(ids), fieldset.options(User)))
+
+
+@router.post("/batch", response_model=Batch[UserResponse])
+@fast_json(UserResponse)
+@query_budget(1)
+@read_only
+async def post_users_batch(
+    batch: BatchRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Como GET /batch, com os ids no corpo (listas longas demais para a URL)"""
+    fieldset = parse_fields(UserResponse, fields)
+    return fieldset.render(await fetch_batch(db, User, batch.ids, fieldset.options(User)))
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    """Obter um usuário específico"""
-    user = db.query(User).filter(User.id == user_id).first()
+@fast_json(UserResponse)
+@query_budget(2)
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Obter um usuário específico (com ETag e Last-Modified)"""
+    fieldset = parse_fields(UserResponse, fields)
+    cached = await check_not_modified(db, request, User, User.id == user_id, variant=fieldset.tag)
+    if cached is not None:
+        return cached
+    
+    user = await db.get(User, user_id, options=fieldset.options(User))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
-    return user
+    set_entity_headers(response, user, fieldset.tag)
+    return fieldset.render(user, response)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
-    """Atualizar um usuário"""
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    """Atualizar um usuário (If-Match: só se o ETag ainda for o atual)"""
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
+    check_if_match(request, db_user)
     
     # Atualizar campos fornecidos
     update_data = user_update.model_dump(exclude_unset=True)
@@ -73,21 +146,31 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
     for field, value in update_data.items():
         setattr(db_user, field, value)
     
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    set_entity_headers(response, db_user)
     return db_user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Deletar um usuário"""
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
         )
     
-    db.delete(db_user)
-    db.commit()
+    # Os agendamentos do usuário são removidos em cascata e saem também dos feeds dos outros participantes
+    participants = await db.scalars(union(
+        select(Appointment.student_id).where(Appointment.instructor_id == user_id),
+        select(Appointment.instructor_id).where(Appointment.student_id == user_id)
+    ))
+    await db.delete(db_user)
+    await touch_calendars(db, user_id, *participants.all())
+    await db.commit()
+    # O perfil de instrutor é removido em cascata
+    invalidate_approval_counts()
+    invalidate_all()
     return None
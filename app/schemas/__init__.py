@@ -1,11 +1,14 @@
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
-from app.schemas.instructor_profile import InstructorProfileCreate, InstructorProfileUpdate, InstructorProfileResponse
-from app.schemas.instructor_availability import InstructorAvailabilityCreate, InstructorAvailabilityUpdate, InstructorAvailabilityResponse
+from app.schemas.instructor_profile import InstructorProfileCreate, InstructorProfileUpdate, InstructorProfileResponse, InstructorCard
+from app.schemas.instructor_availability import InstructorAvailabilityCreate, InstructorAvailabilityUpdate, InstructorAvailabilityResponse, AvailableSlot, WeeklySchedule
 from app.schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
-from app.schemas.instructor_time_off import InstructorTimeOffCreate, InstructorTimeOffUpdate, InstructorTimeOffResponse
+from app.schemas.instructor_time_off import InstructorTimeOffCreate, InstructorTimeOffUpdate, InstructorTimeOffResponse, InstructorTimeOffBulkCreate, InstructorTimeOffBulkResult
 from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse, InstructorRatingStats
 from app.schemas.instructor_document import InstructorDocumentCreate, InstructorDocumentResponse
-from app.schemas.instructor_approval import InstructorApprovalUpdate
+from app.schemas.instructor_approval import InstructorApprovalUpdate, ApprovalQueue
+from app.schemas.imports import AppointmentImport, ImportRowError, ImportResult
+from app.schemas.pagination import Page
+from app.schemas.batch import Batch, BatchRequest
 
 __all__ = [
     "UserCreate",
@@ -14,20 +17,32 @@ __all__ = [
     "InstructorProfileCreate",
     "InstructorProfileUpdate",
     "InstructorProfileResponse",
+    "InstructorCard",
     "InstructorAvailabilityCreate",
     "InstructorAvailabilityUpdate",
     "InstructorAvailabilityResponse",
+    "AvailableSlot",
+    "WeeklySchedule",
     "AppointmentCreate",
     "AppointmentUpdate",
     "AppointmentResponse",
     "InstructorTimeOffCreate",
     "InstructorTimeOffUpdate",
     "InstructorTimeOffResponse",
+    "InstructorTimeOffBulkCreate",
+    "InstructorTimeOffBulkResult",
     "ReviewCreate",
     "ReviewUpdate",
     "ReviewResponse",
     "InstructorRatingStats",
     "InstructorDocumentCreate",
     "InstructorDocumentResponse",
-    "InstructorApprovalUpdate"
+    "InstructorApprovalUpdate",
+    "ApprovalQueue",
+    "AppointmentImport",
+    "ImportRowError",
+    "ImportResult",
+    "Page",
+    "Batch",
+    "BatchRequest"
 ]
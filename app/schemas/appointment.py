@@ -40,6 +40,8 @@ class AppointmentResponse(AppointmentBase):
     student_id: int
     instructor_id: int
     status: AppointmentStatus
+    version: int = Field(..., description="Incrementada a cada alteração (ETag / If-Match)")
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, TypeVar
+
+T = TypeVar("T")
+
+
+class BatchRequest(BaseModel):
+    """Ids de uma leitura em lote (POST /<recurso>/batch)"""
+    ids: List[int] = Field(..., description="Ids na ordem desejada (máximo BATCH_MAX_IDS)")
+
+
+class Batch(BaseModel, Generic[T]):
+    """Schema de resposta das leituras em lote"""
+    items: List[T] = Field(..., description="Registros encontrados, na ordem dos ids pedidos")
+    missing: List[int] = Field(..., description="Ids pedidos que não existem")
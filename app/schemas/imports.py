@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from app.models.appointment import AppointmentStatus
+from app.schemas.appointment import AppointmentBase
+
+
+class AppointmentImport(AppointmentBase):
+    """Linha de importação de Appointment: aluno e instrutor pelo id ou pelo email"""
+    # Emails só são procurados entre os usuários: sem a validação (lenta) do EmailStr
+    student_id: Optional[int] = None
+    student_email: Optional[str] = Field(None, max_length=255)
+    instructor_id: Optional[int] = None
+    instructor_email: Optional[str] = Field(None, max_length=255)
+    status: AppointmentStatus = AppointmentStatus.PENDING
+
+    @model_validator(mode='after')
+    def validate_references(self):
+        if self.student_id is None and self.student_email is None:
+            raise ValueError('Informe student_id ou student_email')
+        if self.instructor_id is None and self.instructor_email is None:
+            raise ValueError('Informe instructor_id ou instructor_email')
+        return self
+
+
+class ImportRowError(BaseModel):
+    """Linha rejeitada na importação"""
+    line: int = Field(..., description="Número da linha no arquivo (CSV: a linha do cabeçalho é a 1)")
+    error: str
+
+
+class ImportResult(BaseModel):
+    """Resumo de uma importação"""
+    processed: int
+    inserted: int
+    failed: int
+    errors: List[ImportRowError] = Field(..., description="Primeiras linhas rejeitadas (ver errors_truncated)")
+    errors_truncated: bool = False
@@ -1,9 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, Optional
 from app.models.instructor_profile import ApprovalStatus
+from app.schemas.instructor_profile import InstructorProfileResponse
+from app.schemas.pagination import Page
 
 
 class InstructorApprovalUpdate(BaseModel):
     """Schema para atualizar status de aprovação do instrutor"""
     approval_status: ApprovalStatus
     rejection_reason: Optional[str] = Field(None, description="Motivo da rejeição (obrigatório se status for 'rejected')")
+
+
+class ApprovalQueue(Page[InstructorProfileResponse]):
+    """Página da fila de aprovação com a contagem de cada status consultado"""
+    counts: Dict[str, int] = Field(..., description="Total de instrutores em cada status filtrado")
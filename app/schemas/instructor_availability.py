@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-from datetime import time
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
+from datetime import datetime, time
 
 
 class InstructorAvailabilityBase(BaseModel):
@@ -31,6 +31,22 @@ class InstructorAvailabilityUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class WeeklySchedule(BaseModel):
+    """Schema para substituir a grade semanal inteira de um instrutor"""
+    windows: List[InstructorAvailabilityBase] = Field(..., description="Todas as janelas da semana; as que ficarem de fora são removidas")
+    
+    @model_validator(mode='after')
+    def validate_no_overlap(self):
+        windows = sorted(self.windows, key=lambda window: (window.day_of_week, window.start_time))
+        for previous, window in zip(windows, windows[1:]):
+            if window.day_of_week == previous.day_of_week and window.start_time < previous.end_time:
+                raise ValueError(
+                    f"Janelas sobrepostas no dia {window.day_of_week}: "
+                    f"{previous.start_time}-{previous.end_time} e {window.start_time}-{window.end_time}"
+                )
+        return self
+
+
 class InstructorAvailabilityResponse(InstructorAvailabilityBase):
     """Schema de resposta para InstructorAvailability"""
     id: int
@@ -38,3 +54,9 @@ class InstructorAvailabilityResponse(InstructorAvailabilityBase):
     
     class Config:
         from_attributes = True
+
+
+class AvailableSlot(BaseModel):
+    """Horário livre para agendamento"""
+    start_date: datetime
+    end_date: datetime
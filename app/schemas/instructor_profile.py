@@ -3,6 +3,7 @@ from typing import Optional
 from decimal import Decimal
 from datetime import datetime
 from app.models.instructor_profile import TransmissionType, ApprovalStatus
+from app.schemas.instructor_availability import AvailableSlot
 
 
 class InstructorProfileBase(BaseModel):
@@ -36,6 +37,23 @@ class InstructorProfileResponse(InstructorProfileBase):
     approval_status: ApprovalStatus
     approval_date: Optional[datetime] = None
     rejection_reason: Optional[str] = None
+    version: int = Field(..., description="Incrementada a cada alteração (ETag / If-Match)")
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+
+class InstructorCard(BaseModel):
+    """Card de instrutor da busca: perfil, usuário, avaliações e próximo horário livre"""
+    id: int
+    user_id: int
+    name: str
+    profile_photo: Optional[str] = None
+    city: str
+    hourly_rate: Decimal
+    transmission: TransmissionType
+    car_model: Optional[str] = None
+    average_rating: float = Field(..., description="Média das avaliações (0 sem avaliações)")
+    total_reviews: int
+    next_slot: Optional[AvailableSlot] = Field(None, description="Primeiro horário livre no período consultado")
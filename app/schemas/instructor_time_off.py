@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Literal, Optional
+import datetime
 from datetime import date
 
 
@@ -16,7 +17,8 @@ class InstructorTimeOffCreate(InstructorTimeOffBase):
 
 class InstructorTimeOffUpdate(BaseModel):
     """Schema para atualização de InstructorTimeOff"""
-    date: Optional[date] = None
+    # datetime.date por extenso: o nome do campo encobre o tipo date (viraria Optional[None])
+    date: Optional[datetime.date] = None
     reason: Optional[str] = Field(None, max_length=255)
 
 
@@ -27,3 +29,62 @@ class InstructorTimeOffResponse(InstructorTimeOffBase):
     
     class Config:
         from_attributes = True
+
+
+class TimeOffRange(BaseModel):
+    """Período de dias consecutivos bloqueados (start e end inclusive)"""
+    start: date
+    end: date
+    
+    @field_validator('end')
+    @classmethod
+    def validate_end(cls, v, info):
+        if 'start' in info.data and v < info.data['start']:
+            raise ValueError('end deve ser maior ou igual a start')
+        return v
+
+
+class TimeOffRecurrence(BaseModel):
+    """Regra de repetição: semanal (nos days_of_week), mensal ou anual (no dia de start)"""
+    frequency: Literal["weekly", "monthly", "yearly"]
+    start: date
+    until: date
+    interval: int = Field(1, ge=1, le=52, description="A cada quantas semanas, meses ou anos")
+    days_of_week: Optional[List[int]] = Field(
+        None, description="Só para weekly: 0=Domingo ... 6=Sábado (padrão: o dia de start)"
+    )
+    
+    @field_validator('until')
+    @classmethod
+    def validate_until(cls, v, info):
+        if 'start' in info.data and v < info.data['start']:
+            raise ValueError('until deve ser maior ou igual a start')
+        return v
+    
+    @field_validator('days_of_week')
+    @classmethod
+    def validate_days_of_week(cls, v):
+        if v is not None and any(day < 0 or day > 6 for day in v):
+            raise ValueError('days_of_week deve conter valores de 0 a 6')
+        return v
+
+
+class InstructorTimeOffBulkCreate(BaseModel):
+    """Schema para bloquear várias datas de uma vez"""
+    instructor_id: int
+    dates: List[date] = []
+    ranges: List[TimeOffRange] = []
+    recurrences: List[TimeOffRecurrence] = []
+    reason: Optional[str] = Field(None, max_length=255)
+    
+    @model_validator(mode='after')
+    def validate_not_empty(self):
+        if not (self.dates or self.ranges or self.recurrences):
+            raise ValueError('Informe ao menos uma data, período ou regra de repetição')
+        return self
+
+
+class InstructorTimeOffBulkResult(BaseModel):
+    """Resultado da criação em lote"""
+    created: List[InstructorTimeOffResponse]
+    skipped: List[date] = Field(..., description="Datas que já estavam bloqueadas")
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Schema de resposta das listagens paginadas por cursor"""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -28,6 +28,8 @@ class ReviewResponse(ReviewBase):
     student_id: int
     instructor_id: int
     created_at: datetime
+    version: int = Field(..., description="Incrementada a cada alteração (ETag / If-Match)")
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -31,6 +31,8 @@ class UserResponse(UserBase):
     """Schema de resposta para User"""
     id: int
     created_at: datetime
+    version: int = Field(..., description="Incrementada a cada alteração (ETag / If-Match)")
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
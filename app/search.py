@@ -0,0 +1,90 @@
+"""Busca textual sem acentos e sem diferenciar maiúsculas (cidade dos instrutores).
+
+Os valores pesquisáveis são gravados normalizados (ver normalize_text) em uma
+coluna própria com índice comum, e a busca por prefixo usa esse índice. A
+busca por trecho em qualquer posição (o padrão, como o ilike('%cidade%')
+anterior) usa o índice de trigramas criado pela migração 5: FTS5 no SQLite,
+pg_trgm no PostgreSQL (que o LIKE já aproveita). Sem o índice, ou com termos
+curtos demais para trigramas, a busca por trecho é um LIKE '%termo%' comum.
+"""
+import functools
+import unicodedata
+from sqlalchemy import case, column, inspect, select, table
+from app.database import engine
+
+# Tabela FTS5 (SQLite) mantida por triggers a partir de instructor_profiles.city_normalized
+CITY_FTS_TABLE = "instructor_profiles_city_fts"
+# O tokenizador trigram só encontra trechos com pelo menos 3 caracteres
+MIN_FUZZY_LENGTH = 3
+
+
+def normalize_text(value):
+    """Minúsculas, sem acentos e com espaços simples: "  São  Paulo" -> "sao paulo" """
+    if value is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def escape_like(term: str) -> str:
+    return term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def escape_glob(term: str) -> str:
+    return "".join(f"[{char}]" if char in "*?[" else char for char in term)
+
+
+def prefix_match(text_column, term: str):
+    """Condição "text_column começa com term" que usa o índice B-tree da coluna"""
+    if engine.dialect.name == "sqlite":
+        # No SQLite, LIKE só usa o índice com COLLATE NOCASE; GLOB usa o índice comum
+        return text_column.op("GLOB")(escape_glob(term) + "*")
+    # No PostgreSQL, o índice é criado com text_pattern_ops
+    return text_column.like(escape_like(term) + "%", escape="/")
+
+
+@functools.lru_cache(maxsize=1)
+def sqlite_trigram_index() -> bool:
+    """Se a migração 5 criou a tabela FTS5 (SQLite sem FTS5/trigram fica sem ela).
+
+    Verificado uma vez, na inicialização da aplicação (main.lifespan), para a
+    consulta não entrar no orçamento da primeira busca.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect() as conn:
+        return inspect(conn).has_table(CITY_FTS_TABLE)
+
+
+def substring_match(id_column, text_column, term: str):
+    """Condição "text_column contém term", pelo índice de trigramas quando ele existe"""
+    if len(term) >= MIN_FUZZY_LENGTH and sqlite_trigram_index():
+        fts = table(CITY_FTS_TABLE, column("rowid"), column("city_normalized"))
+        phrase = '"' + term.replace('"', '""') + '"'
+        return id_column.in_(select(fts.c.rowid).where(fts.c.city_normalized.match(phrase)))
+    return text_column.like("%" + escape_like(term) + "%", escape="/")
+
+
+def search_city(query, model, city: str, fuzzy: bool = True):
+    """Filtrar query pela cidade e devolver (query, ordenação).
+
+    A ordenação (city_normalized, id) segue o índice e coloca a cidade exata
+    antes das que só começam com o termo; as cidades que contêm o termo em
+    outra posição vêm depois. fuzzy=False restringe a busca ao prefixo.
+    """
+    term = normalize_text(city)
+    prefix = prefix_match(model.city_normalized, term)
+    if not fuzzy:
+        return query.where(prefix), (model.city_normalized, model.id)
+
+    query = query.where(prefix | substring_match(model.id, model.city_normalized, term))
+    rank = case((prefix, 0), else_=1)
+    return query, (rank, model.city_normalized, model.id)
+
+
+def city_matches(term: str, city_normalized: str, fuzzy: bool = True) -> bool:
+    """Se search_city(term, fuzzy) encontraria uma cidade já normalizada"""
+    if city_normalized.startswith(term):
+        return True
+    return fuzzy and term in city_normalized
@@ -0,0 +1,94 @@
+"""Caminho rápido de serialização das respostas JSON (JSON_FAST_PATH=true).
+
+Pelo caminho padrão, o FastAPI valida cada objeto ORM contra o
+response_model, converte o resultado em dicts (jsonable_encoder) e só então
+chama json.dumps. Nas rotas de leitura marcadas com @fast_json(Schema), o
+caminho rápido valida os objetos uma única vez, com TypeAdapters criados na
+importação, e gera os bytes direto no pydantic-core (dump_json), sem dicts
+intermediários; a resposta pronta não passa de novo pelo response_model. As
+demais rotas usam ORJSONResponse quando o pacote opcional orjson está
+instalado.
+
+O JSON é o mesmo nos dois caminhos: os schemas e os serializadores são os do
+pydantic. Para medir a diferença: python benchmark_serialization.py
+"""
+import functools
+from typing import List
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from app.config import settings
+from app.schemas import AppointmentResponse, Batch, InstructorCard, InstructorProfileResponse, Page, ReviewResponse, UserResponse
+
+try:
+    import orjson
+except ImportError:  # pacote opcional
+    orjson = None
+
+
+class ResponseAdapters:
+    """TypeAdapters de um schema de resposta: um item, lista, página {items, next_cursor}
+    e lote {items, missing}"""
+
+    __slots__ = ("one", "many", "page", "batch")
+
+    def __init__(self, schema):
+        self.one = TypeAdapter(schema)
+        self.many = TypeAdapter(List[schema])
+        self.page = TypeAdapter(Page[schema])
+        self.batch = TypeAdapter(Batch[schema])
+
+    def render(self, result) -> bytes:
+        """JSON de um objeto, de uma lista, de uma página ou de um lote (objetos ORM ou dicts)"""
+        if isinstance(result, dict):
+            adapter = self.batch if "missing" in result else self.page
+        elif isinstance(result, (list, tuple)):
+            adapter = self.many
+        else:
+            adapter = self.one
+        return adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+
+ADAPTERS = {
+    schema: ResponseAdapters(schema)
+    for schema in (UserResponse, InstructorProfileResponse, InstructorCard, AppointmentResponse, ReviewResponse)
+}
+
+
+def default_response_class():
+    """Classe de resposta da aplicação: ORJSONResponse no caminho rápido, se o orjson estiver instalado"""
+    return ORJSONResponse if settings.json_fast_path and orjson is not None else JSONResponse
+
+
+def json_response(body: bytes, sub_response=None) -> Response:
+    """Resposta com o JSON já serializado e os cabeçalhos definidos pela rota no parâmetro `response`"""
+    response = Response(body, media_type="application/json")
+    if isinstance(sub_response, Response):
+        response.raw_headers.extend(sub_response.raw_headers)
+    return response
+
+
+def fast_json(schema):
+    """Serializar o retorno da rota com os TypeAdapters de schema quando JSON_FAST_PATH=true.
+
+    Aplicar abaixo do decorador da rota, só em rotas de leitura (o status é
+    sempre 200):
+
+        @router.get("/...", response_model=List[UserResponse])
+        @fast_json(UserResponse)
+        async def handler(...):
+
+    Respostas prontas (ex.: 304) passam sem alteração, e os cabeçalhos que a
+    rota definir no parâmetro `response` (ex.: ETag) são mantidos.
+    """
+    adapters = ADAPTERS[schema]
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if not settings.json_fast_path or isinstance(result, Response):
+                return result
+            return json_response(adapters.render(result), kwargs.get("response"))
+        return wrapper
+    return decorator
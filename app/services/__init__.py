@@ -0,0 +1 @@
+"""Regras de negócio compartilhadas entre rotas e comandos de manutenção"""
@@ -0,0 +1,35 @@
+"""Contagem de instrutores por status de aprovação, com cache de curta duração.
+
+A contagem é um único GROUP BY sobre o índice (approval_status, id). As rotas
+que mudam o status, criam ou removem perfis chamam invalidate_approval_counts
+depois do commit.
+"""
+from sqlalchemy import func, select
+from app.cache import TTLCache
+from app.config import settings
+from app.models import ApprovalStatus, InstructorProfile
+
+approval_counts_cache = TTLCache("approval_counts", settings.approval_stats_ttl)
+
+
+async def count_by_approval_status(db) -> dict:
+    """{status: quantidade} com todos os status, inclusive os sem instrutores"""
+    counts = approval_counts_cache.get("counts")
+    if counts is not None:
+        return dict(counts)
+
+    generation = approval_counts_cache.generation
+    rows = await db.execute(
+        select(InstructorProfile.approval_status, func.count())
+        .group_by(InstructorProfile.approval_status)
+    )
+    counts = dict.fromkeys((status_value.value for status_value in ApprovalStatus), 0)
+    for status_value, count in rows:
+        if status_value is not None:
+            counts[status_value.value] = count
+    approval_counts_cache.set("counts", counts, generation=generation)
+    return dict(counts)
+
+
+def invalidate_approval_counts():
+    approval_counts_cache.invalidate()
@@ -0,0 +1,132 @@
+"""Validação de agendamentos contra a agenda do instrutor.
+
+Um agendamento (não cancelado) precisa caber na grade semanal do instrutor,
+não cair em uma exceção de agenda e não se sobrepor a outro agendamento do
+mesmo instrutor. A rota verifica tudo antes (check_schedule e
+check_conflicts), o que recusa a maioria dos conflitos sem travar nada, e
+depois repete check_conflicts e grava dentro de schedule_lock, que só libera
+a agenda depois do commit. Assim duas reservas simultâneas não passam ambas
+pela verificação:
+
+- SQLite: a primeira escrita da transação obtém a trava de escrita do banco
+  (como um BEGIN IMMEDIATE), e as reservas de outros processos esperam o
+  busy_timeout. Dentro do processo, as reservas fazem fila em um asyncio.Lock
+  em vez de disputar a trava do banco.
+- PostgreSQL: SELECT ... FOR UPDATE na linha do instrutor, que serializa só as
+  reservas do mesmo instrutor. A restrição de exclusão
+  ex_appointments_instructor_overlap (migração 8) garante a regra mesmo para
+  escritas feitas fora da API.
+"""
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from app.database import engine
+from app.models import Appointment, AppointmentStatus, InstructorAvailability, InstructorProfile, InstructorTimeOff, User
+from app.services.slots import expand_weekly
+
+OVERLAP_CONSTRAINT = "ex_appointments_instructor_overlap"
+CONFLICT_DETAIL = "Horário indisponível: o instrutor já tem um agendamento nesse período"
+
+
+# Um asyncio.Lock por event loop (os testes podem abrir mais de um loop no processo)
+sqlite_booking_locks = weakref.WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def schedule_lock(db, instructor_id: int):
+    """Travar a agenda do instrutor (id do usuário) até o fim do bloco.
+
+    O bloco deve terminar com o commit; se levantar uma exceção, a transação
+    é desfeita antes de liberar a trava.
+    """
+    if engine.dialect.name == "sqlite":
+        loop = asyncio.get_running_loop()
+        lock = sqlite_booking_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            appointments = Appointment.__table__
+            await db.execute(delete(appointments).where(appointments.c.id < 0))
+            try:
+                yield
+            except BaseException:
+                await db.rollback()
+                raise
+    else:
+        if engine.dialect.name == "postgresql":
+            await db.execute(select(User.id).where(User.id == instructor_id).with_for_update())
+        yield
+
+
+def overlapping(instructor_id: int, start: datetime, end: datetime):
+    """Agendamentos não cancelados do instrutor que se sobrepõem a [start, end)"""
+    return (
+        select(Appointment.id)
+        .where(Appointment.instructor_id == instructor_id)
+        .where(Appointment.start_date < end, Appointment.end_date > start)
+        .where(Appointment.status != AppointmentStatus.CANCELLED)
+    )
+
+
+async def check_schedule(db, instructor_id: int, start: datetime, end: datetime):
+    """Levantar HTTPException (400) se [start, end) estiver fora da grade ou em uma exceção do instrutor (id do usuário)"""
+    # Horários da agenda são locais, sem fuso
+    start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+
+    profile_id = await db.scalar(select(InstructorProfile.id).where(InstructorProfile.user_id == instructor_id))
+    if profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Instrutor sem perfil cadastrado"
+        )
+
+    day_off = await db.scalar(
+        select(InstructorTimeOff.date)
+        .where(InstructorTimeOff.instructor_id == profile_id)
+        .where(InstructorTimeOff.date.between(start.date(), end.date()))
+        .limit(1)
+    )
+    if day_off is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Instrutor indisponível em {day_off.isoformat()} (exceção de agenda)"
+        )
+
+    windows = await db.execute(
+        select(InstructorAvailability.day_of_week, InstructorAvailability.start_time, InstructorAvailability.end_time)
+        .where(InstructorAvailability.instructor_id == profile_id, InstructorAvailability.is_active.is_not(False))
+    )
+    # Janelas contíguas (08-12 e 12-16) são unidas: o agendamento pode atravessá-las
+    if expand_weekly(windows.all(), set(), start, end) != [(start, end)]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Horário fora da disponibilidade do instrutor"
+        )
+
+
+async def check_conflicts(db, instructor_id: int, start: datetime, end: datetime, exclude_id: int = None):
+    """Levantar HTTPException (409) se o instrutor (id do usuário) já tiver agendamento em [start, end)"""
+    query = overlapping(instructor_id, start.replace(tzinfo=None), end.replace(tzinfo=None))
+    if exclude_id is not None:
+        query = query.where(Appointment.id != exclude_id)
+    if await db.scalar(query.limit(1)) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=CONFLICT_DETAIL
+        )
+
+
+async def commit_booking(db):
+    """Commit que converte a violação da restrição de exclusão em 409"""
+    try:
+        await db.commit()
+    except IntegrityError as error:
+        await db.rollback()
+        if OVERLAP_CONSTRAINT in str(error.orig):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=CONFLICT_DETAIL
+            )
+        raise
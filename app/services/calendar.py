@@ -0,0 +1,129 @@
+"""Feeds iCalendar (.ics) de instrutores e alunos.
+
+Cada usuário tem um contador em calendar_versions, incrementado na mesma
+transação de toda escrita que muda o seu feed: agendamentos em que ele é
+aluno ou instrutor e, para instrutores, exceções de agenda. O ETag do feed
+combina o contador com o primeiro dia incluído, então um feed sem mudanças
+é respondido com 304 depois de uma única consulta, sem ler os agendamentos.
+
+O conteúdo só depende dessas linhas (nomes de usuários ficam de fora), e
+DTSTAMP é o momento do último incremento do contador (updated_at), para que
+o mesmo ETag corresponda sempre aos mesmos bytes.
+"""
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.database import engine
+from app.models import AppointmentStatus, CalendarVersion, InstructorProfile
+
+PRODID = "-//AutoDominio//Agenda//PT-BR"
+
+EVENT_STATUS = {
+    AppointmentStatus.PENDING: "TENTATIVE",
+    AppointmentStatus.CONFIRMED: "CONFIRMED",
+    AppointmentStatus.COMPLETED: "CONFIRMED",
+    AppointmentStatus.CANCELLED: "CANCELLED",
+}
+
+
+def touch_statement(user_ids):
+    """UPSERT que incrementa o contador de cada usuário (ids ou subconsultas escalares)"""
+    dialect_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    now = datetime.utcnow()
+    statement = dialect_insert(CalendarVersion).values([
+        {"user_id": user_id, "version": 1, "updated_at": now} for user_id in user_ids
+    ])
+    table = CalendarVersion.__table__
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={"version": table.c.version + 1, "updated_at": statement.excluded.updated_at}
+    )
+
+
+async def touch_calendars(db, *user_ids):
+    """Marcar os feeds dos usuários como alterados, na transação da sessão (commit feito pela rota)"""
+    user_ids = sorted({user_id for user_id in user_ids if user_id is not None})
+    if user_ids:
+        await db.execute(touch_statement(user_ids))
+
+
+async def touch_instructor_calendar(db, profile_id: int):
+    """Como touch_calendars, a partir do id do perfil (exceções de agenda)"""
+    user_id = select(InstructorProfile.user_id).where(InstructorProfile.id == profile_id).scalar_subquery()
+    await db.execute(touch_statement([user_id]))
+
+
+def feed_etag(kind: str, user_id: int, version: int, first_day: date) -> str:
+    return f'"{kind}-{user_id}-{version}-{first_day:%Y%m%d}"'
+
+
+def escape(text: str) -> str:
+    """Escapar um valor TEXT (RFC 5545, 3.3.11)"""
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Quebrar a linha em pedaços de até 75 octetos, sem partir caracteres UTF-8"""
+    if len(line.encode()) <= 75:
+        return line
+    parts, current, size = [], [], 0
+    for char in line:
+        length = len(char.encode())
+        # Linhas de continuação começam com um espaço, que conta no limite
+        if size + length > (75 if not parts else 74):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += length
+    parts.append("".join(current))
+    return "\r\n ".join(parts)
+
+
+def render_calendar(name: str, changed_at: datetime, appointments, days_off) -> str:
+    """Texto do .ics: appointments (id, start_date, end_date, status, location_pickup, notes)
+    e days_off (id, date, reason), já ordenados; changed_at (UTC) é a última alteração do feed"""
+    stamp = f"{changed_at:%Y%m%dT%H%M%S}Z"
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+    ]
+    for appointment_id, start, end, status, location, notes in appointments:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:appointment-{appointment_id}@autodominio",
+            f"DTSTAMP:{stamp}",
+            # Horários locais, sem fuso (floating time), como no restante da agenda
+            f"DTSTART:{start:%Y%m%dT%H%M%S}",
+            f"DTEND:{end:%Y%m%dT%H%M%S}",
+            "SUMMARY:Aula de direção",
+            f"STATUS:{EVENT_STATUS[status]}",
+        ]
+        if location:
+            lines.append(f"LOCATION:{escape(location)}")
+        if notes:
+            lines.append(f"DESCRIPTION:{escape(notes)}")
+        lines.append("END:VEVENT")
+    for time_off_id, day, reason in days_off:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:time-off-{time_off_id}@autodominio",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{escape(reason or 'Indisponível')}",
+            "TRANSP:OPAQUE",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "".join(fold(line) + "\r\n" for line in lines)
+
+
+def first_feed_day(past_days: int) -> date:
+    return (datetime.now() - timedelta(days=past_days)).date()
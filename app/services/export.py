@@ -0,0 +1,72 @@
+"""Exportação de consultas em NDJSON ou CSV, linha a linha.
+
+A consulta é lida com um cursor do lado do servidor (AsyncSession.stream, ou
+ThreadedSession.stream no modo síncrono) em lotes de PARTITION_SIZE linhas,
+e cada lote vira um pedaço da resposta assim que chega do banco. Não há
+objetos ORM nem schemas Pydantic no caminho: só o lote atual fica em
+memória, e o primeiro byte sai depois do primeiro lote, qualquer que seja o
+tamanho do resultado.
+
+A consulta deve estar ordenada por um índice; uma ordenação sem índice obriga
+o banco a ler tudo antes de devolver a primeira linha.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from fastapi.responses import StreamingResponse
+
+PARTITION_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def plain(value):
+    """Valor como o JSON da API o representa (datas em ISO 8601, enums pelo valor)"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+async def export_chunks(open_db, query, fmt: str):
+    """Pedaços de texto da exportação; open_db() abre a sessão usada durante o streaming"""
+    async with open_db() as db:
+        result = await db.stream(query)
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+
+        async for rows in result.partitions(PARTITION_SIZE):
+            if fmt == "csv":
+                writer.writerows([plain(value) for value in row] for row in rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, map(plain, row))), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # CSV sem linhas ainda entrega o cabeçalho
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+def export_response(open_db, query, fmt: str, filename: str) -> StreamingResponse:
+    """StreamingResponse com o resultado de `query` em NDJSON ou CSV"""
+    return StreamingResponse(
+        export_chunks(open_db, query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
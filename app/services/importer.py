@@ -0,0 +1,346 @@
+"""Importação em massa de usuários e agendamentos a partir de CSV ou NDJSON.
+
+O arquivo é lido em streaming, linha a linha, e processado em lotes de
+batch_size registros. Cada lote é validado com os schemas da API, tem as
+chaves estrangeiras resolvidas com uma única consulta e é gravado com um
+INSERT em lote seguido de commit. Só o lote atual e as primeiras
+MAX_REPORTED_ERRORS linhas rejeitadas ficam em memória, então o consumo não
+depende do tamanho do arquivo. Lotes já gravados permanecem se a importação
+for interrompida.
+
+    python -m app.services.importer users alunos.csv
+    python -m app.services.importer appointments aulas.ndjson --batch-size 5000
+
+Agendamentos referenciam aluno e instrutor pelo id (student_id,
+instructor_id) ou pelo email (student_email, instructor_email). Por serem
+dados históricos, não passam pelas regras de reserva (grade, exceções e
+sobreposição); no PostgreSQL a restrição de sobreposição continua valendo e
+as linhas que a violam são rejeitadas.
+"""
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import sys
+from collections import deque
+from operator import itemgetter
+from time import perf_counter
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database.connection import AsyncSessionLocal, SessionLocal, open_session
+from app.models import Appointment, User, UserRole
+from app.schemas import AppointmentImport, UserCreate
+from app.services.calendar import touch_calendars
+
+FORMATS = ("csv", "ndjson")
+# Linhas rejeitadas devolvidas no relatório; as demais só entram na contagem
+MAX_REPORTED_ERRORS = 1000
+# Linhas que um campo entre aspas pode ocupar no CSV; além disso, as aspas são
+# tratadas como não terminadas e a leitura recomeça na linha seguinte à do registro
+MAX_QUOTED_LINES = 100
+
+
+class ImportFormatError(ValueError):
+    """Arquivo ilegível como um todo (codificação ou cabeçalho)"""
+
+
+class ImportReport:
+    """Contadores e primeiras linhas rejeitadas de uma importação"""
+
+    __slots__ = ("processed", "inserted", "failed", "errors")
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def reject(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            # Erros de formato são registrados antes dos erros de validação do lote
+            "errors": sorted(self.errors, key=itemgetter("line")),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def iter_lines(chunks):
+    """Linhas de texto de um iterador assíncrono de bytes em UTF-8 (com ou sem BOM)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as error:
+        raise ImportFormatError(f"Arquivo deve estar em UTF-8 ({error.reason})") from error
+    if pending:
+        yield pending
+
+
+async def read_records(lines, fmt: str):
+    """(linha, registro, erro) de cada registro do arquivo; linhas em branco são ignoradas.
+
+    No CSV, a primeira linha é o cabeçalho, campos vazios contam como ausentes
+    e um campo entre aspas pode ocupar até MAX_QUOTED_LINES linhas (o registro
+    é numerado pela primeira). Aspas não terminadas rejeitam só a primeira
+    linha do registro: as seguintes são lidas de novo como registros próprios.
+    """
+    header = None
+    # [(número, linha)] do registro CSV em leitura e as linhas a ler de novo
+    buffered, quotes = [], 0
+    replay = deque()
+    number = 0
+    lines = aiter(lines)
+    while True:
+        if replay:
+            line_number, line = replay.popleft()
+        else:
+            line = await anext(lines, None)
+            if line is None:
+                if not buffered:
+                    break
+                yield buffered[0][0], None, "Campo entre aspas não terminado"
+                replay.extend(buffered[1:])
+                buffered, quotes = [], 0
+                continue
+            number += 1
+            line_number, line = number, line.rstrip("\r")
+        if fmt == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield line_number, None, f"JSON inválido: {error}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Cada linha deve ser um objeto JSON"
+                continue
+            yield line_number, record, None
+            continue
+
+        buffered.append((line_number, line))
+        quotes += line.count('"')
+        # Aspas em número ímpar: o campo continua na próxima linha
+        if quotes % 2:
+            if len(buffered) < MAX_QUOTED_LINES:
+                continue
+            yield buffered[0][0], None, f"Campo entre aspas não terminado em {MAX_QUOTED_LINES} linhas"
+            replay.extendleft(reversed(buffered[1:]))
+            buffered, quotes = [], 0
+            continue
+        first_line, text = buffered[0][0], "\n".join(text for _, text in buffered)
+        buffered, quotes = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            if len(set(header)) != len(header) or "" in header:
+                raise ImportFormatError("Cabeçalho do CSV com colunas vazias ou repetidas")
+            continue
+        if len(values) != len(header):
+            yield first_line, None, f"Esperadas {len(header)} colunas, encontradas {len(values)}"
+            continue
+        yield first_line, {name: value for name, value in zip(header, values) if value != ""}, None
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'registro'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def validate(schema, batch, report: ImportReport):
+    """[(linha, modelo)] dos registros válidos; os inválidos vão para o relatório"""
+    valid = []
+    for line, record in batch:
+        try:
+            valid.append((line, schema.model_validate(record)))
+        except ValidationError as error:
+            report.reject(line, validation_message(error))
+    return valid
+
+
+async def insert_rows(db, model, rows, report: ImportReport, before_commit=None):
+    """INSERT em lote de [(linha, valores)] e commit.
+
+    Se o lote violar uma restrição (ex.: email gravado por outra requisição
+    depois da verificação), ele é desfeito e gravado linha a linha, para
+    rejeitar só as linhas com problema. before_commit(db, valores) roda na
+    transação de cada INSERT, antes do commit.
+    """
+    if not rows:
+        return
+    try:
+        await db.execute(insert(model), [values for _, values in rows])
+        if before_commit is not None:
+            await before_commit(db, [values for _, values in rows])
+        await db.commit()
+        report.inserted += len(rows)
+        return
+    except IntegrityError:
+        await db.rollback()
+
+    for line, values in rows:
+        try:
+            await db.execute(insert(model), [values])
+            if before_commit is not None:
+                await before_commit(db, [values])
+            await db.commit()
+            report.inserted += 1
+        except IntegrityError as error:
+            await db.rollback()
+            report.reject(line, f"Restrição do banco violada: {error.orig}")
+
+
+async def import_users(db, batch, report: ImportReport):
+    users = validate(UserCreate, batch, report)
+    emails = {user.email for _, user in users}
+    existing = set()
+    if emails:
+        existing = set((await db.scalars(select(User.email).where(User.email.in_(emails)))).all())
+
+    rows = []
+    for line, user in users:
+        if user.email in existing:
+            report.reject(line, "Email já cadastrado")
+            continue
+        # Emails repetidos dentro do próprio arquivo
+        existing.add(user.email)
+        values = user.model_dump(exclude={"password"})
+        # Mesmo hash de create_user
+        values["password_hash"] = f"hash_{user.password}"
+        rows.append((line, values))
+    await insert_rows(db, User, rows, report)
+
+
+async def touch_participants(db, rows):
+    """Marcar como alterados os feeds iCalendar dos alunos e instrutores das linhas"""
+    await touch_calendars(db, *(row["student_id"] for row in rows), *(row["instructor_id"] for row in rows))
+
+
+async def import_appointments(db, batch, report: ImportReport):
+    appointments = validate(AppointmentImport, batch, report)
+    emails, ids = set(), set()
+    for _, appointment in appointments:
+        for user_id, email in (
+            (appointment.student_id, appointment.student_email),
+            (appointment.instructor_id, appointment.instructor_email),
+        ):
+            if user_id is not None:
+                ids.add(user_id)
+            else:
+                emails.add(email)
+
+    # Alunos e instrutores do lote inteiro em uma consulta
+    roles, ids_by_email = {}, {}
+    if appointments:
+        users = await db.execute(
+            select(User.id, User.email, User.role).where(or_(User.id.in_(ids), User.email.in_(emails)))
+        )
+        for user_id, email, role in users:
+            roles[user_id] = role
+            ids_by_email[email] = user_id
+
+    def resolve(user_id, email, role):
+        if user_id is None:
+            user_id = ids_by_email.get(email)
+        return user_id if roles.get(user_id) == role else None
+
+    rows = []
+    for line, appointment in appointments:
+        student_id = resolve(appointment.student_id, appointment.student_email, UserRole.STUDENT)
+        if student_id is None:
+            report.reject(line, "Aluno não encontrado ou usuário não é um aluno")
+            continue
+        instructor_id = resolve(appointment.instructor_id, appointment.instructor_email, UserRole.INSTRUCTOR)
+        if instructor_id is None:
+            report.reject(line, "Instrutor não encontrado ou usuário não é um instrutor")
+            continue
+        values = appointment.model_dump(include={"start_date", "end_date", "status", "location_pickup", "notes"})
+        rows.append((line, {**values, "student_id": student_id, "instructor_id": instructor_id}))
+    await insert_rows(db, Appointment, rows, report, before_commit=touch_participants)
+
+
+IMPORTERS = {
+    "users": import_users,
+    "appointments": import_appointments,
+}
+
+
+async def run_import(db, kind: str, chunks, fmt: str, batch_size: int = None) -> ImportReport:
+    """Importar os registros de `chunks` (iterador assíncrono de bytes) em lotes"""
+    import_batch = IMPORTERS[kind]
+    batch_size = batch_size or settings.import_batch_size
+    report = ImportReport()
+    batch = []
+    async for line, record, error in read_records(iter_lines(chunks), fmt):
+        report.processed += 1
+        if error is not None:
+            report.reject(line, error)
+            continue
+        batch.append((line, record))
+        if len(batch) >= batch_size:
+            await import_batch(db, batch, report)
+            batch = []
+    if batch:
+        await import_batch(db, batch, report)
+    return report
+
+
+async def read_file(file, chunk_size: int = 1 << 16):
+    while chunk := file.read(chunk_size):
+        yield chunk
+
+
+async def import_file(kind: str, path: str, fmt: str, batch_size: int) -> ImportReport:
+    async with open_session(AsyncSessionLocal, SessionLocal) as db:
+        if path == "-":
+            return await run_import(db, kind, read_file(sys.stdin.buffer), fmt, batch_size)
+        with open(path, "rb") as file:
+            return await run_import(db, kind, read_file(file), fmt, batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.importer",
+        description="Importar usuários ou agendamentos de um arquivo CSV ou NDJSON"
+    )
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="Arquivo a importar (- para a entrada padrão)")
+    parser.add_argument("--format", choices=FORMATS, help="Padrão: pela extensão (.csv ou .ndjson/.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=settings.import_batch_size)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    start = perf_counter()
+    try:
+        report = asyncio.run(import_file(args.kind, args.path, fmt, args.batch_size))
+    except ImportFormatError as error:
+        print(f"Erro: {error}")
+        sys.exit(2)
+    elapsed = perf_counter() - start
+
+    for error in report.errors:
+        print(f"Linha {error['line']}: {error['error']}")
+    if report.failed > len(report.errors):
+        print(f"... e mais {report.failed - len(report.errors)} linhas rejeitadas")
+    print(f"{report.processed} registros, {report.inserted} importados, {report.failed} rejeitados "
+          f"em {elapsed:.1f}s ({report.processed / elapsed:.0f} registros/s)")
+    sys.exit(1 if report.failed else 0)
@@ -0,0 +1,125 @@
+"""Cards da busca de instrutores (GET /instructor-profiles/cards).
+
+Um card junta o perfil, o nome e a foto do usuário, o resumo das avaliações
+(instructor_rating_summaries) e o próximo horário livre. A página é montada
+com um número fixo de consultas, qualquer que seja o tamanho: os perfis com
+o usuário (JOIN) e, para todos os instrutores da página de uma vez (IN), os
+resumos de avaliação, as janelas semanais, as exceções de agenda e os
+agendamentos do período. O próximo horário livre é calculado em memória, com
+as mesmas regras de /instructor-availability/instructor/{id}/slots.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from operator import itemgetter
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, load_only
+from app.models import (
+    Appointment,
+    AppointmentStatus,
+    InstructorAvailability,
+    InstructorProfile,
+    InstructorRatingSummary,
+    InstructorTimeOff,
+    User,
+)
+from app.services.slots import first_free_slot
+
+# Maior período (dias) em que o próximo horário livre é procurado
+MAX_CARD_DAYS = 31
+
+
+def card_options(*extra_columns) -> tuple:
+    """Opções da consulta de perfis: só as colunas do card (e extra_columns, ex.: ordenação do cursor)
+    e o usuário no mesmo SELECT"""
+    return (
+        load_only(
+            InstructorProfile.user_id,
+            InstructorProfile.city,
+            InstructorProfile.hourly_rate,
+            InstructorProfile.transmission,
+            InstructorProfile.car_model,
+            *extra_columns
+        ),
+        joinedload(InstructorProfile.user).load_only(User.name, User.profile_photo),
+    )
+
+
+def first_slot_start(now: datetime) -> datetime:
+    """Início da procura: a próxima hora cheia (horários locais, sem fuso, como na agenda)"""
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    return hour if hour == now else hour + timedelta(hours=1)
+
+
+async def build_cards(db, profiles, start: datetime, end: datetime, duration: timedelta) -> list:
+    """Cards dos perfis (carregados com card_options), com o primeiro horário livre em [start, end)"""
+    if not profiles:
+        return []
+    profile_ids = [profile.id for profile in profiles]
+    # Avaliações e agendamentos usam o id do usuário do instrutor
+    user_ids = [profile.user_id for profile in profiles]
+
+    summaries = await db.execute(
+        select(InstructorRatingSummary.instructor_id, InstructorRatingSummary.average_rating,
+               InstructorRatingSummary.total_reviews)
+        .where(InstructorRatingSummary.instructor_id.in_(user_ids))
+    )
+    ratings = {row.instructor_id: row for row in summaries}
+
+    windows = defaultdict(list)
+    result = await db.execute(
+        select(InstructorAvailability.instructor_id, InstructorAvailability.day_of_week,
+               InstructorAvailability.start_time, InstructorAvailability.end_time)
+        .where(InstructorAvailability.instructor_id.in_(profile_ids), InstructorAvailability.is_active.is_not(False))
+    )
+    for instructor_id, day_of_week, start_time, end_time in result:
+        windows[instructor_id].append((day_of_week, start_time, end_time))
+
+    days_off = defaultdict(set)
+    if windows:
+        result = await db.execute(
+            select(InstructorTimeOff.instructor_id, InstructorTimeOff.date)
+            .where(InstructorTimeOff.instructor_id.in_(list(windows)))
+            .where(InstructorTimeOff.date.between(start.date(), end.date()))
+        )
+        for instructor_id, day in result:
+            days_off[instructor_id].add(day)
+
+    busy = defaultdict(list)
+    with_windows = [profile.user_id for profile in profiles if profile.id in windows]
+    if with_windows:
+        result = await db.execute(
+            select(Appointment.instructor_id, Appointment.start_date, Appointment.end_date)
+            .where(Appointment.instructor_id.in_(with_windows))
+            .where(Appointment.start_date < end, Appointment.end_date > start)
+            .where(Appointment.status != AppointmentStatus.CANCELLED)
+        )
+        for instructor_id, start_date, end_date in result:
+            busy[instructor_id].append((start_date, end_date))
+
+    cards = []
+    for profile in profiles:
+        rating = ratings.get(profile.user_id)
+        slot = None
+        if profile.id in windows:
+            slot = first_free_slot(
+                windows[profile.id],
+                days_off[profile.id],
+                sorted(busy[profile.user_id], key=itemgetter(0)),
+                start,
+                end,
+                duration
+            )
+        cards.append({
+            "id": profile.id,
+            "user_id": profile.user_id,
+            "name": profile.user.name,
+            "profile_photo": profile.user.profile_photo,
+            "city": profile.city,
+            "hourly_rate": profile.hourly_rate,
+            "transmission": profile.transmission,
+            "car_model": profile.car_model,
+            "average_rating": rating.average_rating if rating else 0.0,
+            "total_reviews": rating.total_reviews if rating else 0,
+            "next_slot": {"start_date": slot[0], "end_date": slot[1]} if slot else None,
+        })
+    return cards
@@ -0,0 +1,75 @@
+"""Cache das buscas de instrutores (GET /instructor-profiles/).
+
+A chave é a combinação normalizada dos filtros e da página, e o valor é o JSON
+já serializado da resposta, então um acerto não consulta o banco nem valida
+os objetos de novo. As escritas em perfis chamam invalidate_cities com a
+cidade antiga e a nova: são descartadas só as buscas cujo filtro de cidade
+encontraria uma delas, além das buscas sem filtro de cidade.
+"""
+from sqlalchemy import select
+from app.cache import TTLCache
+from app.config import settings
+from app.models import InstructorProfile
+from app.schemas import InstructorProfileResponse
+from app.serialization import ADAPTERS
+from app.search import city_matches, normalize_text, search_city
+
+search_cache = TTLCache(
+    "instructor_search",
+    settings.instructor_search_cache_ttl,
+    maxsize=settings.instructor_search_cache_size
+)
+
+
+def search_key(city, transmission, min_rate, max_rate, skip, limit, cursor, fields=None) -> tuple:
+    """Chave do cache; a cidade entra normalizada ("São Paulo" e "sao paulo" são a mesma busca)"""
+    return (
+        normalize_text(city) or None,
+        settings.city_fuzzy_search,
+        transmission or None,
+        min_rate,
+        max_rate,
+        # skip não se aplica à paginação por cursor
+        skip if cursor is None else None,
+        limit,
+        cursor,
+        # Campos pedidos em fields= (None = todos)
+        fields,
+    )
+
+
+def search_query(city, transmission, min_rate, max_rate):
+    """Consulta da busca de instrutores com os filtros informados e a sua ordenação"""
+    query = select(InstructorProfile)
+    order_by = (InstructorProfile.id,)
+    
+    if city:
+        # Sem acentos e sem diferenciar maiúsculas; a cidade exata vem primeiro
+        query, order_by = search_city(query, InstructorProfile, city, fuzzy=settings.city_fuzzy_search)
+    if transmission:
+        query = query.where(InstructorProfile.transmission == transmission)
+    if min_rate is not None:
+        query = query.where(InstructorProfile.hourly_rate >= min_rate)
+    if max_rate is not None:
+        query = query.where(InstructorProfile.hourly_rate <= max_rate)
+    return query, order_by
+
+
+def render_results(result, adapters=None) -> bytes:
+    """JSON da resposta: lista de perfis ou página {items, next_cursor} (adapters: os de fields=, se houver)"""
+    return (adapters or ADAPTERS[InstructorProfileResponse]).render(result)
+
+
+def invalidate_cities(*cities):
+    """Descartar as buscas afetadas por perfis nas cidades informadas (nomes como gravados)"""
+    terms = {normalize_text(city) for city in cities if city}
+
+    def affected(key):
+        city_term, fuzzy = key[0], key[1]
+        return city_term is None or any(city_matches(city_term, city, fuzzy) for city in terms)
+
+    search_cache.invalidate_where(affected)
+
+
+def invalidate_all():
+    search_cache.invalidate()
@@ -0,0 +1,124 @@
+"""Manutenção do resumo de avaliações por instrutor (instructor_rating_summaries).
+
+As rotas de reviews chamam apply_rating_change na mesma transação da escrita;
+o resumo é atualizado com um único UPSERT relativo (rating_N = rating_N + 1),
+seguro com escritas concorrentes. Para recalcular a partir da tabela reviews:
+
+    python -m app.services.ratings rebuild  # recria todos os resumos
+    python -m app.services.ratings check    # termina com código 1 se houver divergências
+"""
+import sys
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.database import engine
+from app.models import InstructorRatingSummary, Review
+
+RATINGS = range(1, 6)
+COUNTED_COLUMNS = [f"rating_{rating}" for rating in RATINGS] + ["total_reviews", "rating_sum"]
+
+
+def average(rating_sum, total_reviews):
+    return rating_sum / total_reviews if total_reviews else 0.0
+
+
+def rating_change_statement(instructor_id: int, removed: int = None, added: int = None):
+    """UPSERT que retira a nota `removed` e soma a nota `added` ao resumo do instrutor"""
+    deltas = dict.fromkeys(COUNTED_COLUMNS, 0)
+    if removed is not None:
+        deltas[f"rating_{removed}"] -= 1
+        deltas["total_reviews"] -= 1
+        deltas["rating_sum"] -= removed
+    if added is not None:
+        deltas[f"rating_{added}"] += 1
+        deltas["total_reviews"] += 1
+        deltas["rating_sum"] += added
+
+    dialect_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(InstructorRatingSummary).values(
+        instructor_id=instructor_id,
+        average_rating=average(deltas["rating_sum"], deltas["total_reviews"]),
+        **deltas
+    )
+
+    # No UPDATE, as colunas referem-se aos valores atuais da linha
+    table = InstructorRatingSummary.__table__
+    new_total = table.c.total_reviews + deltas["total_reviews"]
+    new_sum = table.c.rating_sum + deltas["rating_sum"]
+    changes = {name: table.c[name] + delta for name, delta in deltas.items() if delta}
+    changes["average_rating"] = case((new_total > 0, new_sum * 1.0 / new_total), else_=0.0)
+    return statement.on_conflict_do_update(index_elements=[table.c.instructor_id], set_=changes)
+
+
+async def apply_rating_change(db, instructor_id: int, removed: int = None, added: int = None):
+    """Atualizar o resumo na transação da sessão (commit feito pela rota)"""
+    if removed == added:
+        return
+    await db.execute(rating_change_statement(instructor_id, removed, added))
+
+
+def compute_summaries(conn) -> dict:
+    """Resumos calculados a partir de reviews: {instructor_id: {coluna: valor}}"""
+    rows = conn.execute(
+        select(Review.instructor_id, Review.rating, func.count(Review.id))
+        .group_by(Review.instructor_id, Review.rating)
+    )
+    summaries = {}
+    for instructor_id, rating, count in rows:
+        summary = summaries.setdefault(instructor_id, dict.fromkeys(COUNTED_COLUMNS, 0))
+        summary[f"rating_{rating}"] = count
+        summary["total_reviews"] += count
+        summary["rating_sum"] += rating * count
+    for summary in summaries.values():
+        summary["average_rating"] = average(summary["rating_sum"], summary["total_reviews"])
+    return summaries
+
+
+def rebuild_summaries(conn) -> int:
+    """Substituir todos os resumos pelos valores calculados; devolve quantos foram gravados"""
+    summaries = compute_summaries(conn)
+    conn.execute(delete(InstructorRatingSummary))
+    if summaries:
+        conn.execute(insert(InstructorRatingSummary), [
+            {"instructor_id": instructor_id, **summary} for instructor_id, summary in summaries.items()
+        ])
+    return len(summaries)
+
+
+def find_inconsistencies(conn) -> dict:
+    """{instructor_id: (gravado, esperado)} dos resumos que divergem de reviews"""
+    expected = compute_summaries(conn)
+    columns = COUNTED_COLUMNS + ["average_rating"]
+    stored = {
+        row.instructor_id: {name: getattr(row, name) for name in columns}
+        for row in conn.execute(select(InstructorRatingSummary))
+    }
+    empty = {**dict.fromkeys(COUNTED_COLUMNS, 0), "average_rating": 0.0}
+    differences = {}
+    for instructor_id in expected.keys() | stored.keys():
+        want = expected.get(instructor_id, empty)
+        have = stored.get(instructor_id, empty)
+        # A média gravada pelo UPSERT pode diferir na última casa do float
+        want = {**want, "average_rating": round(want["average_rating"], 6)}
+        have = {**have, "average_rating": round(have["average_rating"], 6)}
+        if want != have:
+            differences[instructor_id] = (have, want)
+    return differences
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "rebuild":
+        with engine.begin() as conn:
+            print(f"Resumos recriados: {rebuild_summaries(conn)} instrutores")
+    elif command == "check":
+        with engine.connect() as conn:
+            differences = find_inconsistencies(conn)
+        for instructor_id, (have, want) in sorted(differences.items()):
+            print(f"Instrutor {instructor_id}: gravado {have}, esperado {want}")
+        if differences:
+            print("Execute: python -m app.services.ratings rebuild")
+            sys.exit(1)
+        print("Resumos de avaliação consistentes")
+    else:
+        print("Uso: python -m app.services.ratings [rebuild|check]")
+        sys.exit(2)
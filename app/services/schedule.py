@@ -0,0 +1,37 @@
+"""Substituição da grade semanal de um instrutor.
+
+A nova grade é comparada com as linhas existentes de instructor_availability
+para que a troca use no máximo um INSERT, um UPDATE e um DELETE em lote:
+
+- janelas iguais (mesmo dia e horário) são mantidas, atualizando só is_active;
+- linhas que sobraram são reaproveitadas para as janelas novas (UPDATE);
+- o excedente vira INSERT (janelas novas) ou DELETE (linhas antigas).
+"""
+from collections import defaultdict
+
+
+def diff_schedule(existing, windows):
+    """Comparar as linhas (id, day_of_week, start_time, end_time, is_active) com as novas janelas.
+
+    Devolve (inserções, atualizações, ids removidos); inserções e atualizações
+    são dicionários prontos para executemany.
+    """
+    unmatched_rows = defaultdict(list)
+    for row in existing:
+        unmatched_rows[(row.day_of_week, row.start_time, row.end_time)].append(row)
+
+    updates, new_windows = [], []
+    for window in windows:
+        rows = unmatched_rows.get((window["day_of_week"], window["start_time"], window["end_time"]))
+        if rows:
+            row = rows.pop()
+            if row.is_active != window["is_active"]:
+                updates.append({"id": row.id, "is_active": window["is_active"]})
+        else:
+            new_windows.append(window)
+
+    leftover = [row for rows in unmatched_rows.values() for row in rows]
+    updates.extend({"id": row.id, **window} for row, window in zip(leftover, new_windows))
+    inserts = new_windows[len(leftover):]
+    deleted_ids = [row.id for row in leftover[len(new_windows):]]
+    return inserts, updates, deleted_ids
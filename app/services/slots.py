@@ -0,0 +1,99 @@
+"""Cálculo dos horários livres de um instrutor.
+
+Os intervalos são listas ordenadas de (início, fim) sem sobreposição. A grade
+semanal expandida e os agendamentos chegam em ordem, então subtrair uns dos
+outros é uma única varredura com dois ponteiros: O(janelas + agendamentos),
+sem comparar cada janela com cada agendamento.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+
+def merge_intervals(intervals):
+    """Unir intervalos (ordenados pelo início) que se sobrepõem ou se tocam"""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def expand_weekly(windows, days_off, start: datetime, end: datetime):
+    """Janelas semanais (day_of_week, start_time, end_time) como intervalos em [start, end).
+
+    day_of_week segue o modelo: 0=Domingo ... 6=Sábado. As datas em days_off
+    ficam de fora.
+    """
+    by_day = defaultdict(list)
+    for day_of_week, start_time, end_time in windows:
+        by_day[day_of_week].append((start_time, end_time))
+    for day_windows in by_day.values():
+        day_windows.sort()
+
+    intervals = []
+    day = start.date()
+    while day <= end.date():
+        if day not in days_off:
+            # date.weekday(): 0=Segunda ... 6=Domingo
+            for start_time, end_time in by_day.get((day.weekday() + 1) % 7, ()):
+                window_start = max(datetime.combine(day, start_time), start)
+                window_end = min(datetime.combine(day, end_time), end)
+                if window_start < window_end:
+                    intervals.append((window_start, window_end))
+        day += timedelta(days=1)
+    return merge_intervals(intervals)
+
+
+def subtract_intervals(intervals, busy):
+    """Partes de intervals que não se sobrepõem a busy (ambos ordenados e unidos)"""
+    free = []
+    first = 0
+    for start, end in intervals:
+        # busy unido tem fins crescentes: o que termina antes desta janela não afeta as próximas
+        while first < len(busy) and busy[first][1] <= start:
+            first += 1
+        current = start
+        index = first
+        while index < len(busy) and busy[index][0] < end:
+            if busy[index][0] > current:
+                free.append((current, busy[index][0]))
+            current = max(current, busy[index][1])
+            index += 1
+        if current < end:
+            free.append((current, end))
+    return free
+
+
+def split_slots(intervals, duration: timedelta, step: timedelta):
+    """Horários de duração fixa dentro de cada intervalo livre, a cada step"""
+    slots = []
+    for start, end in intervals:
+        slot_start = start
+        while slot_start + duration <= end:
+            slots.append((slot_start, slot_start + duration))
+            slot_start += step
+    return slots
+
+
+def free_slots(windows, days_off, appointments, start: datetime, end: datetime,
+               duration: timedelta, step: timedelta = None):
+    """Horários livres em [start, end).
+
+    appointments são (início, fim) ordenados pelo início; os cancelados já
+    devem ter sido excluídos.
+    """
+    available = expand_weekly(windows, days_off, start, end)
+    free = subtract_intervals(available, merge_intervals(appointments))
+    return split_slots(free, duration, step or duration)
+
+
+def first_free_slot(windows, days_off, appointments, start: datetime, end: datetime, duration: timedelta):
+    """Primeiro horário livre de duração duration em [start, end), ou None (mesmas entradas de free_slots)"""
+    available = expand_weekly(windows, days_off, start, end)
+    for free_start, free_end in subtract_intervals(available, merge_intervals(appointments)):
+        if free_end - free_start >= duration:
+            return free_start, free_start + duration
+    return None
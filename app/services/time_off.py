@@ -0,0 +1,76 @@
+"""Expansão de períodos e regras de repetição em datas de exceção de agenda.
+
+Cada exceção (InstructorTimeOff) bloqueia um único dia. A criação em lote
+recebe datas avulsas, períodos e regras simples (semanal, mensal, anual),
+que são expandidos aqui em um conjunto de datas sem repetição.
+"""
+import calendar
+from datetime import date, timedelta
+from itertools import count
+from fastapi import HTTPException, status
+
+# Máximo de datas geradas por requisição
+MAX_TIME_OFF_DATES = 1000
+
+
+def expand_range(start: date, end: date):
+    """Todos os dias de start a end, inclusive"""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+def expand_recurrence(frequency: str, start: date, until: date, interval: int = 1, days_of_week=None):
+    """Datas de uma regra de repetição entre start e until, inclusive.
+
+    weekly: nos days_of_week (0=Domingo ... 6=Sábado; padrão: o dia de start)
+    a cada `interval` semanas. monthly e yearly: no mesmo dia (e mês) de start,
+    pulando os meses (ou anos) em que esse dia não existe.
+    """
+    if frequency == "weekly":
+        # Semanas começam no domingo, como day_of_week; date.weekday(): 0=Segunda
+        week_start = start - timedelta(days=(start.weekday() + 1) % 7)
+        days = sorted(set(days_of_week)) if days_of_week else [(start.weekday() + 1) % 7]
+        for week in count(step=interval):
+            first_day = week_start + timedelta(weeks=week)
+            if first_day > until:
+                return
+            for day_of_week in days:
+                day = first_day + timedelta(days=day_of_week)
+                if start <= day <= until:
+                    yield day
+    else:
+        step = interval if frequency == "monthly" else 12 * interval
+        for months in count(step=step):
+            year, month = divmod(start.month - 1 + months, 12)
+            year += start.year
+            if year > until.year:
+                return
+            if start.day <= calendar.monthrange(year, month + 1)[1]:
+                day = date(year, month + 1, start.day)
+                if day > until:
+                    return
+                yield day
+
+
+def expand_time_off(dates, ranges, recurrences) -> list:
+    """Datas avulsas, períodos e regras como uma lista ordenada e sem repetição.
+
+    Levanta HTTPException (400) se o total passar de MAX_TIME_OFF_DATES.
+    """
+    sources = [dates]
+    sources.extend(expand_range(period.start, period.end) for period in ranges)
+    sources.extend(
+        expand_recurrence(rule.frequency, rule.start, rule.until, rule.interval, rule.days_of_week)
+        for rule in recurrences
+    )
+
+    expanded = set()
+    for source in sources:
+        for day in source:
+            expanded.add(day)
+            if len(expanded) > MAX_TIME_OFF_DATES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"No máximo {MAX_TIME_OFF_DATES} datas por requisição"
+                )
+    return sorted(expanded)
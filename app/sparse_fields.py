@@ -0,0 +1,80 @@
+"""Seleção de campos das respostas (parâmetro fields=, "sparse fieldsets").
+
+fields=id,city,hourly_rate limita a resposta aos campos pedidos, validados
+contra o schema de resposta da rota (400 para campos desconhecidos; o id vem
+sempre). A consulta carrega só as colunas necessárias (load_only), além das
+usadas pelo ETag e pela ordenação do cursor, e o JSON é gerado com um
+TypeAdapter de um schema parcial, criado uma vez por combinação de campos.
+
+Cada combinação é uma representação diferente do recurso: o ETag ganha um
+sufixo com o hash dos campos, então uma cópia parcial nunca é confirmada
+(304) para a representação completa nem para outra combinação.
+"""
+import functools
+import hashlib
+from typing import Optional
+from fastapi import HTTPException, Response, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy.orm import load_only
+from app.serialization import ResponseAdapters, json_response
+
+FIELDS_DESCRIPTION = (
+    "Campos da resposta separados por vírgula (ex.: id,city,hourly_rate); o id vem sempre. "
+    "Sem o parâmetro, todos os campos"
+)
+
+
+class FieldSet:
+    """Campos pedidos de um schema de resposta; names None = representação completa"""
+
+    __slots__ = ("names", "adapters", "tag")
+
+    def __init__(self, names=None, adapters=None, tag=None):
+        self.names = names
+        self.adapters = adapters
+        # Sufixo do ETag (None na representação completa)
+        self.tag = tag
+
+    def options(self, model, *extra_columns) -> tuple:
+        """Opções da consulta: só as colunas pedidas, as do ETag e extra_columns (ex.: ordenação do cursor)"""
+        if self.names is None:
+            return ()
+        columns = [getattr(model, name) for name in self.names]
+        return (load_only(*columns, model.version, model.updated_at, *extra_columns),)
+
+    def render(self, result, sub_response=None):
+        """Resposta com os campos pedidos; sem fields= (ou resposta já pronta, ex.: 304), result sem alteração"""
+        if self.names is None or isinstance(result, Response):
+            return result
+        return json_response(self.adapters.render(result), sub_response)
+
+
+ALL_FIELDS = FieldSet()
+
+
+@functools.lru_cache(maxsize=256)
+def sparse_fieldset(schema, names: frozenset) -> FieldSet:
+    """FieldSet de uma combinação de campos (schema parcial e TypeAdapters criados uma vez)"""
+    ordered = tuple(name for name in schema.model_fields if name in names)
+    partial = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in ordered}
+    )
+    tag = hashlib.blake2b(",".join(ordered).encode(), digest_size=4).hexdigest()
+    return FieldSet(ordered, ResponseAdapters(partial), tag)
+
+
+def parse_fields(schema, fields: Optional[str]) -> FieldSet:
+    """FieldSet do parâmetro fields= (HTTPException 400 para campos fora do schema)"""
+    if fields is None:
+        return ALL_FIELDS
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos desconhecidos: {', '.join(sorted(unknown))}. "
+                   f"Disponíveis: {', '.join(schema.model_fields)}"
+        )
+    return sparse_fieldset(schema, frozenset(names | {"id"}))
@@ -0,0 +1,161 @@
+"""
+Teste de carga das reservas concorrentes (POST /appointments/)
+Vários processos, cada um com várias requisições simultâneas, tentam reservar
+horários sorteados (1 ou 2 horas, com sobreposição parcial entre si) de poucos
+instrutores no mesmo banco SQLite. No fim, confere que nenhum instrutor ficou
+com dois agendamentos sobrepostos e mede as reservas por segundo.
+
+Uso:
+    python benchmark_booking.py [TENTATIVAS] [PROCESSOS] [CONCORRÊNCIA]
+    python benchmark_booking.py 2000 4 16 --no-lock   # sem a trava, para comparar
+"""
+
+import asyncio
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, time, timedelta
+from time import perf_counter
+
+# Os processos filhos herdam o caminho pelo ambiente
+DB_PATH = os.environ.setdefault("BENCHMARK_DB", os.path.join(tempfile.mkdtemp(), "benchmark_booking.db"))
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+import httpx  # noqa: E402
+from sqlalchemy import and_, func, insert, select  # noqa: E402
+from sqlalchemy.orm import aliased  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import (  # noqa: E402
+    Appointment,
+    AppointmentStatus,
+    InstructorAvailability,
+    InstructorProfile,
+    User,
+    UserRole,
+)
+
+INSTRUCTORS = 5
+DAYS = 5
+FIRST_DAY = datetime(2030, 1, 7)  # Segunda-feira
+HOURS = range(8, 18)
+
+
+def populate():
+    """Um aluno e INSTRUCTORS instrutores disponíveis das 8h às 18h todos os dias"""
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": "Aluno", "email": "aluno@exemplo.com", "password_hash": "hash", "role": UserRole.STUDENT}
+        ] + [
+            {"name": f"Instrutor {i}", "email": f"instrutor{i}@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR}
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorProfile), [
+            {
+                "id": i + 1,
+                "user_id": i + 2,
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 80,
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+            }
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorAvailability), [
+            {"instructor_id": i + 1, "day_of_week": day, "start_time": time(8), "end_time": time(18)}
+            for i in range(INSTRUCTORS) for day in range(7)
+        ])
+
+
+def attempts(total: int, seed: int):
+    random.seed(seed)
+    for _ in range(total):
+        start = FIRST_DAY + timedelta(days=random.randrange(DAYS), hours=random.choice(HOURS[:-1]))
+        yield {
+            "student_id": 1,
+            "instructor_id": random.randrange(INSTRUCTORS) + 2,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(hours=random.choice((1, 2)))).isoformat(),
+        }
+
+
+async def fire(total: int, concurrency: int, seed: int, no_lock: bool):
+    if no_lock:
+        from contextlib import asynccontextmanager
+        import app.routes.appointments as appointments_routes
+
+        @asynccontextmanager
+        async def no_lock(db, instructor_id):
+            yield
+
+        appointments_routes.schedule_lock = no_lock
+
+    from main import app
+    statuses = Counter()
+    queue = list(attempts(total, seed))
+
+    async def worker(client):
+        while queue:
+            response = await client.post("/appointments/", json=queue.pop())
+            statuses[response.status_code] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        start = perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return statuses, perf_counter() - start
+
+
+def run_process(args):
+    return asyncio.run(fire(*args))
+
+
+def double_bookings() -> int:
+    """Pares de agendamentos não cancelados do mesmo instrutor que se sobrepõem"""
+    first, second = aliased(Appointment), aliased(Appointment)
+    with engine.connect() as conn:
+        return conn.scalar(
+            select(func.count())
+            .select_from(first)
+            .join(second, and_(
+                first.instructor_id == second.instructor_id,
+                first.id < second.id,
+                first.start_date < second.end_date,
+                second.start_date < first.end_date,
+            ))
+            .where(first.status != AppointmentStatus.CANCELLED, second.status != AppointmentStatus.CANCELLED)
+        )
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    total = int(args[0]) if len(args) > 0 else 2000
+    processes = int(args[1]) if len(args) > 1 else 4
+    concurrency = int(args[2]) if len(args) > 2 else 16
+    no_lock = "--no-lock" in sys.argv
+
+    upgrade()
+    populate()
+    print(f"{total} tentativas de reserva, {processes} processos x {concurrency} requisições simultâneas"
+          f"{' (sem trava)' if no_lock else ''}")
+
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.map(run_process, [
+            (total // processes, concurrency, seed, no_lock) for seed in range(processes)
+        ])
+
+    # Tempo do processo mais lento, sem a inicialização dos processos
+    statuses = sum((result[0] for result in results), Counter())
+    elapsed = max(result[1] for result in results)
+    overlaps = double_bookings()
+    print(f"Respostas: {dict(sorted(statuses.items()))}")
+    print(f"Tempo: {elapsed:.2f}s ({sum(statuses.values()) / elapsed:.0f} requisições/s)")
+    print(f"Agendamentos sobrepostos: {overlaps}")
+    shutil.rmtree(os.path.dirname(DB_PATH))
+    sys.exit(1 if overlaps or statuses.keys() - {201, 409} else 0)
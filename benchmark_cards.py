@@ -0,0 +1,145 @@
+"""
+Benchmark dos cards da busca de instrutores (GET /instructor-profiles/cards)
+Cria um banco SQLite temporário com instrutores aprovados (grade semanal,
+agendamentos nas próximas semanas e resumo de avaliações) e compara, para
+páginas de vários tamanhos, a montagem dos cards pelo cliente (listagem de
+perfis + GET /users/{id}, /reviews/instructor/{id}/stats e /slots por
+instrutor) com o endpoint de cards: requisições, consultas SQL e latência.
+
+Uso:
+    python benchmark_cards.py [REPETIÇÕES]
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from datetime import datetime, time, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_cards.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+os.environ["QUERY_STATS_HEADERS"] = "true"
+os.environ["INSTRUCTOR_SEARCH_CACHE_TTL"] = "0"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import (  # noqa: E402
+    Appointment,
+    AppointmentStatus,
+    ApprovalStatus,
+    InstructorAvailability,
+    InstructorProfile,
+    InstructorRatingSummary,
+    User,
+    UserRole,
+)
+from app.services.instructor_cards import first_slot_start  # noqa: E402
+
+INSTRUCTORS = 500
+PAGE_SIZES = (10, 50, 100)
+DAYS = 14
+
+
+def populate():
+    random.seed(1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": "Aluno", "email": "aluno@exemplo.com", "password_hash": "hash", "role": UserRole.STUDENT}
+        ] + [
+            {"name": f"Instrutor {i}", "email": f"instrutor{i}@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR}
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorProfile), [
+            {
+                "user_id": i + 2,
+                "bio": "Aulas práticas com paciência para alunos nervosos. " * 4,
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 60 + i % 50,
+                "car_model": "Onix 1.0",
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+                "approval_status": ApprovalStatus.APPROVED,
+            }
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorAvailability), [
+            {"instructor_id": i + 1, "day_of_week": day, "start_time": time(8), "end_time": time(18)}
+            for i in range(INSTRUCTORS) for day in range(1, 6)
+        ])
+        # Manhãs ocupadas nos primeiros dias: o próximo horário livre não é o primeiro da grade
+        first = first_slot_start(datetime.now()).replace(hour=8)
+        conn.execute(insert(Appointment), [
+            {
+                "student_id": 1,
+                "instructor_id": i + 2,
+                "start_date": first + timedelta(days=day, hours=hour),
+                "end_date": first + timedelta(days=day, hours=hour + 1),
+                "status": AppointmentStatus.CONFIRMED,
+            }
+            for i in range(INSTRUCTORS) for day in range(3) for hour in range(4)
+        ])
+        conn.execute(insert(InstructorRatingSummary), [
+            {"instructor_id": i + 2, "rating_5": 8, "rating_4": 2, "total_reviews": 10, "rating_sum": 48, "average_rating": 4.8}
+            for i in range(INSTRUCTORS)
+        ])
+
+
+async def client_cards(client, limit: int):
+    """Cards montados pelo cliente: (requisições, consultas)"""
+    start = first_slot_start(datetime.now())
+    response = await client.get("/instructor-profiles/", params={"limit": limit})
+    requests, queries = 1, int(response.headers["x-db-query-count"])
+    for profile in response.json():
+        for path, params in (
+            (f"/users/{profile['user_id']}", None),
+            (f"/reviews/instructor/{profile['user_id']}/stats", None),
+            (f"/instructor-availability/instructor/{profile['id']}/slots",
+             {"from": start.isoformat(), "to": (start + timedelta(days=DAYS)).isoformat()}),
+        ):
+            item = await client.get(path, params=params)
+            requests += 1
+            queries += int(item.headers["x-db-query-count"])
+    return requests, queries
+
+
+async def server_cards(client, limit: int):
+    response = await client.get("/instructor-profiles/cards", params={"limit": limit, "days": DAYS})
+    assert len(response.json()) == limit
+    return 1, int(response.headers["x-db-query-count"])
+
+
+async def measure(function, client, limit: int, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        start = perf_counter()
+        requests, queries = await function(client, limit)
+        latencies.append(perf_counter() - start)
+    return requests, queries, statistics.median(latencies) * 1000
+
+
+async def run(repeat: int):
+    from main import app
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for limit in PAGE_SIZES:
+            print(f"\nPágina de {limit} instrutores (mediana de {repeat} repetições)")
+            for label, function in (("cliente (N+1)", client_cards), ("/cards", server_cards)):
+                await function(client, limit)  # aquecimento
+                requests, queries, latency = await measure(function, client, limit, repeat)
+                print(f"  {label:14} {requests:4} requisições | {queries:4} consultas | {latency:8.1f} ms")
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    upgrade()
+    populate()
+    asyncio.run(run(repeat))
+    shutil.rmtree(os.path.dirname(DB_PATH))
@@ -0,0 +1,132 @@
+"""
+Benchmark da compressão das respostas (app/middleware/compression.py)
+Cria um banco SQLite temporário com instrutores (bio completa) e agendamentos
+(com observações) e pede páginas de 100 itens de GET /instructor-profiles/ e
+GET /appointments/ sem compressão e com cada codificação de
+COMPRESSION_ENCODINGS instalada pelo requirements.txt. Mede os bytes enviados, a
+latência do servidor (p50/p99) e estima o p99 em uma rede móvel de
+LINK_MBPS Mbit/s (latência do servidor + tempo de transferência).
+
+Uso:
+    python benchmark_compression.py [REQUISIÇÕES] [LINK_MBPS]
+    COMPRESSION_GZIP_LEVEL=9 python benchmark_compression.py   # outro nível
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_compression.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.middleware.compression import available_encodings  # noqa: E402
+from app.models import Appointment, AppointmentStatus, InstructorProfile, User, UserRole  # noqa: E402
+
+INSTRUCTORS = 500
+APPOINTMENTS = 5000
+PATHS = {
+    "list_instructor_profiles": "/instructor-profiles/?limit=100",
+    "list_appointments": "/appointments/?limit=100",
+}
+WORDS = (
+    "aulas práticas direção defensiva baliza estacionamento rotatórias rodovia "
+    "paciência experiência alunos nervosos primeira habilitação categoria carro "
+    "manual automático centro bairros treino prova detran simulado horários"
+).split()
+
+
+def text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def populate():
+    random.seed(1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": "Aluno", "email": "aluno@exemplo.com", "password_hash": "hash", "role": UserRole.STUDENT}
+        ] + [
+            {"name": f"Instrutor {i}", "email": f"instrutor{i}@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR}
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorProfile), [
+            {
+                "user_id": i + 2,
+                "bio": text(120),
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 60 + i % 50,
+                "car_model": "Onix 1.0",
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+            }
+            for i in range(INSTRUCTORS)
+        ])
+        first = datetime(2030, 1, 1, 8)
+        conn.execute(insert(Appointment), [
+            {
+                "student_id": 1,
+                "instructor_id": i % INSTRUCTORS + 2,
+                "start_date": first + timedelta(hours=i),
+                "end_date": first + timedelta(hours=i + 1),
+                "status": AppointmentStatus.CONFIRMED,
+                "location_pickup": "Av. Paulista, 1000",
+                "notes": text(40),
+            }
+            for i in range(APPOINTMENTS)
+        ])
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(client, path: str, encoding: str, requests: int):
+    """([latências em s], bytes por resposta)"""
+    latencies, size = [], 0
+    for _ in range(requests):
+        start = perf_counter()
+        async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+            # Bytes como saíram do servidor, sem descomprimir
+            size = sum([len(chunk) async for chunk in response.aiter_raw()])
+        latencies.append(perf_counter() - start)
+    return latencies, size
+
+
+async def run(requests: int, link_mbps: float):
+    from main import app
+    encodings = ["identity"] + available_encodings(settings.compression_encodings)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, path in PATHS.items():
+            print(f"\n{name} ({path})")
+            for encoding in encodings:
+                await measure(client, path, encoding, 5)  # aquecimento
+                latencies, size = await measure(client, path, encoding, requests)
+                transfer = size * 8 / (link_mbps * 1e6)
+                print(f"  {encoding:9} {size / 1024:7.1f} KiB | servidor p50 {statistics.median(latencies) * 1000:6.2f} ms"
+                      f" p99 {percentile(latencies, 0.99) * 1000:6.2f} ms | p99 em {link_mbps:g} Mbit/s"
+                      f" {(percentile(latencies, 0.99) + transfer) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    link_mbps = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    upgrade()
+    populate()
+    print(f"{requests} requisições por codificação; níveis: gzip {settings.compression_gzip_level}, "
+          f"br {settings.compression_brotli_quality}, zstd {settings.compression_zstd_level}")
+    asyncio.run(run(requests, link_mbps))
+    shutil.rmtree(os.path.dirname(DB_PATH))
@@ -0,0 +1,137 @@
+"""
+Benchmark de leituras e escritas simultâneas no SQLite (app/database/connection.py)
+Compara o engine original (create_engine só com check_same_thread, journal
+DELETE e synchronous FULL, pool padrão) com o engine configurado pela
+aplicação (pool de POOL_DEFAULTS e PRAGMAs WAL, synchronous, cache_size,
+mmap_size e busy_timeout das configurações). Cada engine usa um arquivo
+próprio: o journal_mode WAL fica gravado no banco.
+
+Threads escritoras incluem agendamentos (um commit por inclusão, como uma
+requisição POST) e threads leitoras listam os agendamentos de um instrutor
+e leem um usuário, por DURAÇÃO segundos. Mede leituras e escritas por
+segundo e os erros "database is locked".
+
+Uso:
+    python benchmark_db_concurrency.py [DURAÇÃO] [ESCRITORAS] [LEITORAS]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.database.connection import build_engine_options, configure_engine, to_sync_url
+from app.models import Appointment, AppointmentStatus, User, UserRole
+
+USERS = 200
+INITIAL_APPOINTMENTS = 5000
+
+
+def baseline_engine(url):
+    """Engine como era antes: sem PRAGMAs e com o pool padrão (5 + 10)"""
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def tuned_engine(url):
+    url = to_sync_url(url)
+    return configure_engine(create_engine(url, **build_engine_options(url)))
+
+
+def populate(engine):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"Usuário {i}", "email": f"usuario{i}@exemplo.com", "password_hash": "hash",
+             "role": UserRole.INSTRUCTOR if i % 2 else UserRole.STUDENT}
+            for i in range(USERS)
+        ])
+        conn.execute(insert(Appointment), [appointment(random.Random(i), i) for i in range(INITIAL_APPOINTMENTS)])
+
+
+def appointment(rng, number: int) -> dict:
+    start = datetime(2030, 1, 1, 8) + timedelta(hours=number)
+    return {
+        "student_id": rng.randrange(1, USERS, 2),
+        "instructor_id": rng.randrange(2, USERS + 1, 2),
+        "start_date": start,
+        "end_date": start + timedelta(hours=1),
+        "status": AppointmentStatus.PENDING,
+    }
+
+
+def run(engine, duration: float, writers: int, readers: int):
+    """(leituras/s, escritas/s, erros)"""
+    Session = sessionmaker(bind=engine)
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    sequence = iter(range(INITIAL_APPOINTMENTS, 10 ** 9))
+
+    def count(key: str):
+        with lock:
+            counts[key] += 1
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            with lock:
+                number = next(sequence)
+            try:
+                with Session() as db:
+                    db.execute(insert(Appointment), [appointment(rng, number)])
+                    db.commit()
+                count("writes")
+            except OperationalError:
+                count("errors")
+
+    def reader(seed: int):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            instructor_id = rng.randrange(2, USERS + 1, 2)
+            try:
+                with Session() as db:
+                    db.execute(
+                        select(Appointment)
+                        .where(Appointment.instructor_id == instructor_id)
+                        .order_by(Appointment.start_date.desc())
+                        .limit(20)
+                    ).all()
+                    db.get(User, instructor_id)
+                count("reads")
+            except OperationalError:
+                count("errors")
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(writers + i,)) for i in range(readers)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+    return counts["reads"] / elapsed, counts["writes"] / elapsed, counts["errors"]
+
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+    directory = tempfile.mkdtemp()
+    print(f"{writers} escritoras, {readers} leitoras, {duration:g} s")
+    for label, factory in (("original", baseline_engine), ("configurado", tuned_engine)):
+        engine = factory(f"sqlite:///{os.path.join(directory, label + '.db')}")
+        populate(engine)
+        reads, writes, errors = run(engine, duration, writers, readers)
+        engine.dispose()
+        print(f"  {label:12} {reads:8.0f} leituras/s | {writes:7.0f} escritas/s | {errors} erros")
+    shutil.rmtree(directory)
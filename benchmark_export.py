@@ -0,0 +1,111 @@
+"""
+Benchmark da exportação em streaming (GET /appointments/export)
+Cria um banco SQLite temporário com AGENDAMENTOS linhas e compara a
+exportação linha a linha (app/services/export.py) com o caminho das
+listagens, que carrega tudo em objetos ORM e serializa com Pydantic antes de
+enviar o primeiro byte. Mede o tempo até o primeiro pedaço, o tempo total e
+o pico de memória alocada pelo Python (tracemalloc, em uma segunda passada).
+
+Uso:
+    python benchmark_export.py [AGENDAMENTOS]
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_export.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from typing import List  # noqa: E402
+from app.database import engine, AsyncSessionLocal  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import Appointment, AppointmentStatus, User, UserRole  # noqa: E402
+from app.schemas import AppointmentResponse  # noqa: E402
+from app.services.export import export_chunks  # noqa: E402
+
+BATCH = 10000
+
+
+def populate(total: int):
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": "Aluno", "email": "aluno@exemplo.com", "password_hash": "hash", "role": UserRole.STUDENT},
+            {"name": "Instrutor", "email": "instrutor@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR},
+        ])
+        first = datetime(2020, 1, 1, 8)
+        for offset in range(0, total, BATCH):
+            conn.execute(insert(Appointment), [
+                {
+                    "student_id": 1,
+                    "instructor_id": 2,
+                    "start_date": first + timedelta(hours=i),
+                    "end_date": first + timedelta(hours=i + 1),
+                    "status": AppointmentStatus.COMPLETED,
+                    "location_pickup": "Av. Paulista, 1000",
+                    "notes": "Aula de baliza",
+                }
+                for i in range(offset, min(offset + BATCH, total))
+            ])
+
+
+@asynccontextmanager
+async def open_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def streaming(fmt: str):
+    """(tempo até o primeiro pedaço, bytes)"""
+    query = select(Appointment.__table__).order_by(Appointment.start_date, Appointment.id)
+    start = perf_counter()
+    first_chunk = None
+    size = 0
+    async for chunk in export_chunks(open_db, query, fmt):
+        if first_chunk is None:
+            first_chunk = perf_counter() - start
+        size += len(chunk.encode())
+    return first_chunk, size
+
+
+async def load_everything():
+    """Caminho das listagens: objetos ORM + Pydantic; o primeiro byte só sai no fim"""
+    adapter = TypeAdapter(List[AppointmentResponse])
+    async with AsyncSessionLocal() as db:
+        appointments = (await db.scalars(select(Appointment).order_by(Appointment.start_date, Appointment.id))).all()
+        body = adapter.dump_json(appointments)
+    return None, len(body)
+
+
+def measure(name: str, function, *args):
+    start = perf_counter()
+    first_chunk, size = asyncio.run(function(*args))
+    elapsed = perf_counter() - start
+    tracemalloc.start()
+    asyncio.run(function(*args))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    first_chunk = first_chunk if first_chunk is not None else elapsed
+    print(f"{name:22} primeiro byte {first_chunk * 1000:8.1f} ms | total {elapsed:6.2f}s | "
+          f"{size / 2 ** 20:6.1f} MB | pico de memória {peak / 2 ** 20:7.1f} MB")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    upgrade()
+    print(f"Populando {total} agendamentos em {DB_PATH}...")
+    populate(total)
+
+    measure("streaming NDJSON", streaming, "ndjson")
+    measure("streaming CSV", streaming, "csv")
+    measure("ORM + Pydantic (JSON)", load_everything)
+    shutil.rmtree(os.path.dirname(DB_PATH))
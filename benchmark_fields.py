@@ -0,0 +1,119 @@
+"""
+Benchmark da seleção de campos (parâmetro fields=, app/sparse_fields.py)
+Cria um banco SQLite temporário com instrutores (bio completa) e agendamentos
+(com observações) e compara páginas de 100 itens com todos os campos e só com
+os campos de um card/lista: bytes da resposta (sem compressão) e latência
+p50/p99. A busca de instrutores é pedida com Cache-Control: no-cache, para
+medir a consulta e a serialização, não o cache.
+
+Uso:
+    python benchmark_fields.py [REQUISIÇÕES]
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_fields.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import Appointment, AppointmentStatus, InstructorProfile, User, UserRole  # noqa: E402
+
+INSTRUCTORS = 500
+APPOINTMENTS = 5000
+
+CASES = {
+    "list_instructor_profiles": ("/instructor-profiles/?limit=100", "id,city,hourly_rate,transmission,car_model"),
+    "list_appointments": ("/appointments/?limit=100", "id,start_date,end_date,status"),
+}
+HEADERS = {"Accept-Encoding": "identity", "Cache-Control": "no-cache"}
+WORDS = "aulas práticas direção defensiva baliza estacionamento rotatórias rodovia paciência alunos".split()
+
+
+def text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def populate():
+    random.seed(1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": "Aluno", "email": "aluno@exemplo.com", "password_hash": "hash", "role": UserRole.STUDENT}
+        ] + [
+            {"name": f"Instrutor {i}", "email": f"instrutor{i}@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR}
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorProfile), [
+            {
+                "user_id": i + 2,
+                "bio": text(120),
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 60 + i % 50,
+                "car_model": "Onix 1.0",
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+            }
+            for i in range(INSTRUCTORS)
+        ])
+        first = datetime(2030, 1, 1, 8)
+        conn.execute(insert(Appointment), [
+            {
+                "student_id": 1,
+                "instructor_id": i % INSTRUCTORS + 2,
+                "start_date": first + timedelta(hours=i),
+                "end_date": first + timedelta(hours=i + 1),
+                "status": AppointmentStatus.CONFIRMED,
+                "location_pickup": "Av. Paulista, 1000",
+                "notes": text(40),
+            }
+            for i in range(APPOINTMENTS)
+        ])
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(client, path: str, requests: int):
+    """([latências em s], bytes por resposta)"""
+    latencies, size = [], 0
+    for _ in range(requests):
+        start = perf_counter()
+        response = await client.get(path, headers=HEADERS)
+        latencies.append(perf_counter() - start)
+        size = len(response.content)
+    return latencies, size
+
+
+async def run(requests: int):
+    from main import app
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, (path, fields) in CASES.items():
+            print(f"\n{name} ({path})")
+            for label, url in (("completo", path), (f"fields={fields}", f"{path}&fields={fields}")):
+                await measure(client, url, 5)  # aquecimento
+                latencies, size = await measure(client, url, requests)
+                print(f"  {size / 1024:7.1f} KiB | p50 {statistics.median(latencies) * 1000:6.2f} ms"
+                      f" p99 {percentile(latencies, 0.99) * 1000:6.2f} ms | {label}")
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    upgrade()
+    populate()
+    asyncio.run(run(requests))
+    shutil.rmtree(os.path.dirname(DB_PATH))
@@ -0,0 +1,87 @@
+"""
+Benchmark da importação em massa (app/services/importer.py)
+Gera um CSV de usuários e um NDJSON de agendamentos em arquivos temporários,
+importa os dois em um banco SQLite vazio e mede os registros por segundo. O
+pico de memória do processo não deve crescer com o número de registros além
+do cache de páginas do SQLite (SQLITE_CACHE_SIZE, 64 MB por padrão).
+
+Uso:
+    python benchmark_import.py [USUÁRIOS] [AGENDAMENTOS] [LOTE]
+"""
+
+import asyncio
+import csv
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+WORK_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(WORK_DIR, "benchmark_import.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+from app.database.migrations import upgrade  # noqa: E402
+from app.services.importer import import_file  # noqa: E402
+
+INSTRUCTORS = 100
+
+
+def write_users(path: str, total: int):
+    """total usuários; os INSTRUCTORS primeiros são instrutores"""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "email", "password", "role", "phone"])
+        for i in range(total):
+            role = "instructor" if i < INSTRUCTORS else "student"
+            writer.writerow([f"Usuário {i}", f"usuario{i}@exemplo.com", "segredo123", role, f"11 9{i:08d}"])
+
+
+def write_appointments(path: str, total: int, users: int):
+    """Agendamentos de 1 hora, sem sobreposição por instrutor, referenciados por email"""
+    first = datetime(2020, 1, 6, 8)
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(total):
+            start = first + timedelta(hours=i // INSTRUCTORS)
+            file.write(json.dumps({
+                "student_email": f"usuario{INSTRUCTORS + i % (users - INSTRUCTORS)}@exemplo.com",
+                "instructor_email": f"usuario{i % INSTRUCTORS}@exemplo.com",
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(hours=1)).isoformat(),
+                "status": "completed",
+                "location_pickup": "Av. Paulista, 1000",
+            }) + "\n")
+
+
+def run(kind: str, path: str, fmt: str, batch_size: int):
+    start = perf_counter()
+    report = asyncio.run(import_file(kind, path, fmt, batch_size))
+    elapsed = perf_counter() - start
+    print(f"{kind:13} {report.processed:>8} registros, {report.failed} rejeitados: "
+          f"{elapsed:6.2f}s ({report.processed / elapsed:,.0f} registros/s)")
+    if report.failed:
+        print(report.errors[:5])
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    appointments = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    upgrade()
+    users_path = os.path.join(WORK_DIR, "usuarios.csv")
+    appointments_path = os.path.join(WORK_DIR, "agendamentos.ndjson")
+    write_users(users_path, users)
+    write_appointments(appointments_path, appointments, users)
+    print(f"Lotes de {batch_size} registros")
+
+    run("users", users_path, "csv", batch_size)
+    run("appointments", appointments_path, "ndjson", batch_size)
+    # ru_maxrss em KiB no Linux
+    print(f"Pico de memória do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    shutil.rmtree(WORK_DIR)
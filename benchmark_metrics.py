@@ -0,0 +1,113 @@
+"""
+Benchmark do custo das métricas do Prometheus (app/middleware/metrics.py)
+Cria um banco SQLite temporário com instrutores (usuário e perfil) e compara a
+latência p50/p99 de rotas com e sem o MetricsMiddleware na pilha da
+aplicação. As medições dos dois modos são intercaladas em rodadas, para que
+variações da máquina afetem os dois igualmente. As métricas do pool de
+conexões (eventos do engine) ficam ativas nos dois modos.
+
+Uso:
+    python benchmark_metrics.py [REQUISIÇÕES] [RODADAS]
+"""
+
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_metrics.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.middleware import MetricsMiddleware  # noqa: E402
+from app.models import InstructorProfile, User, UserRole  # noqa: E402
+
+INSTRUCTORS = 200
+
+PATHS = {
+    "health_check": "/health",
+    "get_user": "/users/1",
+    "list_instructor_profiles": "/instructor-profiles/?limit=20",
+}
+HEADERS = {"Accept-Encoding": "identity", "Cache-Control": "no-cache"}
+
+
+def populate():
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"Instrutor {i}", "email": f"instrutor{i}@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR}
+            for i in range(INSTRUCTORS)
+        ])
+        conn.execute(insert(InstructorProfile), [
+            {
+                "user_id": i + 1,
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 60 + i % 50,
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+            }
+            for i in range(INSTRUCTORS)
+        ])
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def use_metrics(app, middleware, enabled: bool):
+    """Montar de novo a pilha de middlewares da aplicação com ou sem o MetricsMiddleware"""
+    app.user_middleware = [item for item in middleware if enabled or item.cls is not MetricsMiddleware]
+    app.middleware_stack = None
+
+
+async def measure(client, path: str, requests: int):
+    latencies = []
+    for _ in range(requests):
+        start = perf_counter()
+        response = await client.get(path, headers=HEADERS)
+        latencies.append(perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+async def run(requests: int, rounds: int):
+    from main import app
+    middleware = list(app.user_middleware)
+    modes = {"sem métricas": False, "com métricas": True}
+    latencies = {(name, label): [] for name in PATHS for label in modes}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for _ in range(rounds):
+            for label, enabled in modes.items():
+                use_metrics(app, middleware, enabled)
+                for name, path in PATHS.items():
+                    await measure(client, path, 5)  # aquecimento
+                    latencies[name, label] += await measure(client, path, requests // rounds)
+
+    for name, path in PATHS.items():
+        print(f"\n{name} ({path})")
+        p50s = {}
+        for label in modes:
+            values = latencies[name, label]
+            p50s[label] = statistics.median(values)
+            print(f"  p50 {p50s[label] * 1000:6.3f} ms  p99 {percentile(values, 0.99) * 1000:6.3f} ms | {label}")
+        overhead = p50s["com métricas"] - p50s["sem métricas"]
+        print(f"  custo no p50: {overhead * 1e6:+.0f} µs por requisição")
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    upgrade()
+    populate()
+    asyncio.run(run(requests, rounds))
+    shutil.rmtree(os.path.dirname(DB_PATH))
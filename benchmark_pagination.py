@@ -0,0 +1,108 @@
+"""
+Benchmark da paginação: OFFSET (skip/limit) x cursor (keyset)
+Cria um banco SQLite temporário com N usuários e N agendamentos (padrão: 1 milhão)
+e mede o tempo de uma página em profundidades crescentes.
+
+Uso:
+    python benchmark_pagination.py [N]
+"""
+
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_pagination.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+from sqlalchemy import insert, select  # noqa: E402
+from app.database import engine, AsyncSessionLocal  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import Appointment, User, UserRole  # noqa: E402
+from app.pagination import encode_cursor, paginate  # noqa: E402
+
+PAGE_SIZE = 20
+REPEAT = 5
+CHUNK = 50000
+
+
+def populate(total: int):
+    """Inserir os usuários e agendamentos em lotes"""
+    now = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        for first in range(0, total, CHUNK):
+            ids = range(first + 1, min(first + CHUNK, total) + 1)
+            conn.execute(insert(User), [
+                {
+                    "name": f"Usuário {i}",
+                    "email": f"usuario{i}@exemplo.com",
+                    "password_hash": "hash",
+                    "role": UserRole.STUDENT,
+                    "created_at": now,
+                }
+                for i in ids
+            ])
+            # Datas fora da ordem dos ids, para a ordenação (start_date, id) ter efeito
+            conn.execute(insert(Appointment), [
+                {
+                    "student_id": i,
+                    "instructor_id": 1,
+                    "start_date": now + timedelta(minutes=(i * 7919) % total),
+                    "end_date": now + timedelta(minutes=(i * 7919) % total + 60),
+                }
+                for i in ids
+            ])
+
+
+async def measure(run):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def benchmark(name, query, order_by, total: int):
+    print(f"\n{name} ({PAGE_SIZE} itens por página)")
+    print(f"{'profundidade':>14} {'offset (ms)':>12} {'cursor (ms)':>12}")
+    async with AsyncSessionLocal() as db:
+        depths = sorted({0, 10000, 100000, total // 2, total - PAGE_SIZE * 2})
+        for depth in (depth for depth in depths if 0 <= depth < total):
+            cursor = ""
+            if depth:
+                # Cursor equivalente ao fim da página anterior (obtido fora da medição)
+                previous = await db.scalar(query.order_by(*order_by).offset(depth - 1).limit(1))
+                cursor = encode_cursor([getattr(previous, column.key) for column in order_by])
+
+            async def by_offset():
+                result = await db.scalars(query.order_by(*order_by).offset(depth).limit(PAGE_SIZE))
+                return result.all()
+
+            async def by_cursor():
+                return await paginate(db, query, order_by, cursor, PAGE_SIZE)
+
+            # As duas formas devem devolver a mesma página
+            assert [item.id for item in await by_offset()] == [item.id for item in (await by_cursor())["items"]]
+            print(f"{depth:>14,} {await measure(by_offset):>12.2f} {await measure(by_cursor):>12.2f}")
+
+
+async def main(total: int):
+    await benchmark("GET /users/", select(User), (User.id,), total)
+    await benchmark("GET /appointments/", select(Appointment), (Appointment.start_date, Appointment.id), total)
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    upgrade()
+    print(f"Populando {total:,} usuários e agendamentos em {DB_PATH}...")
+    start = time.perf_counter()
+    populate(total)
+    print(f"Concluído em {time.perf_counter() - start:.1f}s")
+    asyncio.run(main(total))
+    shutil.rmtree(os.path.dirname(DB_PATH))
@@ -0,0 +1,137 @@
+"""
+Benchmark da serialização das respostas (app/serialization.py)
+Cria um banco SQLite temporário com usuários, instrutores, agendamentos e
+avaliações, carrega páginas de 100 objetos ORM de cada tipo e compara o tempo
+de CPU para gerar o JSON:
+
+- padrão: o caminho do FastAPI (validação contra o response_model,
+  jsonable_encoder e JSONResponse);
+- rápido: os TypeAdapters pré-compilados de app/serialization.py (bytes
+  direto no pydantic-core), usados com JSON_FAST_PATH=true.
+
+Uso:
+    python benchmark_serialization.py [REPETIÇÕES]
+"""
+
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import List
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_serialization.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import Appointment, AppointmentStatus, InstructorProfile, Review, User, UserRole  # noqa: E402
+from app.schemas import AppointmentResponse, InstructorProfileResponse, ReviewResponse, UserResponse  # noqa: E402
+from app.serialization import ADAPTERS  # noqa: E402
+
+PAGE = 100
+CASES = (
+    ("usuários", User, UserResponse),
+    ("perfis de instrutor", InstructorProfile, InstructorProfileResponse),
+    ("agendamentos", Appointment, AppointmentResponse),
+    ("avaliações", Review, ReviewResponse),
+)
+
+
+def populate():
+    random.seed(1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "name": f"Usuário {i}",
+                "email": f"usuario{i}@exemplo.com",
+                "password_hash": "hash",
+                "phone": "11999999999",
+                "role": UserRole.INSTRUCTOR if i % 2 else UserRole.STUDENT,
+            }
+            for i in range(2 * PAGE)
+        ])
+        conn.execute(insert(InstructorProfile), [
+            {
+                "user_id": 2 * i + 2,
+                "bio": "Aulas práticas com paciência para alunos nervosos. " * 4,
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 60 + i % 50,
+                "car_model": "Onix 1.0",
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+            }
+            for i in range(PAGE)
+        ])
+        first = datetime(2030, 1, 1, 8)
+        conn.execute(insert(Appointment), [
+            {
+                "student_id": 2 * i + 1,
+                "instructor_id": 2 * i + 2,
+                "start_date": first + timedelta(hours=i),
+                "end_date": first + timedelta(hours=i + 1),
+                "status": AppointmentStatus.COMPLETED,
+                "location_pickup": "Av. Paulista, 1000",
+                "notes": "Treino de baliza e rotatórias",
+            }
+            for i in range(PAGE)
+        ])
+        conn.execute(insert(Review), [
+            {
+                "appointment_id": i + 1,
+                "student_id": 2 * i + 1,
+                "instructor_id": 2 * i + 2,
+                "rating": random.randint(1, 5),
+                "comment": "Excelente instrutor, muito paciente.",
+            }
+            for i in range(PAGE)
+        ])
+
+
+def default_path(field, objects) -> bytes:
+    """O que o FastAPI faz com o retorno de uma rota com response_model=List[Schema]"""
+    content = asyncio.run(serialize_response(field=field, response_content=objects, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def timed(function, repeat: int) -> float:
+    """Mediana do tempo de uma chamada, em µs"""
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        samples.append(perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def run(repeat: int):
+    print(f"Páginas de {PAGE} objetos, mediana de {repeat} repetições")
+    with SessionLocal() as db:
+        for name, model, schema in CASES:
+            objects = db.scalars(select(model).order_by(model.id).limit(PAGE)).all()
+            field = create_response_field(name="response", type_=List[schema])
+            adapters = ADAPTERS[schema]
+            # O mesmo JSON nos dois caminhos (a formatação dos bytes pode diferir)
+            assert json.loads(default_path(field, objects)) == json.loads(adapters.render(objects))
+            default = timed(lambda: default_path(field, objects), repeat)
+            fast = timed(lambda: adapters.render(objects), repeat)
+            print(f"  {name:20} padrão {default:8.0f} µs | rápido {fast:7.0f} µs | "
+                  f"{default / fast:4.1f}x, {(1 - fast / default) * 100:3.0f}% menos CPU")
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    upgrade()
+    populate()
+    run(repeat)
+    shutil.rmtree(os.path.dirname(DB_PATH))
@@ -0,0 +1,123 @@
+"""
+Benchmark dos horários livres (GET /instructor-availability/instructor/{id}/slots)
+Cria um banco SQLite temporário com instrutores de agenda cheia: três janelas
+por dia nos sete dias da semana, uma folga por semana e agendamentos em ~70%
+das horas disponíveis ao longo de YEARS anos de histórico mais o período
+consultado. Mede a rota inteira (consultas + cálculo) para um período de 90 dias.
+
+Uso:
+    python benchmark_slots.py [INSTRUTORES] [ANOS]
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time as clock
+from datetime import datetime, time, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_slots.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DB"] = "true"
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import engine, AsyncSessionLocal  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+from app.models import (  # noqa: E402
+    Appointment,
+    AppointmentStatus,
+    InstructorAvailability,
+    InstructorProfile,
+    InstructorTimeOff,
+    User,
+    UserRole,
+)
+from app.routes.instructor_availability import list_free_slots  # noqa: E402
+
+WINDOWS = [(time(6), time(12)), (time(13), time(18)), (time(19), time(22))]
+PERIOD_START = datetime(2030, 1, 7)
+PERIOD_DAYS = 90
+REPEAT = 20
+
+
+def populate(instructors: int, years: int):
+    """Instrutores com grade semanal completa, folgas e agendamentos em 70% das horas"""
+    random.seed(42)
+    first_day = PERIOD_START.date() - timedelta(days=365 * years)
+    last_day = PERIOD_START.date() + timedelta(days=PERIOD_DAYS)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": "Aluno", "email": "aluno@exemplo.com", "password_hash": "hash", "role": UserRole.STUDENT}
+        ] + [
+            {"name": f"Instrutor {i}", "email": f"instrutor{i}@exemplo.com", "password_hash": "hash", "role": UserRole.INSTRUCTOR}
+            for i in range(instructors)
+        ])
+        for i in range(instructors):
+            user_id = i + 2
+            conn.execute(insert(InstructorProfile), {
+                "id": i + 1,
+                "user_id": user_id,
+                "credential_number": f"CRED-{i}",
+                "hourly_rate": 80,
+                "transmission": "manual",
+                "city": "São Paulo",
+                "city_normalized": "sao paulo",
+            })
+            conn.execute(insert(InstructorAvailability), [
+                {"instructor_id": i + 1, "day_of_week": day, "start_time": start, "end_time": end}
+                for day in range(7) for start, end in WINDOWS
+            ])
+            days_off = set()
+            appointments = []
+            day = first_day
+            while day < last_day:
+                if random.random() < 1 / 7:
+                    days_off.add(day)
+                else:
+                    for start, end in WINDOWS:
+                        for hour in range(start.hour, end.hour):
+                            if random.random() < 0.7:
+                                start_date = datetime.combine(day, time(hour))
+                                appointments.append({
+                                    "student_id": 1,
+                                    "instructor_id": user_id,
+                                    "start_date": start_date,
+                                    "end_date": start_date + timedelta(hours=1),
+                                    "status": AppointmentStatus.CANCELLED if random.random() < 0.05 else AppointmentStatus.CONFIRMED,
+                                })
+                day += timedelta(days=1)
+            conn.execute(insert(InstructorTimeOff), [
+                {"instructor_id": i + 1, "date": day_off} for day_off in sorted(days_off)
+            ])
+            conn.execute(insert(Appointment), appointments)
+
+
+async def main(instructors: int):
+    end = PERIOD_START + timedelta(days=PERIOD_DAYS)
+    timings = []
+    async with AsyncSessionLocal() as db:
+        for instructor_id in range(1, instructors + 1):
+            for _ in range(REPEAT):
+                start = clock.perf_counter()
+                slots = await list_free_slots(instructor_id, PERIOD_START, end, 60, None, db)
+                timings.append(clock.perf_counter() - start)
+    timings.sort()
+    print(f"\nPeríodo de {PERIOD_DAYS} dias, {len(slots)} horários livres no último instrutor")
+    print(f"mediana: {statistics.median(timings) * 1000:.2f} ms")
+    print(f"p95:     {timings[int(len(timings) * 0.95)] * 1000:.2f} ms")
+    print(f"máximo:  {timings[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    instructors = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    upgrade()
+    print(f"Populando {instructors} instrutores com {years} anos de agendamentos em {DB_PATH}...")
+    start = clock.perf_counter()
+    populate(instructors, years)
+    print(f"Concluído em {clock.perf_counter() - start:.1f}s")
+    asyncio.run(main(instructors))
+    shutil.rmtree(os.path.dirname(DB_PATH))
@@ -1,6 +1,14 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
+from app.database import replica_set
+from app.database.migrations import check_schema, upgrade
+from app.database.query_stats import query_metrics
+from app.metrics import mark_worker_stopped, render_metrics
+from app.middleware import CompressionMiddleware, MetricsMiddleware, QueryStatsMiddleware, ReadYourWritesMiddleware
+from app.search import sqlite_trigram_index
 from app.routes import (
     users_router,
     instructor_profiles_router,
@@ -9,21 +17,46 @@ from app.routes import (
     instructor_time_off_router,
     reviews_router,
     instructor_approval_router,
-    uploads_router
+    uploads_router,
+    imports_router,
+    calendar_router
 )
 from app.config import settings
+from app.serialization import default_response_class
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Conferir a versão do schema; as migrações rodam pela linha de comando"""
+    if settings.auto_migrate:
+        upgrade()
+    check_schema()
+    sqlite_trigram_index()
+    yield
+    mark_worker_stopped()
 
-# Criar tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
 
 # Criar aplicação FastAPI
 app = FastAPI(
     title=settings.app_name,
     description="API para conectar instrutores de trânsito a alunos",
     version="1.0.0",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan,
+    default_response_class=default_response_class()
 )
 
+
+# Alteração concorrente detectada pela coluna version dos modelos
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    """O registro mudou (version_id_col) entre a leitura e o UPDATE: outra requisição o alterou ou removeu"""
+    return JSONResponse(
+        status_code=status.HTTP_412_PRECONDITION_FAILED if "if-match" in request.headers else status.HTTP_409_CONFLICT,
+        content={"detail": "O registro foi alterado por outra requisição; leia-o novamente"}
+    )
+
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +66,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Leituras logo após uma escrita vão ao primário (apenas com réplicas configuradas)
+if replica_set.replicas and settings.read_your_writes_seconds > 0:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.read_your_writes_seconds)
+
+# Métricas do Prometheus (dentro do QueryStatsMiddleware, para ver as consultas da requisição)
+app.add_middleware(MetricsMiddleware)
+
+# Contagem de consultas SQL por requisição e detecção de N+1
+app.add_middleware(
+    QueryStatsMiddleware,
+    headers=settings.query_stats_headers,
+    n_plus_one_threshold=settings.n_plus_one_threshold,
+    strict=settings.query_budget_strict,
+    default_budget=settings.query_budget_default
+)
+
+# Compressão negociada pelo Accept-Encoding. É a mais externa: ela só envia o início
+# da resposta com o primeiro pedaço do corpo, e o QueryStatsMiddleware encerra a
+# contagem de consultas no início da resposta (as métricas veem o tamanho sem compressão)
+if settings.compression_encodings:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.compression_encodings,
+        minimum_size=settings.compression_minimum_size,
+        levels={
+            "gzip": settings.compression_gzip_level,
+            "br": settings.compression_brotli_quality,
+            "zstd": settings.compression_zstd_level,
+        }
+    )
+
 # Registrar rotas
 app.include_router(users_router)
 app.include_router(instructor_profiles_router)
@@ -42,6 +106,8 @@ app.include_router(instructor_time_off_router)
 app.include_router(reviews_router)
 app.include_router(instructor_approval_router)
 app.include_router(uploads_router)
+app.include_router(imports_router)
+app.include_router(calendar_router)
 
 
 @app.get("/")
@@ -61,6 +127,23 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas no formato de texto do Prometheus"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
+# Os totais expõem o SQL das rotas: só em desenvolvimento ou com a instrumentação ligada
+if settings.debug or settings.query_stats_headers:
+    @app.get("/debug/queries", include_in_schema=False)
+    def query_stats():
+        """Consultas SQL agregadas por rota desde o início do processo"""
+        return query_metrics.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
+    # Em desenvolvimento, aplicar as migrações antes de subir o servidor
+    upgrade()
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -153,9 +153,10 @@ def test_api():
     # 12. Criar agendamento
     if student_id and instructor_user_id:
         print("1️⃣3️⃣ Criando agendamento...")
-        # Data de amanhã às 14h
-        tomorrow = datetime.now() + timedelta(days=1)
-        start_date = tomorrow.replace(hour=14, minute=0, second=0, microsecond=0)
+        # Próxima quarta-feira às 14h (dentro da disponibilidade criada acima)
+        today = datetime.now()
+        next_wednesday = today + timedelta(days=(2 - today.weekday()) % 7 or 7)
+        start_date = next_wednesday.replace(hour=14, minute=0, second=0, microsecond=0)
         end_date = start_date + timedelta(hours=1)
         
         appointment_data = {
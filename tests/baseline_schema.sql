@@ -0,0 +1,93 @@
+-- Schema do SQLite criado pelo create_all antes das migrações versionadas (modelos originais)
+CREATE TABLE users (
+	id INTEGER NOT NULL, 
+	name VARCHAR(255) NOT NULL, 
+	email VARCHAR(255) NOT NULL, 
+	password_hash VARCHAR(255) NOT NULL, 
+	role VARCHAR(10) NOT NULL, 
+	phone VARCHAR(20), 
+	profile_photo VARCHAR(500), 
+	created_at DATETIME, 
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE instructor_profiles (
+	id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	bio TEXT, 
+	credential_number VARCHAR(100) NOT NULL, 
+	hourly_rate DECIMAL(10, 2) NOT NULL, 
+	car_model VARCHAR(100), 
+	transmission VARCHAR(9) NOT NULL, 
+	city VARCHAR(100) NOT NULL, 
+	approval_status VARCHAR(12), 
+	approval_date DATETIME, 
+	rejection_reason TEXT, 
+	PRIMARY KEY (id), 
+	UNIQUE (user_id), 
+	FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE, 
+	UNIQUE (credential_number)
+);
+CREATE INDEX ix_instructor_profiles_id ON instructor_profiles (id);
+CREATE TABLE appointments (
+	id INTEGER NOT NULL, 
+	student_id INTEGER NOT NULL, 
+	instructor_id INTEGER NOT NULL, 
+	start_date DATETIME NOT NULL, 
+	end_date DATETIME NOT NULL, 
+	status VARCHAR(9), 
+	location_pickup VARCHAR(255), 
+	notes TEXT, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(student_id) REFERENCES users (id) ON DELETE CASCADE, 
+	FOREIGN KEY(instructor_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_appointments_id ON appointments (id);
+CREATE TABLE instructor_availability (
+	id INTEGER NOT NULL, 
+	instructor_id INTEGER NOT NULL, 
+	day_of_week INTEGER NOT NULL, 
+	start_time TIME NOT NULL, 
+	end_time TIME NOT NULL, 
+	is_active BOOLEAN, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(instructor_id) REFERENCES instructor_profiles (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_instructor_availability_id ON instructor_availability (id);
+CREATE TABLE instructor_time_off (
+	id INTEGER NOT NULL, 
+	instructor_id INTEGER NOT NULL, 
+	date DATE NOT NULL, 
+	reason VARCHAR(255), 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(instructor_id) REFERENCES instructor_profiles (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_instructor_time_off_id ON instructor_time_off (id);
+CREATE TABLE reviews (
+	id INTEGER NOT NULL, 
+	appointment_id INTEGER NOT NULL, 
+	student_id INTEGER NOT NULL, 
+	instructor_id INTEGER NOT NULL, 
+	rating INTEGER NOT NULL, 
+	comment TEXT, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	CONSTRAINT check_rating_range CHECK (rating >= 1 AND rating <= 5), 
+	UNIQUE (appointment_id), 
+	FOREIGN KEY(appointment_id) REFERENCES appointments (id) ON DELETE CASCADE, 
+	FOREIGN KEY(student_id) REFERENCES users (id) ON DELETE CASCADE, 
+	FOREIGN KEY(instructor_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_reviews_id ON reviews (id);
+CREATE TABLE instructor_documents (
+	id INTEGER NOT NULL, 
+	instructor_id INTEGER NOT NULL, 
+	document_type VARCHAR(16) NOT NULL, 
+	file_path VARCHAR(500) NOT NULL, 
+	original_filename VARCHAR(255), 
+	uploaded_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(instructor_id) REFERENCES instructor_profiles (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_instructor_documents_id ON instructor_documents (id);
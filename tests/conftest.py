@@ -0,0 +1,93 @@
+"""Fixtures compartilhadas dos testes.
+
+As configurações (app/config.py) são lidas na importação, então o banco
+temporário e o modo estrito do orçamento de consultas são definidos antes de
+importar a aplicação: toda rota que exceder o seu @query_budget falha o teste.
+"""
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+DB_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'test.db')}"
+os.environ["AUTO_MIGRATE"] = "false"
+os.environ["QUERY_BUDGET_STRICT"] = "true"
+os.environ["QUERY_STATS_HEADERS"] = "true"
+os.environ["INSTRUCTOR_SEARCH_CACHE_TTL"] = "0"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.database.migrations import upgrade  # noqa: E402
+
+upgrade()
+
+from main import app  # noqa: E402
+
+counter = itertools.count(1)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def next_monday(weeks: int = 1) -> date:
+    """Segunda-feira daqui a `weeks` semanas (agendamentos precisam estar no futuro)"""
+    today = date.today()
+    return today + timedelta(days=7 * weeks - today.weekday())
+
+
+@pytest.fixture
+def student(client):
+    number = next(counter)
+    response = client.post("/users/", json={
+        "name": f"Aluno {number}", "email": f"aluno{number}@exemplo.com", "password": "123456", "role": "student"
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def instructor(client):
+    """Instrutor (usuário e perfil) disponível de segunda a sexta, das 8h às 18h"""
+    number = next(counter)
+    response = client.post("/users/", json={
+        "name": f"Instrutor {number}", "email": f"instrutor{number}@exemplo.com", "password": "123456", "role": "instructor"
+    })
+    assert response.status_code == 201, response.text
+    user = response.json()
+    response = client.post("/instructor-profiles/", json={
+        "user_id": user["id"], "credential_number": f"CRED-{number}", "hourly_rate": 80,
+        "transmission": "manual", "city": "São Paulo", "bio": "Aulas práticas"
+    })
+    assert response.status_code == 201, response.text
+    profile = response.json()
+    for day in range(1, 6):
+        response = client.post("/instructor-availability/", json={
+            "instructor_id": profile["id"], "day_of_week": day,
+            "start_time": time(8).isoformat(), "end_time": time(18).isoformat()
+        })
+        assert response.status_code == 201, response.text
+    return {"user": user, "profile": profile}
+
+
+def lesson(student, instructor, start: datetime, hours: int = 1) -> dict:
+    """Corpo de POST /appointments/"""
+    return {
+        "student_id": student["id"],
+        "instructor_id": instructor["user"]["id"],
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(hours=hours)).isoformat(),
+    }
@@ -0,0 +1,122 @@
+"""Validação de agendamentos (app/services/booking.py) e reservas simultâneas"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.database import AsyncSessionLocal, SessionLocal
+from app.database.connection import open_session
+from app.models import Appointment, AppointmentStatus
+from app.services.booking import check_conflicts, check_schedule
+from tests.conftest import lesson, next_monday
+
+MONDAY = next_monday()
+
+
+def at(hour: float, day: int = 0) -> datetime:
+    """Horário da segunda-feira de teste (+day dias)"""
+    return datetime.combine(MONDAY + timedelta(days=day), time()) + timedelta(hours=hour)
+
+
+async def status_of(check, *args):
+    """Código HTTP da verificação (None = aceita)"""
+    async with open_session(AsyncSessionLocal, SessionLocal) as db:
+        try:
+            await check(db, *args)
+        except HTTPException as error:
+            return error.status_code
+    return None
+
+
+@pytest.fixture
+def day_off(client, instructor):
+    """Quarta-feira de teste bloqueada na agenda do instrutor"""
+    response = client.post("/instructor-time-off/", json={
+        "instructor_id": instructor["profile"]["id"], "date": (MONDAY + timedelta(days=2)).isoformat()
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def booked(client, student, instructor):
+    """Aula das 10h às 11h e uma aula cancelada das 14h às 15h"""
+    response = client.post("/appointments/", json=lesson(student, instructor, at(10)))
+    assert response.status_code == 201, response.text
+    cancelled = client.post("/appointments/", json=lesson(student, instructor, at(14)))
+    assert cancelled.status_code == 201, cancelled.text
+    response = client.patch(f"/appointments/{cancelled.json()['id']}/status", params={"new_status": "cancelled"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("start, end, expected", [
+    (at(9), at(10), None),                 # dentro da janela das 8h às 18h
+    (at(8), at(9), None),                  # começa na abertura da janela
+    (at(17), at(18), None),                # termina no fechamento da janela
+    (at(7.5), at(8.5), 400),               # começa antes da janela
+    (at(17.5), at(18.5), 400),             # termina depois da janela
+    (at(17), at(8, day=1), 400),           # atravessa a noite
+    (at(9, day=-1), at(10, day=-1), 400),  # domingo, sem janela
+    (at(9, day=1), at(10, day=1), None),   # véspera da exceção
+    (at(9, day=2), at(10, day=2), 400),    # dia bloqueado
+    (at(17, day=1), at(9, day=2), 400),    # termina no dia bloqueado
+])
+async def test_check_schedule(instructor, day_off, start, end, expected):
+    assert await status_of(check_schedule, instructor["user"]["id"], start, end) == expected
+
+
+@pytest.mark.anyio
+async def test_check_schedule_without_profile(student):
+    assert await status_of(check_schedule, student["id"], at(9), at(10)) == 400
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("start, end, expected", [
+    (at(9), at(10), None),         # termina quando a aula existente começa
+    (at(11), at(12), None),        # começa quando a aula existente termina
+    (at(10), at(11), 409),         # mesmo horário
+    (at(9.5), at(10.5), 409),      # sobrepõe o início
+    (at(10.5), at(11.5), 409),     # sobrepõe o fim
+    (at(10.25), at(10.75), 409),   # contido na aula existente
+    (at(9), at(12), 409),          # contém a aula existente
+    (at(14), at(15), None),        # horário de uma aula cancelada
+])
+async def test_check_conflicts(instructor, booked, start, end, expected):
+    assert await status_of(check_conflicts, instructor["user"]["id"], start, end) == expected
+
+
+@pytest.mark.anyio
+async def test_check_conflicts_excludes_rescheduled_appointment(client, instructor, booked):
+    appointments = client.get("/appointments/", params={"instructor_id": instructor["user"]["id"], "status": "pending"})
+    (appointment,) = appointments.json()
+    args = (instructor["user"]["id"], at(10.5), at(11.5))
+    assert await status_of(check_conflicts, *args) == 409
+    assert await status_of(check_conflicts, *args, appointment["id"]) is None
+
+
+def test_concurrent_bookings_of_one_slot(client, instructor):
+    """Reservas simultâneas do mesmo horário: só uma é aceita"""
+    students = []
+    for number in range(12):
+        response = client.post("/users/", json={
+            "name": f"Concorrente {number}", "email": f"concorrente{number}@exemplo.com",
+            "password": "123456", "role": "student"
+        })
+        assert response.status_code == 201, response.text
+        students.append(response.json())
+    bodies = [lesson(student, instructor, at(9, day=3)) for student in students]
+
+    with ThreadPoolExecutor(max_workers=len(bodies)) as executor:
+        codes = sorted(executor.map(lambda body: client.post("/appointments/", json=body).status_code, bodies))
+    assert codes == [201] + [409] * (len(bodies) - 1)
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Appointment.start_date, Appointment.end_date)
+            .where(Appointment.instructor_id == instructor["user"]["id"])
+            .where(Appointment.status != AppointmentStatus.CANCELLED)
+            .order_by(Appointment.start_date)
+        ).all()
+    assert len(rows) == 1
@@ -0,0 +1,79 @@
+"""Filtro de cidade da busca de instrutores (app/search.py)"""
+import pytest
+from app import search
+from app.config import settings
+from app.search import city_matches
+
+
+def matches(client, city: str, *profiles) -> list:
+    """Quais dos perfis GET /instructor-profiles/?city= encontra, na ordem da resposta"""
+    response = client.get("/instructor-profiles/", params={"city": city, "limit": 1000})
+    assert response.status_code == 200, response.text
+    ids = {profile["id"] for profile in profiles}
+    return [profile["id"] for profile in response.json() if profile["id"] in ids]
+
+
+@pytest.fixture
+def paulinia(client, instructor):
+    """O perfil do instrutor da fixture em Paulínia, que começa com o trecho "paul" de São Paulo"""
+    response = client.put(f"/instructor-profiles/{instructor['profile']['id']}", json={"city": "Paulínia"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_trigram_index_exists():
+    """No SQLite dos testes a migração 5 cria o índice FTS5 usado pela busca por trecho"""
+    assert search.sqlite_trigram_index()
+
+
+@pytest.mark.parametrize("city", ["São Paulo", "sao paulo", "Paulo", "PAULO", "ulo", "ão", "o p", "são"])
+def test_substring_matches(client, instructor, city):
+    """As buscas por trecho que o ilike('%cidade%') original aceitava continuam encontrando o perfil"""
+    assert matches(client, city, instructor["profile"]) == [instructor["profile"]["id"]]
+
+
+@pytest.mark.parametrize("city", ["Rio", "paulista", "São Paulo Capital"])
+def test_substring_misses(client, instructor, city):
+    assert matches(client, city, instructor["profile"]) == []
+
+
+@pytest.mark.parametrize("city", ["paulo", "au"])
+def test_like_fallback_without_index(client, instructor, monkeypatch, city):
+    """Sem a tabela FTS5 a busca por trecho usa LIKE, não só o prefixo"""
+    monkeypatch.setattr(search, "sqlite_trigram_index", lambda: False)
+    assert matches(client, city, instructor["profile"]) == [instructor["profile"]["id"]]
+
+
+def test_prefix_matches_come_first(client, paulinia):
+    """Quem começa com o termo vem antes de quem só o contém"""
+    response = client.post("/users/", json={
+        "name": "Instrutor de São Paulo", "email": "instrutor.sp@exemplo.com", "password": "123456", "role": "instructor"
+    })
+    assert response.status_code == 201, response.text
+    response = client.post("/instructor-profiles/", json={
+        "user_id": response.json()["id"], "credential_number": "CRED-SP", "hourly_rate": 80,
+        "transmission": "manual", "city": "São Paulo"
+    })
+    assert response.status_code == 201, response.text
+    sao_paulo = response.json()
+    assert matches(client, "paul", sao_paulo, paulinia) == [paulinia["id"], sao_paulo["id"]]
+
+
+def test_prefix_only_opt_in(client, instructor, monkeypatch):
+    """CITY_FUZZY_SEARCH=false restringe a busca ao início do nome"""
+    monkeypatch.setattr(settings, "city_fuzzy_search", False)
+    assert matches(client, "São", instructor["profile"]) == [instructor["profile"]["id"]]
+    assert matches(client, "paulo", instructor["profile"]) == []
+
+
+@pytest.mark.parametrize("term, fuzzy, expected", [
+    ("sao", True, True),
+    ("paulo", True, True),
+    ("au", True, True),
+    ("rio", True, False),
+    ("sao", False, True),
+    ("paulo", False, False),
+])
+def test_city_matches(term, fuzzy, expected):
+    """A invalidação do cache segue a mesma regra da consulta"""
+    assert city_matches(term, "sao paulo", fuzzy) is expected
@@ -0,0 +1,40 @@
+"""Leitura dos arquivos de importação (app/services/importer.py)"""
+import pytest
+from app.services import importer
+from app.services.importer import read_records
+
+
+async def records(text: str, fmt: str = "csv") -> list:
+    async def lines():
+        for line in text.split("\n"):
+            yield line
+
+    return [item async for item in read_records(lines(), fmt)]
+
+
+@pytest.mark.anyio
+async def test_quoted_field_across_lines():
+    text = 'name,email,notes\nAna,ana@exemplo.com,"primeira\nsegunda"\nBia,bia@exemplo.com,\n'
+    assert await records(text) == [
+        (2, {"name": "Ana", "email": "ana@exemplo.com", "notes": "primeira\nsegunda"}, None),
+        (4, {"name": "Bia", "email": "bia@exemplo.com"}, None),
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("valid_rows", [3, 20])
+async def test_unterminated_quote_rejects_only_its_line(monkeypatch, valid_rows):
+    """Aspas sem fechamento seguidas de linhas válidas: no fim do arquivo (3) e ao atingir MAX_QUOTED_LINES (20)"""
+    monkeypatch.setattr(importer, "MAX_QUOTED_LINES", 5)
+    rows = [f"Aluno {number},aluno{number}@exemplo.com,ok" for number in range(valid_rows)]
+    text = "\n".join(["name,email,notes", 'Ana,ana@exemplo.com,"sem fechamento', *rows])
+    result = await records(text)
+
+    line, record, error = result[0]
+    assert (line, record) == (2, None)
+    assert error.startswith("Campo entre aspas não terminado")
+    assert result[1:] == [
+        (number + 3, {"name": f"Aluno {number}", "email": f"aluno{number}@exemplo.com", "notes": "ok"}, None)
+        for number in range(valid_rows)
+    ]
+
@@ -0,0 +1,11 @@
+"""Índices das consultas das listagens (app/database/indexes.py)"""
+from app.database import engine
+from app.database.indexes import find_table_scans, hot_queries
+
+
+def test_hot_queries_use_indexes():
+    """Nenhuma consulta de listagem faz scan da tabela no banco migrado"""
+    queries = hot_queries()
+    assert queries
+    scans = find_table_scans(engine, queries)
+    assert not scans, "\n".join(f"{name}: {'; '.join(plan)}" for name, plan in scans.items())
@@ -0,0 +1,28 @@
+"""Métricas do pool de conexões (app/metrics.py)"""
+import os
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from app.database.connection import configure_engine
+from app.metrics import pool_name
+from tests.conftest import DB_DIR
+
+
+def pool_samples(engine):
+    """(checkouts medidos, conexões em uso)"""
+    labels = {"pool": pool_name(engine)}
+    return (
+        REGISTRY.get_sample_value("db_pool_checkout_seconds_count", labels) or 0,
+        REGISTRY.get_sample_value("db_pool_connections_in_use", labels),
+    )
+
+
+def test_pool_metrics_survive_dispose():
+    """engine.dispose() recria o pool; a espera e as conexões em uso continuam medidas"""
+    engine = configure_engine(create_engine(f"sqlite:///{os.path.join(DB_DIR, 'metrics.db')}"))
+    for _ in range(2):
+        checkouts, _ = pool_samples(engine)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert pool_samples(engine) == (checkouts + 1, 1)
+        assert pool_samples(engine) == (checkouts + 1, 0)
+        engine.dispose()
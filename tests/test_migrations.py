@@ -0,0 +1,75 @@
+"""Migrações (app/database/migrations.py) a partir de um banco anterior a elas"""
+from datetime import date
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from app.database import Base
+from app.database.indexes import ensure_indexes
+from app.database.migrations import HEAD_VERSION, current_version, upgrade
+
+BASELINE_SCHEMA = Path(__file__).with_name("baseline_schema.sql")
+
+
+def schema(bind) -> dict:
+    """{tabela: (colunas, índices (nome, colunas, único))} das tabelas dos modelos"""
+    inspector = inspect(bind)
+    return {
+        table: (
+            sorted(column["name"] for column in inspector.get_columns(table)),
+            sorted((index["name"], tuple(index["column_names"]), bool(index["unique"]))
+                   for index in inspector.get_indexes(table)),
+        )
+        for table in Base.metadata.tables
+    }
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    """Banco com o schema original e alguns dados, incluindo exceções de agenda repetidas"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA.read_text().split(";"):
+            if statement.strip():
+                conn.exec_driver_sql(statement)
+        conn.execute(text(
+            "INSERT INTO users (id, name, email, password_hash, role) "
+            "VALUES (1, 'Instrutor', 'instrutor@exemplo.com', 'hash', 'INSTRUCTOR')"
+        ))
+        conn.execute(text(
+            "INSERT INTO instructor_profiles (id, user_id, credential_number, hourly_rate, transmission, city) "
+            "VALUES (1, 1, 'CRED', 80, 'MANUAL', 'São Paulo')"
+        ))
+        conn.execute(text(
+            "INSERT INTO appointments (id, student_id, instructor_id, start_date, end_date, status) "
+            "VALUES (1, 1, 1, '2030-01-07 09:00:00', '2030-01-07 10:00:00', 'COMPLETED')"
+        ))
+        conn.execute(text(
+            "INSERT INTO reviews (appointment_id, student_id, instructor_id, rating) VALUES (1, 1, 1, 4)"
+        ))
+        conn.execute(
+            text("INSERT INTO instructor_time_off (instructor_id, date) VALUES (1, :day)"),
+            [{"day": date(2030, 1, 7)}, {"day": date(2030, 1, 7)}]
+        )
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_from_baseline(baseline, tmp_path):
+    assert upgrade(baseline) == list(range(1, HEAD_VERSION + 1))
+    with baseline.connect() as conn:
+        assert current_version(conn) == HEAD_VERSION
+        assert conn.execute(text("SELECT city_normalized FROM instructor_profiles")).scalar() == "sao paulo"
+        assert conn.execute(text("SELECT COUNT(*) FROM instructor_time_off")).scalar() == 1
+        assert conn.execute(text("SELECT total_reviews FROM instructor_rating_summaries")).scalar() == 1
+
+    # Mesmo schema de um banco novo
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade(fresh)
+    assert schema(baseline) == schema(fresh)
+    fresh.dispose()
+
+    # Nenhum índice declarado nos modelos ficou para o ensure_indexes
+    migrated = schema(baseline)
+    with baseline.begin() as conn:
+        ensure_indexes(conn)
+    assert schema(baseline) == migrated
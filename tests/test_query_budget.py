@@ -0,0 +1,55 @@
+"""Orçamento de consultas (@query_budget) no modo estrito (QUERY_BUDGET_STRICT=true)"""
+from datetime import datetime, time, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.database.query_stats import QueryBudgetExceeded
+from main import app
+from tests.conftest import lesson, next_monday
+
+
+def route_endpoint(path: str, method: str = "GET"):
+    return next(route.endpoint for route in app.routes if route.path == path and method in route.methods)
+
+
+def test_strict_mode_is_on():
+    assert settings.query_budget_strict
+
+
+def test_read_routes_within_budget(client, student, instructor):
+    """Rotas de leitura com orçamento declarado respondem no modo estrito: exceder levantaria QueryBudgetExceeded"""
+    user_id, profile_id = instructor["user"]["id"], instructor["profile"]["id"]
+    start = datetime.combine(next_monday(), time(9))
+    response = client.post("/appointments/", json=lesson(student, instructor, start))
+    assert response.status_code == 201, response.text
+
+    paths = [
+        f"/users/{user_id}",
+        "/users/",
+        f"/users/batch?ids={user_id},{student['id']}",
+        f"/instructor-profiles/{profile_id}",
+        "/instructor-profiles/?city=Paulo",
+        "/instructor-profiles/cards?city=Paulo",
+        f"/instructor-availability/instructor/{profile_id}/slots"
+        f"?from={start.isoformat()}&to={(start + timedelta(days=7)).isoformat()}",
+        f"/appointments/?instructor_id={user_id}",
+        f"/reviews/instructor/{user_id}/stats",
+        f"/calendar/instructor/{user_id}.ics",
+        f"/calendar/student/{student['id']}.ics",
+    ]
+    for path in paths:
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.text)
+
+
+def test_over_budget_raises(client, instructor, monkeypatch):
+    monkeypatch.setattr(route_endpoint("/users/{user_id}"), "query_budget", 0)
+    with pytest.raises(QueryBudgetExceeded, match=r"GET /users/\{user_id\} executou 1 consultas \(orçamento: 0\)"):
+        client.get(f"/users/{instructor['user']['id']}")
+
+
+def test_over_budget_returns_500(instructor, monkeypatch):
+    monkeypatch.setattr(route_endpoint("/instructor-profiles/{profile_id}"), "query_budget", 0)
+    with TestClient(app, raise_server_exceptions=False) as client:
+        response = client.get(f"/instructor-profiles/{instructor['profile']['id']}")
+    assert response.status_code == 500
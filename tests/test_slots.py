@@ -0,0 +1,104 @@
+"""Cálculo dos horários livres (app/services/slots.py)"""
+from datetime import date, datetime, time, timedelta
+import pytest
+from app.services.slots import expand_weekly, first_free_slot, free_slots, merge_intervals, subtract_intervals
+
+MONDAY = date(2030, 1, 7)
+HOUR = timedelta(hours=1)
+# Segunda a sexta, das 8h às 12h e das 14h às 18h (day_of_week: 0=Domingo ... 6=Sábado)
+WEEKDAYS = [(day, time(8), time(12)) for day in range(1, 6)] + [(day, time(14), time(18)) for day in range(1, 6)]
+
+
+def at(hour: float, day: int = 0) -> datetime:
+    """Horário da segunda-feira de teste (+day dias)"""
+    return datetime.combine(MONDAY + timedelta(days=day), time()) + timedelta(hours=hour)
+
+
+def span(*hours, day: int = 0):
+    """Intervalos (início, fim) em horas: span((8, 10), (11, 12))"""
+    return [(at(start, day), at(end, day)) for start, end in hours]
+
+
+def slot(start: float, end: float, day: int = 0):
+    return at(start, day), at(end, day)
+
+
+def test_monday():
+    assert MONDAY.weekday() == 0
+
+
+@pytest.mark.parametrize("intervals, expected", [
+    ([], []),
+    (span((8, 9)), span((8, 9))),
+    (span((8, 9), (10, 11)), span((8, 9), (10, 11))),    # separados
+    (span((8, 9), (9, 10)), span((8, 10))),              # adjacentes
+    (span((8, 10), (9, 11)), span((8, 11))),             # sobrepostos
+    (span((8, 12), (9, 10)), span((8, 12))),             # contido
+    (span((8, 9), (8, 11), (10, 12)), span((8, 12))),    # mesmo início, encadeados
+])
+def test_merge_intervals(intervals, expected):
+    assert merge_intervals(intervals) == expected
+
+
+@pytest.mark.parametrize("busy, expected", [
+    ([], span((8, 12))),
+    (span((6, 7)), span((8, 12))),                       # antes da janela
+    (span((12, 13)), span((8, 12))),                     # adjacente ao fim
+    (span((7, 8)), span((8, 12))),                       # adjacente ao início
+    (span((9, 10)), span((8, 9), (10, 12))),             # contido na janela
+    (span((7, 9)), span((9, 12))),                       # sobrepõe o início
+    (span((11, 13)), span((8, 11))),                     # sobrepõe o fim
+    (span((7, 13)), []),                                 # contém a janela
+    (span((8, 12)), []),                                 # igual à janela
+    (span((8, 9), (9, 10), (11, 12)), span((10, 11))),   # vários, adjacentes entre si
+])
+def test_subtract_intervals(busy, expected):
+    assert subtract_intervals(span((8, 12)), busy) == expected
+
+
+def test_subtract_intervals_across_windows():
+    """Um agendamento longo afeta mais de uma janela"""
+    assert subtract_intervals(span((8, 12), (14, 18)), span((11, 15))) == span((8, 11), (15, 18))
+
+
+@pytest.mark.parametrize("windows, days_off, start, end, expected", [
+    # Janelas contíguas (8-12 e 12-16) viram um intervalo
+    ([(1, time(8), time(12)), (1, time(12), time(16))], set(), at(0), at(24), span((8, 16))),
+    # Limites do período cortam as janelas
+    (WEEKDAYS, set(), at(9), at(15), span((9, 12), (14, 15))),
+    # Sábado e domingo sem janelas
+    (WEEKDAYS, set(), at(0, day=5), at(24, day=6), []),
+    # Dia bloqueado no meio do período
+    (WEEKDAYS, {MONDAY + timedelta(days=1)}, at(8), at(18, day=2),
+     span((8, 12), (14, 18)) + span((8, 12), (14, 18), day=2)),
+])
+def test_expand_weekly(windows, days_off, start, end, expected):
+    assert expand_weekly(windows, days_off, start, end) == expected
+
+
+@pytest.mark.parametrize("appointments, days_off, start, end, duration, expected", [
+    # Sem agendamentos: a abertura da primeira janela
+    ([], set(), at(0), at(24, day=6), HOUR, slot(8, 9)),
+    # Início no meio da janela
+    ([], set(), at(9.5), at(24, day=6), HOUR, slot(9.5, 10.5)),
+    # Espaço entre dois agendamentos exatamente do tamanho pedido
+    (span((8, 9), (10, 12)), set(), at(0), at(24), HOUR, slot(9, 10)),
+    # Espaço menor que a duração: a próxima janela
+    (span((8, 9.5), (10, 12)), set(), at(0), at(24), HOUR, slot(14, 15)),
+    # Manhã ocupada por agendamentos sobrepostos e contidos
+    (span((8, 11), (9, 10), (10.5, 12)), set(), at(0), at(24), HOUR, slot(14, 15)),
+    # Segunda ocupada e terça bloqueada: quarta-feira
+    (span((8, 12), (14, 18)), {MONDAY + timedelta(days=1)}, at(0), at(24, day=6), HOUR, slot(8, 9, day=2)),
+    # Fim de semana e segunda bloqueada, a partir de sábado: terça-feira
+    ([], {MONDAY + timedelta(days=7)}, at(0, day=5), at(24, day=13), 2 * HOUR, slot(8, 10, day=8)),
+    # Duração maior que qualquer janela
+    ([], set(), at(0), at(24, day=6), 5 * HOUR, None),
+    # Nenhum espaço no período
+    (span((8, 12), (14, 18)), set(), at(0), at(24), HOUR, None),
+])
+def test_first_free_slot(appointments, days_off, start, end, duration, expected):
+    first = first_free_slot(WEEKDAYS, days_off, appointments, start, end, duration)
+    assert first == expected
+    # O mesmo horário que a listagem completa traria primeiro
+    slots = free_slots(WEEKDAYS, days_off, appointments, start, end, duration, timedelta(minutes=30))
+    assert (slots[0] if slots else None) == first
@@ -0,0 +1,47 @@
+"""Exceções de agenda (app/routes/instructor_time_off.py) com inclusões simultâneas"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sqlalchemy import func, select
+from app.database import SessionLocal
+from app.models import InstructorTimeOff
+from app.routes import instructor_time_off
+from tests.conftest import next_monday
+
+DAY = next_monday() + timedelta(days=2)
+
+
+def time_off_count(instructor) -> int:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.count(InstructorTimeOff.id))
+            .where(InstructorTimeOff.instructor_id == instructor["profile"]["id"])
+        )
+
+
+def test_concurrent_time_off_of_one_date(client, instructor):
+    """Bloqueios simultâneos da mesma data: um é criado e os outros recebem 400"""
+    body = {"instructor_id": instructor["profile"]["id"], "date": DAY.isoformat()}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        codes = sorted(executor.map(lambda _: client.post("/instructor-time-off/", json=body).status_code, range(8)))
+    assert codes == [201] + [400] * 7
+    assert time_off_count(instructor) == 1
+
+
+def test_unique_index_violation_returns_400(client, instructor, monkeypatch):
+    """Se a verificação prévia não vê a outra linha, o índice único recusa a inclusão com o mesmo 400"""
+    body = {"instructor_id": instructor["profile"]["id"], "date": DAY.isoformat()}
+    assert client.post("/instructor-time-off/", json=body).status_code == 201
+
+    async def date_looks_free(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(instructor_time_off, "ensure_date_free", date_looks_free)
+    response = client.post("/instructor-time-off/", json=body)
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Já existe exceção de agenda nesta data"
+
+    other = client.post("/instructor-time-off/", json={**body, "date": (DAY + timedelta(days=1)).isoformat()})
+    assert other.status_code == 201, other.text
+    response = client.put(f"/instructor-time-off/{other.json()['id']}", json={"date": DAY.isoformat()})
+    assert response.status_code == 400, response.text
+    assert time_off_count(instructor) == 2